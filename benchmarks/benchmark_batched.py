@@ -0,0 +1,38 @@
+import numpy as np
+from fewerbytes.batched import compress_many, decompress_many
+from fewerbytes.integer_compression import combined_integer_compression
+from fewerbytes.integer_decompression import integer_decompression_from_transforms
+from benchmarks.benchmark_planner import best_of, benchmark_arrays
+
+
+def small_arrays(count: int, size: int) -> list:
+    """
+    count arrays of about size values, cut from the shapes of benchmark_arrays in turn
+    """
+    rng = np.random.RandomState(0)
+    shapes = list(benchmark_arrays(count * size).values())
+    sizes = rng.randint(size // 2, 3 * size // 2, size=count)
+    return [shapes[i % len(shapes)][i * size:i * size + sizes[i]] for i in range(count)]
+
+
+def main():
+    print('{:>8} {:>6} {:>14} {:>14} {:>9} {:>14} {:>14} {:>9} {:>14} {:>14}'.format(
+        'arrays', 'size', 'loop comp (s)', 'batch comp (s)', 'speedup', 'loop dec (s)', 'batch dec (s)', 'speedup',
+        'loop (B)', 'batch (B)'))
+    for count, size in [(1000, 16), (1000, 200), (10000, 64), (10000, 1000)]:
+        arrays = small_arrays(count, size)
+        compressed = [combined_integer_compression(arr) for arr in arrays]
+        batch = compress_many(arrays)
+        loop_compress = best_of(lambda: [combined_integer_compression(arr) for arr in arrays])
+        batch_compress = best_of(lambda: compress_many(arrays))
+        loop_decompress = best_of(lambda: [integer_decompression_from_transforms(c[0], c[2]) for c in compressed])
+        batch_decompress = best_of(lambda: decompress_many(batch))
+        loop_bytes = sum(c[0].nbytes + sum(t.key_values.nbytes for t in c[2] if hasattr(t, 'key_values'))
+                         for c in compressed)
+        print('{:>8} {:>6} {:>14.4f} {:>14.4f} {:>8.1f}x {:>14.4f} {:>14.4f} {:>8.1f}x {:>14} {:>14}'.format(
+            count, size, loop_compress, batch_compress, loop_compress / batch_compress, loop_decompress,
+            batch_decompress, loop_decompress / batch_decompress, loop_bytes, batch.nbytes))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,39 @@
+import numpy as np
+from fewerbytes.dictionaries import HashDictionary, integer_dictionary_compression
+from fewerbytes.integer_compression import integer_hash_compression
+from fewerbytes.serialization import dumps
+from benchmarks.benchmark_planner import best_of
+
+
+def hourly_batches(count: int, size: int) -> list:
+    """
+    Batches of a status-code like column, the same 40 distinct values in every batch
+    """
+    rng = np.random.RandomState(0)
+    codes = np.sort(rng.choice(np.arange(100, 600), size=40, replace=False)).astype(np.int64)
+    weights = rng.zipf(1.5, size=40).astype(np.float64)
+    return [rng.choice(codes, size=size, p=weights / weights.sum()) for _ in range(count)]
+
+
+def main():
+    print('{:>8} {:>10} {:>14} {:>16} {:>9} {:>12} {:>14}'.format(
+        'batches', 'size', 'hash (s)', 'dictionary (s)', 'speedup', 'hash (B)', 'dictionary (B)'))
+    for count, size in [(100, 1000), (100, 100000), (24, 1000000)]:
+        batches = hourly_batches(count, size)
+        dictionary = HashDictionary.train(batches[0])
+        hash_time = best_of(lambda: [integer_hash_compression(batch) for batch in batches])
+        dictionary_time = best_of(lambda: [
+            integer_dictionary_compression(batch, dictionary, extend=True) for batch in batches])
+        hash_bytes = 0
+        dictionary_bytes = 0
+        for batch in batches:
+            keys, _, transform = integer_hash_compression(batch)
+            hash_bytes += len(dumps(keys, [transform]))
+            keys, _, transform = integer_dictionary_compression(batch, dictionary, extend=True)
+            dictionary_bytes += len(dumps(keys, [transform]))
+        print('{:>8} {:>10} {:>14.4f} {:>16.4f} {:>8.1f}x {:>12} {:>14}'.format(
+            count, size, hash_time, dictionary_time, hash_time / dictionary_time, hash_bytes, dictionary_bytes))
+
+
+if __name__ == '__main__':
+    main()
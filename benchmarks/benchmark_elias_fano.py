@@ -0,0 +1,40 @@
+import numpy as np
+from fewerbytes.elias_fano import compressed_searchsorted, compressed_select, integer_elias_fano_compression
+from fewerbytes.integer_compression import combined_integer_compression
+from fewerbytes.integer_decompression import integer_decompression_from_transforms
+from fewerbytes.serialization import dumps
+from benchmarks.benchmark_planner import best_of
+
+QUERIES = 1000
+
+
+def sorted_arrays(size: int) -> dict:
+    rng = np.random.RandomState(0)
+    return {
+        'row ids': np.sort(rng.choice(10 * size, size, replace=False)),
+        'offsets': np.cumsum(rng.randint(1, 4096, size=size)),
+    }
+
+
+def main():
+    print('{:>8} {:>10} {:>14} {:>16} {:>22} {:>21} {:>21}'.format(
+        'array', 'size', 'combined (B)', 'elias-fano (B)', 'decompress+search (s)', 'compressed search (s)',
+        'compressed select (s)'))
+    rng = np.random.RandomState(1)
+    for size in [100000, 1000000, 10000000]:
+        for name, arr in sorted_arrays(size).items():
+            combined_arr, _, combined_transforms = combined_integer_compression(arr, bit_pack=True)
+            low_bits, _, transform = integer_elias_fano_compression(arr)
+            values = rng.randint(int(arr[0]), int(arr[-1]), size=QUERIES)
+            indices = rng.randint(0, size, size=QUERIES)
+            decompress_time = best_of(lambda: np.searchsorted(
+                integer_decompression_from_transforms(combined_arr, combined_transforms), values))
+            search_time = best_of(lambda: compressed_searchsorted(low_bits, [transform], values))
+            select_time = best_of(lambda: compressed_select(low_bits, [transform], indices))
+            print('{:>8} {:>10} {:>14} {:>16} {:>22.4f} {:>21.4f} {:>21.4f}'.format(
+                name, size, len(dumps(combined_arr, combined_transforms)), len(dumps(low_bits, [transform])),
+                decompress_time, search_time, select_time))
+
+
+if __name__ == '__main__':
+    main()
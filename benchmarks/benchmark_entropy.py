@@ -0,0 +1,34 @@
+import numpy as np
+from fewerbytes.compression_details import EntropyCodecs
+from fewerbytes.integer_compression import combined_integer_compression, ENTROPY_CODERS, ENTROPY_DEFAULT_LEVELS
+from fewerbytes.integer_decompression import integer_decompression_from_transforms
+from fewerbytes.serialization import dumps
+from benchmarks.benchmark_planner import best_of
+
+
+def integer_arrays(size: int) -> dict:
+    rng = np.random.RandomState(0)
+    return {
+        'sensor': 20000 + np.cumsum(rng.randint(-3, 4, size=size)),
+        'categories': rng.choice([3, 17, 400, 90000], size=size, p=[0.7, 0.2, 0.09, 0.01]),
+    }
+
+
+def main():
+    print('{:>10} {:>10} {:>6} {:>14} {:>10} {:>14} {:>14} {:>14}'.format(
+        'array', 'size', 'codec', 'combined (B)', 'codec (B)', 'both (B)', 'combined (s)', 'both (s)'))
+    for size in [100000, 1000000, 10000000]:
+        for name, arr in integer_arrays(size).items():
+            combined_arr, _, combined_transforms = combined_integer_compression(arr)
+            combined_time = best_of(lambda: integer_decompression_from_transforms(combined_arr, combined_transforms))
+            for codec in EntropyCodecs:
+                codec_bytes = len(ENTROPY_CODERS[codec][0](memoryview(arr), ENTROPY_DEFAULT_LEVELS[codec]))
+                entropy_arr, _, entropy_transforms = combined_integer_compression(arr, entropy=codec)
+                entropy_time = best_of(lambda: integer_decompression_from_transforms(entropy_arr, entropy_transforms))
+                print('{:>10} {:>10} {:>6} {:>14} {:>10} {:>14} {:>14.4f} {:>14.4f}'.format(
+                    name, size, codec.value, len(dumps(combined_arr, combined_transforms)), codec_bytes,
+                    len(dumps(entropy_arr, entropy_transforms)), combined_time, entropy_time))
+
+
+if __name__ == '__main__':
+    main()
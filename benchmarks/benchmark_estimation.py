@@ -0,0 +1,27 @@
+import timeit
+from fewerbytes.estimation import estimate_compression
+from fewerbytes.integer_compression import combined_integer_compression
+from benchmarks.benchmark_planner import benchmark_arrays
+
+
+def best_of(func, repeat: int = 3) -> float:
+    return min(timeit.repeat(func, number=1, repeat=repeat))
+
+
+def main():
+    size = 10000000
+    print('{:>16} {:>14} {:>14} {:>14} {:>14} {:>9}'.format(
+        'array', 'combined (B)', 'estimate (B)', 'combined (s)', 'estimate (s)', 'speedup'))
+    for name, arr in benchmark_arrays(size).items():
+        compressed, _, transforms = combined_integer_compression(arr)
+        combined_bytes = compressed.nbytes + sum(t.key_values.nbytes for t in transforms if hasattr(t, 'key_values'))
+        estimate = estimate_compression(arr, sample_fraction=0.01)
+        combined_time = best_of(lambda: combined_integer_compression(arr), repeat=1)
+        estimate_time = best_of(lambda: estimate_compression(arr, sample_fraction=0.01))
+        print('{:>16} {:>14} {:>14} {:>14.4f} {:>14.4f} {:>8.1f}x'.format(
+            name, combined_bytes, estimate.predicted_bytes, combined_time, estimate_time,
+            combined_time / estimate_time))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,64 @@
+import numpy as np
+from fewerbytes.compression_details import IntegerTransformTypes
+from fewerbytes.integer_compression import combined_integer_compression, integer_derivative_then_minimize_compression
+from fewerbytes.integer_decompression import (
+    DOWNCAST_PASSES,
+    compile_integer_decompression,
+    integer_decompression_from_transform,
+    integer_decompression_from_transforms
+)
+from benchmarks.benchmark_planner import best_of, benchmark_arrays
+
+# full-length passes of each transform decompressed on its own, most of them ending with a downcast
+STEPWISE_PASSES = {
+    IntegerTransformTypes.MINIMIZE: 1 + DOWNCAST_PASSES,
+    IntegerTransformTypes.DERIVATIVE: 2 + DOWNCAST_PASSES,
+    IntegerTransformTypes.HASH: 2 + DOWNCAST_PASSES,
+    IntegerTransformTypes.BLOCK_MINIMIZE: 2 + DOWNCAST_PASSES,
+    IntegerTransformTypes.RUN_LENGTH: 1,
+    IntegerTransformTypes.BIT_PACK: 1,
+}
+
+
+def stepwise_decompression(arr: np.array, transforms: list) -> np.array:
+    for transform in transforms:
+        arr = integer_decompression_from_transform(arr, transform)
+    return arr
+
+
+def derivative_chain(arr: np.array, depth: int = 3):
+    """
+    Derivative then minimize, repeated depth times
+    """
+    transforms = []
+    for _ in range(depth):
+        arr, _, derivative, minimize = integer_derivative_then_minimize_compression(arr)
+        transforms += [derivative] if minimize is None else [derivative, minimize]
+    return arr, None, transforms[::-1]
+
+
+def main():
+    print('{:>16} {:>10} {:>8} {:>9} {:>9} {:>14} {:>14} {:>14} {:>9}'.format(
+        'array', 'size', 'chain', 'stepwise', 'fused', 'stepwise (s)', 'fused (s)', 'out= (s)', 'speedup'))
+    for size in [100000, 1000000, 10000000]:
+        arrays = benchmark_arrays(size)
+        arrays['jerk'] = np.cumsum(arrays['acceleration'])
+        for name, original in arrays.items():
+            if name == 'jerk':
+                arr, _, transforms = derivative_chain(original)
+            else:
+                arr, _, transforms = combined_integer_compression(original, bit_pack=True)
+            chain = ''.join(transform.transform_type.value for transform in transforms)
+            stepwise_passes = sum(STEPWISE_PASSES[transform.transform_type] for transform in transforms)
+            fused_passes = compile_integer_decompression(transforms).passes
+            out = np.empty(len(original), dtype=original.dtype)
+            stepwise_time = best_of(lambda: stepwise_decompression(arr, transforms))
+            fused_time = best_of(lambda: integer_decompression_from_transforms(arr, transforms))
+            out_time = best_of(lambda: integer_decompression_from_transforms(arr, transforms, out=out))
+            print('{:>16} {:>10} {:>8} {:>9} {:>9} {:>14.4f} {:>14.4f} {:>14.4f} {:>8.1f}x'.format(
+                name, size, chain, stepwise_passes, fused_passes, stepwise_time, fused_time, out_time,
+                stepwise_time / fused_time))
+
+
+if __name__ == '__main__':
+    main()
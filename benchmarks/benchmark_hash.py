@@ -0,0 +1,68 @@
+import timeit
+import numpy as np
+from fewerbytes.types import NumpyType
+from fewerbytes.integer_compression import integer_hash_compression, downcast_integers
+from fewerbytes.integer_decompression import integer_hash_decompression
+
+
+def loop_hash_compression(arr: np.array) -> np.array:
+    """
+    Reference per-element implementation of the hash key lookup, kept for comparison
+    :param arr: numpy integer array
+    :return: array of keys
+    """
+    unique_values = np.unique(arr)
+    key_type = NumpyType.from_integer(len(unique_values) - 1)
+    hash_dict = {}
+    for i in range(len(unique_values)):
+        hash_dict[unique_values[i]] = i
+    key_array = np.zeros(arr.shape, dtype=key_type.to_dtype())
+    for i in range(len(key_array)):
+        key_array[i] = hash_dict[arr[i]]
+    return key_array
+
+
+def loop_hash_decompression(arr: np.array, key_values: np.array) -> np.array:
+    """
+    Reference per-element implementation of the hash decompression, kept for comparison
+    :param arr: array of keys
+    :param key_values: unique values
+    :return: decompressed array
+    """
+    ret_array = np.zeros(arr.shape, dtype=key_values.dtype)
+    for i in range(len(arr)):
+        ret_array[i] = key_values[arr[i]]
+    return downcast_integers(ret_array)[0]
+
+
+def best_of(func, repeat: int = 3) -> float:
+    return min(timeit.repeat(func, number=1, repeat=repeat))
+
+
+def main():
+    rng = np.random.RandomState(0)
+    print('{:>10} {:>12} {:>14} {:>14} {:>10}'.format('size', 'cardinality', 'loop (s)', 'vector (s)', 'speedup'))
+    for size in [1000, 10000, 100000, 1000000]:
+        for cardinality in [5, 200, 10000]:
+            values = rng.randint(0, 2 ** 40, size=cardinality, dtype=np.int64)
+            arr = values[rng.randint(0, cardinality, size=size)]
+            keys, _, transform = integer_hash_compression(arr)
+            if transform is None:
+                continue
+
+            def vector():
+                k, _, tr = integer_hash_compression(arr)
+                integer_hash_decompression(k, tr)
+
+            def loop():
+                loop_hash_decompression(loop_hash_compression(arr), transform.key_values)
+
+            vector_time = best_of(vector)
+            # the per-element version gets painfully slow, only time it on the smaller arrays
+            loop_time = best_of(loop, repeat=1) if size <= 100000 else float('nan')
+            print('{:>10} {:>12} {:>14.4f} {:>14.4f} {:>9.1f}x'.format(
+                size, cardinality, loop_time, vector_time, loop_time / vector_time))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,75 @@
+import logging
+import sys
+import numpy as np
+from fewerbytes.integer_compression import combined_integer_compression
+from fewerbytes.integer_decompression import integer_decompression_from_transforms
+from benchmarks.benchmark_planner import best_of
+
+# share of the time of compressing or decompressing a small array that disabled debug logging may take
+LOGGING_OVERHEAD_BUDGET = 0.05
+CALLS = 1000
+
+
+class CountingHandler(logging.Handler):
+    def __init__(self):
+        super().__init__(logging.DEBUG)
+        self.count = 0
+
+    def emit(self, record: logging.LogRecord):
+        self.count += 1
+
+
+def logging_calls(func) -> int:
+    """
+    Number of debug records func logs through the fewerbytes loggers
+    """
+    logger = logging.getLogger('fewerbytes')
+    handler = CountingHandler()
+    logger.addHandler(handler)
+    logger.setLevel(logging.DEBUG)
+    try:
+        func()
+    finally:
+        logger.removeHandler(handler)
+        logger.setLevel(logging.NOTSET)
+    return handler.count
+
+
+def disabled_call_seconds() -> float:
+    """
+    Time of one logger.debug call with lazy arguments while debug is disabled
+    """
+    logger = logging.getLogger('fewerbytes.benchmark')
+    loop = best_of(lambda: [(i, CALLS) for i in range(CALLS)], repeat=5)
+    return (best_of(lambda: [logger.debug('value %s of %s', i, CALLS) for i in range(CALLS)], repeat=5) - loop) / CALLS
+
+
+def main() -> int:
+    logging.getLogger().setLevel(logging.WARNING)
+    per_call = disabled_call_seconds()
+    print('disabled logger.debug call: {:.0f} ns, budget {:.0%} of each operation'.format(
+        per_call * 1e9, LOGGING_OVERHEAD_BUDGET))
+    print('{:>12} {:>8} {:>10} {:>14} {:>14} {:>10}'.format(
+        'operation', 'size', 'log calls', 'time (us)', 'logging (us)', 'share'))
+    over_budget = False
+    for size in [10, 100, 1000]:
+        arr = 1500000000 + 60 * np.arange(size) + np.random.RandomState(0).randint(0, 3, size=size)
+        compressed, _, transforms = combined_integer_compression(arr)
+        operations = {
+            'compress': lambda: combined_integer_compression(arr),
+            'decompress': lambda: integer_decompression_from_transforms(compressed, transforms),
+        }
+        for name, func in operations.items():
+            calls = logging_calls(func)
+            seconds = best_of(lambda: [func() for _ in range(100)], repeat=5) / 100
+            share = calls * per_call / seconds
+            over_budget = over_budget or share > LOGGING_OVERHEAD_BUDGET
+            print('{:>12} {:>8} {:>10} {:>14.1f} {:>14.1f} {:>9.1%}'.format(
+                name, size, calls, seconds * 1e6, calls * per_call * 1e6, share))
+    if over_budget:
+        print('logging overhead exceeds the budget')
+    return 1 if over_budget else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
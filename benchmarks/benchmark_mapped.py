@@ -0,0 +1,46 @@
+import os
+import tempfile
+import numpy as np
+from fewerbytes.chunked import chunked_integer_compression, chunked_integer_decompression
+from fewerbytes.mapped import dump_chunked, open_chunked
+from fewerbytes.serialization import dump, load
+from fewerbytes.integer_compression import combined_integer_compression
+from fewerbytes.integer_decompression import integer_decompression_from_transforms
+from benchmarks.benchmark_planner import best_of
+
+
+def read_whole(path: str, index: int):
+    """
+    Reads a file written by dump and decompresses all of it to get at one value
+    """
+    with open(path, 'rb') as fh:
+        arr, transforms = load(fh)
+    return integer_decompression_from_transforms(arr, transforms)[index]
+
+
+def main():
+    print('{:>10} {:>12} {:>14} {:>14} {:>14} {:>9} {:>14}'.format(
+        'size', 'file (B)', 'load+get (s)', 'open (s)', 'open+get (s)', 'speedup', 'open+all (s)'))
+    rng = np.random.RandomState(0)
+    with tempfile.TemporaryDirectory() as directory:
+        whole_path = os.path.join(directory, 'whole.fwb')
+        chunked_path = os.path.join(directory, 'chunked.fwbc')
+        for size in [1000000, 10000000, 50000000]:
+            original = np.cumsum(rng.randint(-50, 50, size=size)) + 10 ** 10
+            arr, _, transforms = combined_integer_compression(original)
+            with open(whole_path, 'wb') as fh:
+                dump(arr, transforms, fh)
+            with open(chunked_path, 'wb') as fh:
+                dump_chunked(chunked_integer_compression(original, chunk_size=1 << 16), fh)
+            index = size // 2
+            whole_time = best_of(lambda: read_whole(whole_path, index))
+            open_time = best_of(lambda: open_chunked(chunked_path))
+            get_time = best_of(lambda: open_chunked(chunked_path)[index])
+            all_time = best_of(lambda: chunked_integer_decompression(open_chunked(chunked_path)))
+            print('{:>10} {:>12} {:>14.5f} {:>14.5f} {:>14.5f} {:>8.1f}x {:>14.5f}'.format(
+                size, os.path.getsize(chunked_path), whole_time, open_time, get_time, whole_time / get_time,
+                all_time))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,39 @@
+import numpy as np
+from fewerbytes.integer_compression import downcast_integers, integer_minimize_compression
+from fewerbytes.reductions import min_max
+from benchmarks.benchmark_planner import best_of
+
+
+def separate_min_max(arr: np.array):
+    return np.min(arr), np.max(arr)
+
+
+def separate_minimize(arr: np.array):
+    """
+    The minimization as it was, an amin pass, the subtraction, then the two passes of the downcast
+    """
+    min_value = np.amin(arr)
+    shifted = arr - min_value
+    return shifted.astype(np.uint8) if np.max(shifted) < 256 and np.min(shifted) >= 0 else shifted
+
+
+def main():
+    print('{:>8} {:>10} {:>14} {:>14} {:>9} {:>14} {:>14} {:>9} {:>14}'.format(
+        'dtype', 'size', 'min, max (s)', 'min_max (s)', 'speedup', 'old min (s)', 'minimize (s)', 'speedup',
+        'downcast (s)'))
+    rng = np.random.RandomState(0)
+    for dtype in [np.uint8, np.int32, np.int64]:
+        for size in [10000, 1000000, 10000000, 50000000]:
+            arr = (rng.randint(0, 100, size=size) + 100).astype(dtype)
+            separate_time = best_of(lambda: separate_min_max(arr), repeat=5)
+            fused_time = best_of(lambda: min_max(arr), repeat=5)
+            old_minimize_time = best_of(lambda: separate_minimize(arr), repeat=5)
+            minimize_time = best_of(lambda: integer_minimize_compression(arr), repeat=5)
+            downcast_time = best_of(lambda: downcast_integers(arr), repeat=5)
+            print('{:>8} {:>10} {:>14.5f} {:>14.5f} {:>8.1f}x {:>14.5f} {:>14.5f} {:>8.1f}x {:>14.5f}'.format(
+                np.dtype(dtype).name, size, separate_time, fused_time, separate_time / fused_time,
+                old_minimize_time, minimize_time, old_minimize_time / minimize_time, downcast_time))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,39 @@
+import numpy as np
+from fewerbytes.integer_compression import (
+    integer_block_minimize_compression,
+    integer_minimize_compression,
+    integer_patched_compression
+)
+from fewerbytes.integer_decompression import integer_minimize_decompression, integer_patched_decompression
+from fewerbytes.serialization import dumps
+from benchmarks.benchmark_planner import best_of
+
+
+def sensor_arrays(size: int) -> dict:
+    rng = np.random.RandomState(0)
+    spikes = rng.choice(size, size // 1000, replace=False)
+    sensor = 20000 + rng.randint(0, 200, size=size)
+    sensor[spikes] = rng.randint(0, 2 ** 31, size=len(spikes))
+    dropouts = 20000 + rng.randint(0, 200, size=size)
+    dropouts[spikes] = -1
+    return {'spikes': sensor, 'dropouts': dropouts}
+
+
+def main():
+    print('{:>10} {:>10} {:>14} {:>14} {:>13} {:>15} {:>15}'.format(
+        'array', 'size', 'minimize (B)', 'block min (B)', 'patched (B)', 'minimize (s)', 'patched (s)'))
+    for size in [100000, 1000000, 10000000]:
+        for name, arr in sensor_arrays(size).items():
+            minimized, _, minimize_transform = integer_minimize_compression(arr)
+            block_minimized, _, block_transform = integer_block_minimize_compression(arr)
+            patched, _, patched_transform = integer_patched_compression(arr)
+            minimize_time = best_of(lambda: integer_minimize_decompression(minimized, minimize_transform))
+            patched_time = best_of(lambda: integer_patched_decompression(patched, patched_transform))
+            print('{:>10} {:>10} {:>14} {:>14} {:>13} {:>15.4f} {:>15.4f}'.format(
+                name, size, len(dumps(minimized, [minimize_transform])),
+                len(dumps(block_minimized, [block_transform])), len(dumps(patched, [patched_transform])),
+                minimize_time, patched_time))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,39 @@
+import timeit
+import numpy as np
+from fewerbytes.integer_compression import combined_integer_compression
+from fewerbytes.planner import planned_integer_compression
+
+
+def best_of(func, repeat: int = 3) -> float:
+    return min(timeit.repeat(func, number=1, repeat=repeat))
+
+
+def benchmark_arrays(size: int) -> dict:
+    rng = np.random.RandomState(0)
+    return {
+        'drift': np.cumsum(rng.randint(-50, 50, size=size)) + 10 ** 10,
+        'timestamps': 1500000000 + 60 * np.arange(size) + rng.randint(0, 3, size=size),
+        'low cardinality': rng.choice(np.array([10 ** 9, 2 * 10 ** 9, 3 * 10 ** 9, 7]), size=size),
+        'acceleration': np.cumsum(np.cumsum(rng.randint(-3, 4, size=size))),
+        'noise': rng.randint(0, 2 ** 40, size=size),
+    }
+
+
+def main():
+    print('{:>16} {:>10} {:>14} {:>14} {:>14} {:>14} {:>9}'.format(
+        'array', 'size', 'combined (B)', 'planned (B)', 'combined (s)', 'planned (s)', 'speedup'))
+    for size in [100000, 1000000, 10000000]:
+        for name, arr in benchmark_arrays(size).items():
+            combined_bytes = combined_integer_compression(arr)[0].nbytes
+            planned = planned_integer_compression(arr)
+            planned_bytes = planned[0].nbytes + sum(
+                t.key_values.nbytes for t in planned[2] if hasattr(t, 'key_values'))
+            combined_time = best_of(lambda: combined_integer_compression(arr))
+            planned_time = best_of(lambda: planned_integer_compression(arr))
+            print('{:>16} {:>10} {:>14} {:>14} {:>14.4f} {:>14.4f} {:>8.1f}x'.format(
+                name, size, combined_bytes, planned_bytes, combined_time, planned_time,
+                combined_time / planned_time))
+
+
+if __name__ == '__main__':
+    main()
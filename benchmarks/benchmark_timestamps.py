@@ -0,0 +1,39 @@
+import numpy as np
+from fewerbytes.integer_compression import combined_integer_compression
+from fewerbytes.integer_decompression import integer_decompression_from_transforms
+from fewerbytes.serialization import dumps
+from fewerbytes.timestamps import timestamp_compression
+from benchmarks.benchmark_planner import best_of
+
+
+def timestamp_arrays(size: int) -> dict:
+    rng = np.random.RandomState(0)
+    regular = 1500000000000 + 1000 * np.arange(size)
+    gaps = regular + 3600000 * np.cumsum(rng.random_sample(size) < 0.001)
+    return {
+        'regular': regular,
+        'gaps': gaps,
+        'jitter': regular + rng.randint(-2, 3, size=size),
+        'datetime gaps': gaps.astype('datetime64[ms]'),
+    }
+
+
+def main():
+    print('{:>14} {:>10} {:>14} {:>15} {:>14} {:>15}'.format(
+        'array', 'size', 'combined (B)', 'timestamps (B)', 'combined (s)', 'timestamps (s)'))
+    for size in [100000, 1000000, 10000000]:
+        for name, arr in timestamp_arrays(size).items():
+            timestamp_arr, _, timestamp_transforms = timestamp_compression(arr)
+            # combined_integer_compression takes integers only, datetime64 is viewed as int64 for it
+            combined_arr, _, combined_transforms = combined_integer_compression(
+                arr.view(np.int64), bit_pack=True)
+            combined_time = best_of(lambda: integer_decompression_from_transforms(combined_arr, combined_transforms))
+            timestamp_time = best_of(lambda: integer_decompression_from_transforms(
+                timestamp_arr, timestamp_transforms))
+            print('{:>14} {:>10} {:>14} {:>15} {:>14.4f} {:>15.4f}'.format(
+                name, size, len(dumps(combined_arr, combined_transforms)),
+                len(dumps(timestamp_arr, timestamp_transforms)), combined_time, timestamp_time))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,37 @@
+import numpy as np
+from fewerbytes.integer_compression import (
+    combined_integer_compression,
+    integer_derivative_compression,
+    integer_derivative_then_minimize_compression,
+    integer_minimize_compression
+)
+from benchmarks.benchmark_planner import best_of, benchmark_arrays
+
+
+def trial_minimize(arr: np.array):
+    """
+    The derivative followed by a trial minimization, kept only if it shrinks the type, as it was
+    """
+    elem_array, elem_array_type, elem_transform = integer_derivative_compression(arr)
+    em_array, em_array_type, min_transform = integer_minimize_compression(elem_array)
+    if em_array_type.is_smaller_than(elem_array_type):
+        return em_array, em_array_type, elem_transform, min_transform
+    return elem_array, elem_array_type, elem_transform, None
+
+
+def main():
+    print('{:>16} {:>10} {:>14} {:>14} {:>9} {:>16}'.format(
+        'array', 'size', 'trial (s)', 'extremes (s)', 'speedup', 'bit-packed (B)'))
+    for size in [100000, 1000000, 10000000]:
+        arrays = benchmark_arrays(size)
+        arrays['symmetric noise'] = np.cumsum(np.random.RandomState(0).randint(-5, 6, size=size)) + 10 ** 9
+        for name, arr in arrays.items():
+            trial_time = best_of(lambda: trial_minimize(arr))
+            extremes_time = best_of(lambda: integer_derivative_then_minimize_compression(arr))
+            packed_bytes = combined_integer_compression(arr, bit_pack=True)[0].nbytes
+            print('{:>16} {:>10} {:>14.5f} {:>14.5f} {:>8.1f}x {:>16}'.format(
+                name, size, trial_time, extremes_time, trial_time / extremes_time, packed_bytes))
+
+
+if __name__ == '__main__':
+    main()
@@ -2,14 +2,67 @@ import fewerbytes.compression_details as transforms
 from fewerbytes.types import NumpyType, NumpySizes, NumpyKinds
 from fewerbytes.integer_compression import (
     integer_minimize_compression,
+    integer_block_minimize_compression,
     integer_derivative_compression,
     integer_hash_compression,
+    combined_integer_compression,
+    integer_bitpack_compression,
+    integer_run_length_compression,
+    integer_zigzag_compression,
+    integer_sparse_compression,
+    integer_patched_compression,
+    integer_entropy_compression,
     downcast_integers
 )
 from fewerbytes.integer_decompression import (
     integer_minimize_decompression,
+    integer_block_minimize_decompression,
     integer_derivative_decompression,
     integer_hash_decompression,
+    integer_bitpack_decompression,
+    integer_run_length_decompression,
+    integer_zigzag_decompression,
+    integer_sparse_decompression,
+    integer_datetime_decompression,
+    integer_patched_decompression,
+    integer_elias_fano_decompression,
+    integer_entropy_decompression,
     integer_decompression_from_transform,
-    integer_decompression_from_transforms
+    integer_decompression_from_transforms,
+    compile_integer_decompression
+)
+from fewerbytes.serialization import dumps, loads, dump, load, dumps_dictionary, loads_dictionary
+from fewerbytes.chunked import ChunkedCompressedArray, chunked_integer_compression, chunked_integer_decompression
+from fewerbytes.streaming import StreamCompressor, StreamDecompressor
+from fewerbytes.planner import plan_integer_compression, planned_integer_compression
+from fewerbytes.estimation import estimate_compression
+from fewerbytes.float_compression import (
+    float_rounding_compression,
+    float_xor_delta_compression,
+    combined_float_compression
+)
+from fewerbytes.float_decompression import (
+    float_rounding_decompression,
+    float_xor_delta_decompression,
+    float_decompression_from_transform,
+    float_decompression_from_transforms
+)
+from fewerbytes.aggregates import Aggregates, compressed_aggregate, chunked_aggregate
+from fewerbytes.predicates import Predicates, Predicate, compressed_mask, compressed_where, chunked_mask, chunked_where
+from fewerbytes.reductions import min_max
+from fewerbytes.batched import CompressedBatch, compress_many, decompress_many
+from fewerbytes.mapped import MappedCompressedArray, dump_chunked, open_chunked, load_mapped
+from fewerbytes.dictionaries import (
+    HashDictionary,
+    integer_dictionary_compression,
+    register_dictionary,
+    unregister_dictionary,
+    get_dictionary
+)
+from fewerbytes.timestamps import timestamp_compression
+from fewerbytes.elias_fano import (
+    integer_elias_fano_compression,
+    compressed_select,
+    compressed_searchsorted,
+    compressed_rank
 )
@@ -0,0 +1,236 @@
+import logging
+import numpy as np
+from enum import Enum
+from typing import Union
+from fewerbytes.types import NumpyKinds
+from fewerbytes.exceptions import InvalidCompressedFormatException
+from fewerbytes.compression_details import IntegerTransformTypes, FloatTransformTypes
+from fewerbytes.dictionaries import resolve_dictionaries
+from fewerbytes.elias_fano import compressed_select
+from fewerbytes.integer_decompression import _accumulator_dtype
+from fewerbytes.float_decompression import float_decompression_from_transform, float_decompression_from_transforms
+
+logger = logging.getLogger(__name__)
+
+# number of deltas accumulated at a time when scanning a derivative, bounding the memory used
+DERIVATIVE_SCAN_BLOCK_SIZE = 1 << 16
+
+# transforms recording the number of values they decompress to
+_LENGTH_TRANSFORMS = (IntegerTransformTypes.BIT_PACK, IntegerTransformTypes.BLOCK_MINIMIZE,
+                      IntegerTransformTypes.SPARSE, IntegerTransformTypes.ELIAS_FANO, IntegerTransformTypes.ENTROPY)
+
+# transforms decompressing to as many values as they are given
+_COUNT_PRESERVING_TRANSFORMS = (IntegerTransformTypes.MINIMIZE, IntegerTransformTypes.HASH,
+                                IntegerTransformTypes.ZIGZAG, IntegerTransformTypes.PATCHED,
+                                IntegerTransformTypes.DATETIME, FloatTransformTypes.ROUNDING,
+                                FloatTransformTypes.XOR_DELTA)
+
+
+class Aggregates(Enum):
+    MIN = 'min'
+    MAX = 'max'
+    SUM = 'sum'
+    COUNT = 'count'
+    MEAN = 'mean'
+    FIRST = 'first'
+    LAST = 'last'
+
+
+def _python_number(value) -> Union[int, float]:
+    return value.item() if isinstance(value, np.generic) else value
+
+
+def _exact_sum(values: np.array) -> Union[int, float]:
+    """
+    Sum of an array without overflow. 64-bit integers are summed as their high and low 32-bit halves, which cannot
+    overflow a uint64 below 2 ** 32 values, and recombined as a python integer
+    :param values: numpy array
+    :return: sum, a python integer for integer arrays
+    """
+    if values.dtype.kind not in 'iu':
+        return _python_number(np.sum(values))
+    values = values.astype(np.int64 if values.dtype.kind == 'i' else np.uint64, copy=False)
+    unsigned = values.view(np.uint64)
+    total = (int(np.sum(unsigned >> np.uint64(32))) << 32) + int(np.sum(unsigned & np.uint64(0xffffffff)))
+    if values.dtype.kind == 'i':
+        total -= int(np.count_nonzero(values < 0)) << 64
+    return total
+
+
+def _direct_aggregate(arr: np.array, aggregate: Aggregates) -> Union[int, float]:
+    """
+    Computes an aggregate of an uncompressed array
+    :param arr: numpy array
+    :param aggregate: Aggregates
+    :return: aggregate value
+    """
+    if aggregate == Aggregates.COUNT:
+        return len(arr)
+    if len(arr) == 0:
+        raise ValueError('cannot compute the {} of an empty array'.format(aggregate.value))
+    if aggregate == Aggregates.MIN:
+        return _python_number(np.amin(arr))
+    if aggregate == Aggregates.MAX:
+        return _python_number(np.amax(arr))
+    if aggregate == Aggregates.SUM:
+        return _exact_sum(arr)
+    if aggregate == Aggregates.FIRST:
+        return _python_number(arr[0])
+    return _python_number(arr[-1])
+
+
+def _derivative_scan(deltas: np.array, transform) -> tuple:
+    """
+    Minimum, maximum and sum of the values a derivative array decompresses to, accumulated block by block
+    :param deltas: derivative array
+    :param transform: IntegerElementWiseTransformation
+    :return: tuple of minimum, maximum and sum
+    """
+    reference_value = _python_number(transform.reference_value)
+    accumulator_dtype = np.uint64 if transform.source_kind == NumpyKinds.UNSIGNED else \
+        _accumulator_dtype(deltas, reference_value)
+    running = accumulator_dtype(reference_value)
+    minimum, maximum, total = running, running, _python_number(running)
+    for start in range(0, len(deltas), DERIVATIVE_SCAN_BLOCK_SIZE):
+        values = np.cumsum(deltas[start:start + DERIVATIVE_SCAN_BLOCK_SIZE].astype(accumulator_dtype)) + running
+        minimum = min(minimum, np.amin(values))
+        maximum = max(maximum, np.amax(values))
+        total += _exact_sum(values)
+        running = values[-1]
+    return _python_number(minimum), _python_number(maximum), total
+
+
+def _derivative_value(value: int, transform) -> int:
+    """
+    The deltas of a derivative are taken modulo 2 ** 64, a value summed from them is brought back into the range of
+    the differenced array
+    :param value: reference value plus a sum of deltas
+    :param transform: IntegerElementWiseTransformation
+    :return: value in the range of uint64 for unsigned sources, of int64 for signed ones, unchanged if unknown
+    """
+    if transform.source_kind == NumpyKinds.UNSIGNED:
+        return value % (1 << 64)
+    if transform.source_kind == NumpyKinds.INTEGER:
+        return (value + (1 << 63)) % (1 << 64) - (1 << 63)
+    return value
+
+
+def _hash_aggregate(keys: np.array, key_values: np.array, aggregate: Aggregates) -> Union[int, float]:
+    """
+    Computes an aggregate of a hashed array from the counts of its keys
+    :param keys: array of keys
+    :param key_values: value of each key
+    :param aggregate: MIN, MAX or SUM
+    :return: aggregate value
+    """
+    if len(keys) == 0:
+        raise ValueError('cannot compute the {} of an empty array'.format(aggregate.value))
+    key_counts = np.bincount(keys, minlength=len(key_values))
+    if len(key_counts) > len(key_values):
+        raise InvalidCompressedFormatException('hashed array has keys outside of its {} key values'.format(
+            len(key_values)))
+    if aggregate == Aggregates.SUM and key_values.dtype.kind in 'iu':
+        # python integers, a 64-bit dot product would wrap or, for uint64 values, round through float64
+        return int(np.dot(key_counts.astype(object), key_values.astype(object)))
+    if aggregate == Aggregates.SUM:
+        return _python_number(np.dot(key_counts, key_values))
+    present_values = key_values[key_counts > 0]
+    return _python_number(np.amin(present_values) if aggregate == Aggregates.MIN else np.amax(present_values))
+
+
+def compressed_aggregate(arr: np.array, transforms: list, aggregate: Union[Aggregates, str],
+                         dictionaries: Union[dict, None] = None) -> Union[int, float]:
+    """
+    Computes an aggregate of the decompressed array from its compressed form. Minimize and rounding offsets,
+    hash and dictionary key counts, run lengths, and block-wise derivative scans are used instead of materializing
+    the decompressed array; other transforms are decompressed, except for counts which no transform needs undone.
+    Integer sums are exact python integers
+    :param arr: compressed array
+    :param transforms: list of transforms, in the order they are to be undone
+    :param aggregate: Aggregates or its value, e.g. 'sum'
+    :param dictionaries: optional mapping of dictionary ids to HashDictionary for dictionary transforms, the
+        registered dictionaries are searched after it
+    :return: aggregate value
+    """
+    aggregate = Aggregates(aggregate)
+    transforms = resolve_dictionaries(transforms, dictionaries)
+    if aggregate == Aggregates.MEAN:
+        return compressed_aggregate(arr, transforms, Aggregates.SUM) / \
+            compressed_aggregate(arr, transforms, Aggregates.COUNT)
+    if len(transforms) == 0:
+        return _direct_aggregate(arr, aggregate)
+    transform, inner = transforms[-1], transforms[:-1]
+    transform_type = transform.transform_type
+    logger.debug('computing %s through %s', aggregate.value, transform)
+
+    if aggregate == Aggregates.COUNT and transform_type in _LENGTH_TRANSFORMS:
+        return transform.length
+    if aggregate == Aggregates.COUNT and transform_type in _COUNT_PRESERVING_TRANSFORMS:
+        return compressed_aggregate(arr, inner, aggregate)
+
+    if transform_type == IntegerTransformTypes.MINIMIZE:
+        reference_value = _python_number(transform.reference_value)
+        if aggregate == Aggregates.SUM:
+            return reference_value * compressed_aggregate(arr, inner, Aggregates.COUNT) + \
+                compressed_aggregate(arr, inner, aggregate)
+        return reference_value + compressed_aggregate(arr, inner, aggregate)
+
+    if transform_type == FloatTransformTypes.ROUNDING:
+        return compressed_aggregate(arr, inner, aggregate) / 10.0 ** transform.decimals
+
+    if transform_type == IntegerTransformTypes.RUN_LENGTH:
+        if aggregate == Aggregates.COUNT:
+            return _python_number(np.sum(transform.run_lengths, dtype=np.int64))
+        if aggregate == Aggregates.SUM:
+            return _python_number(np.dot(float_decompression_from_transforms(arr, inner),
+                                         transform.run_lengths.astype(np.int64)))
+        return compressed_aggregate(arr, inner, aggregate)
+
+    if transform_type == IntegerTransformTypes.HASH:
+        if aggregate in (Aggregates.FIRST, Aggregates.LAST):
+            return _python_number(transform.key_values[compressed_aggregate(arr, inner, aggregate)])
+        return _hash_aggregate(float_decompression_from_transforms(arr, inner), transform.key_values, aggregate)
+
+    if transform_type == IntegerTransformTypes.DERIVATIVE:
+        reference_value = _python_number(transform.reference_value)
+        if aggregate == Aggregates.COUNT:
+            return compressed_aggregate(arr, inner, aggregate) + 1
+        if aggregate == Aggregates.FIRST:
+            return reference_value
+        if compressed_aggregate(arr, inner, Aggregates.COUNT) == 0:
+            return _direct_aggregate(np.array([reference_value]), aggregate)
+        if aggregate == Aggregates.LAST:
+            return _derivative_value(reference_value + compressed_aggregate(arr, inner, Aggregates.SUM), transform)
+        minimum, maximum, total = _derivative_scan(float_decompression_from_transforms(arr, inner), transform)
+        return {Aggregates.MIN: minimum, Aggregates.MAX: maximum, Aggregates.SUM: total}[aggregate]
+
+    if transform_type == IntegerTransformTypes.ELIAS_FANO and len(inner) == 0 and aggregate != Aggregates.SUM:
+        # the values are sorted, the first is the minimum and the last the maximum
+        return compressed_select(arr, [transform], 0 if aggregate in (Aggregates.FIRST, Aggregates.MIN) else -1)
+
+    logger.debug('no shortcut for %s through %s, decompressing', aggregate.value, transform)
+    return _direct_aggregate(
+        float_decompression_from_transform(float_decompression_from_transforms(arr, inner), transform), aggregate)
+
+
+def chunked_aggregate(chunked, aggregate: Union[Aggregates, str]) -> Union[int, float]:
+    """
+    Computes an aggregate of a ChunkedCompressedArray by combining the aggregates of its chunks
+    :param chunked: ChunkedCompressedArray
+    :param aggregate: Aggregates or its value, e.g. 'sum'
+    :return: aggregate value
+    """
+    aggregate = Aggregates(aggregate)
+    if aggregate == Aggregates.MEAN:
+        return chunked_aggregate(chunked, Aggregates.SUM) / chunked_aggregate(chunked, Aggregates.COUNT)
+    chunks = [chunk for chunk in chunked.chunks if chunk.length > 0]
+    if aggregate == Aggregates.COUNT:
+        return sum(chunk.length for chunk in chunks)
+    if len(chunks) == 0:
+        raise ValueError('cannot compute the {} of an empty array'.format(aggregate.value))
+    if aggregate == Aggregates.FIRST:
+        return compressed_aggregate(chunks[0].array, chunks[0].transforms, aggregate)
+    if aggregate == Aggregates.LAST:
+        return compressed_aggregate(chunks[-1].array, chunks[-1].transforms, aggregate)
+    values = [compressed_aggregate(chunk.array, chunk.transforms, aggregate) for chunk in chunks]
+    return {Aggregates.MIN: min, Aggregates.MAX: max, Aggregates.SUM: sum}[aggregate](values)
@@ -0,0 +1,234 @@
+import logging
+import numpy as np
+from typing import Tuple, Union
+from fewerbytes.types import NumpyType, NumpyKinds, NumpySizes
+from fewerbytes.compression_details import IntegerElementWiseTransformation, IntegerMinimizeTransformation
+
+logger = logging.getLogger(__name__)
+
+# bytes per value of the payloads, and the largest span of values each of them holds
+PAYLOAD_WIDTHS = np.array([1, 2, 4, 8], dtype=np.int64)
+_PAYLOAD_SPANS = np.array([(1 << 8) - 1, (1 << 16) - 1, (1 << 32) - 1], dtype=np.uint64)
+_REFERENCE_BYTES = 8
+
+
+class CompressedBatch:
+    def __init__(self, lengths: np.array, orders: np.array, minimums: np.array, references: np.array,
+                 widths: np.array, payloads: dict, dtype):
+        """
+        Many small integer arrays compressed together. Every segment is derived orders[i] times then minimized, the
+        derivative references of all segments are concatenated in references, and the minimized values of the
+        segments stored with the same width are concatenated in payloads[width]
+        :param lengths: number of values of each segment
+        :param orders: number of derivatives taken of each segment
+        :param minimums: minimum subtracted from each segment after its derivatives
+        :param references: int64 array of the derivative references, orders[i] per segment
+        :param widths: bytes per value of the payload of each segment, one of PAYLOAD_WIDTHS
+        :param payloads: dict of width to the unsigned array of the payloads stored with that width
+        :param dtype: dtype of the original arrays
+        """
+        self.lengths = lengths
+        self.orders = orders
+        self.minimums = minimums
+        self.references = references
+        self.widths = widths
+        self.payloads = payloads
+        self.dtype = np.dtype(dtype)
+        self._reference_offsets = None
+        self._payload_offsets = None
+        return
+
+    def __repr__(self):
+        return '<{}, {} segments={}, values={}, nbytes={}>'.format(
+            self.__class__.__name__, hex(id(self)), len(self), int(np.sum(self.lengths)), self.nbytes)
+
+    def __len__(self):
+        return len(self.lengths)
+
+    @property
+    def nbytes(self) -> int:
+        """
+        :return: bytes of the payloads, references and per-segment metadata
+        """
+        metadata = self.lengths.nbytes + self.orders.nbytes + self.minimums.nbytes + self.widths.nbytes
+        return metadata + self.references.nbytes + sum(payload.nbytes for payload in self.payloads.values())
+
+    @property
+    def reference_offsets(self) -> np.array:
+        """
+        :return: start of the references of each segment, plus the total
+        """
+        if self._reference_offsets is None:
+            self._reference_offsets = _offsets(self.orders)
+        return self._reference_offsets
+
+    @property
+    def payload_offsets(self) -> np.array:
+        """
+        :return: start of each segment in the payload of its width
+        """
+        if self._payload_offsets is None:
+            self._payload_offsets = np.zeros(len(self), dtype=np.int64)
+            counts = self.lengths - self.orders
+            for width in self.payloads:
+                in_width = self.widths == width
+                self._payload_offsets[in_width] = _offsets(counts[in_width])[:-1]
+        return self._payload_offsets
+
+    def segment(self, index: int) -> Tuple[np.array, NumpyType, list]:
+        """
+        One segment in the form of the other compressions, for integer_decompression_from_transforms or dumps
+        :param index: index of the segment
+        :return: tuple of the compressed array, its NumpyType and the list of transforms in the order they are to be
+            undone
+        """
+        width = int(self.widths[index])
+        start = int(self.payload_offsets[index])
+        arr = self.payloads[width][start:start + int(self.lengths[index] - self.orders[index])]
+        references = self.references[self.reference_offsets[index]:self.reference_offsets[index + 1]]
+        transforms = [IntegerMinimizeTransformation(self.minimums[index])] + \
+            [IntegerElementWiseTransformation(reference) for reference in references[::-1]]
+        return arr, NumpyType(NumpyKinds.UNSIGNED, NumpySizes.from_dtype(arr.dtype)), transforms
+
+
+def _offsets(lengths: np.array) -> np.array:
+    offsets = np.zeros(len(lengths) + 1, dtype=np.int64)
+    np.cumsum(lengths, out=offsets[1:])
+    return offsets
+
+
+def _flatten(arrays: Union[list, np.array], offsets: Union[np.array, None]) -> Tuple[np.array, np.array]:
+    """
+    :param arrays: list of arrays, or the concatenated values when offsets is given
+    :param offsets: start of each array in arrays plus the total, or None
+    :return: tuple of the concatenated values and the offsets
+    """
+    if offsets is None:
+        offsets = _offsets([len(arr) for arr in arrays])
+        values = np.concatenate(arrays) if len(arrays) > 0 else np.zeros(0, dtype=np.int64)
+        return values, offsets
+    offsets = np.asarray(offsets, dtype=np.int64)
+    if len(offsets) == 0 or offsets[0] != 0 or offsets[-1] != len(arrays) or np.any(np.diff(offsets) < 0):
+        raise ValueError('offsets must rise from 0 to the number of values, {}'.format(len(arrays)))
+    return np.asarray(arrays), offsets
+
+
+def _positions(lengths: np.array, offsets: np.array) -> np.array:
+    """
+    :return: index of every value within its segment
+    """
+    return np.arange(offsets[-1], dtype=np.int64) - np.repeat(offsets[:-1], lengths)
+
+
+def compress_many(arrays: Union[list, np.array], offsets: Union[np.array, None] = None,
+                  max_derivatives: int = 3) -> CompressedBatch:
+    """
+    Compresses many small integer arrays at once. For every segment, derivatives of order 0 to max_derivatives are
+    followed by a minimization, and the order needing the fewest bytes is kept. The statistics of all segments are
+    computed together with reduceat, so the cost per segment is a few vectorized operations rather than a call
+    :param arrays: list of integer arrays, or the concatenated values when offsets is given
+    :param offsets: start of each array in the values plus the number of values, for ragged input
+    :param max_derivatives: highest derivative order tried
+    :return: CompressedBatch
+    """
+    values, offsets = _flatten(arrays, offsets)
+    if values.dtype.kind not in 'iu':
+        raise ValueError('expecting integer arrays, got dtype {}'.format(values.dtype))
+    if values.dtype == np.uint64 and len(values) > 0 and values.max() > np.iinfo(np.int64).max:
+        raise ValueError('values above the int64 range cannot be compressed in batches')
+    lengths = np.diff(offsets)
+    logger.debug('compressing %s arrays of %s values', len(lengths), len(values))
+    dtype = values.dtype
+    values = values.astype(np.int64)
+    position = _positions(lengths, offsets)
+    starts = offsets[:-1][lengths > 0]
+    filled = lengths[lengths > 0]
+
+    # level k holds the references of the segments in its first k positions and their k-th derivative after them
+    levels = [values]
+    for order in range(1, max_derivatives + 1):
+        previous = levels[-1]
+        derivative = previous.copy()
+        np.subtract(previous[1:], previous[:-1], out=derivative[1:])
+        levels.append(np.where(position >= order, derivative, previous))
+
+    int64 = np.iinfo(np.int64)
+    costs = np.full((max_derivatives + 1, len(starts)), np.iinfo(np.int64).max, dtype=np.int64)
+    minimums = np.zeros((max_derivatives + 1, len(starts)), dtype=np.int64)
+    widths = np.ones((max_derivatives + 1, len(starts)), dtype=np.int64)
+    for order, level in enumerate(levels):
+        data = position >= order
+        if len(starts) == 0:
+            break
+        minimums[order] = np.minimum.reduceat(np.where(data, level, int64.max), starts)
+        maximums = np.maximum.reduceat(np.where(data, level, int64.min), starts)
+        # the span of wrapped-around differences is still right modulo 2 ** 64
+        spans = (maximums - minimums[order]).view(np.uint64)
+        widths[order] = PAYLOAD_WIDTHS[np.searchsorted(_PAYLOAD_SPANS, spans)]
+        costs[order] = np.where(filled > order, (filled - order) * widths[order] + order * _REFERENCE_BYTES,
+                                int64.max)
+
+    segment_orders = np.zeros(len(lengths), dtype=np.int64)
+    segment_minimums = np.zeros(len(lengths), dtype=np.int64)
+    segment_widths = np.ones(len(lengths), dtype=np.int64)
+    if len(starts) > 0:
+        best = np.argmin(costs, axis=0)
+        columns = np.arange(len(starts))
+        segment_orders[lengths > 0] = best
+        segment_minimums[lengths > 0] = minimums[best, columns]
+        segment_widths[lengths > 0] = widths[best, columns]
+
+    value_orders = np.repeat(segment_orders, lengths)
+    chosen = np.stack(levels)[value_orders, np.arange(len(values))] if len(values) > 0 else values
+    data = position >= value_orders
+    references = chosen[~data]
+    shifted = (chosen - np.repeat(segment_minimums, lengths)).view(np.uint64)
+    value_widths = np.repeat(segment_widths, lengths)
+    payloads = {}
+    for width in PAYLOAD_WIDTHS.tolist():
+        in_width = data & (value_widths == width)
+        if np.any(segment_widths == width):
+            payloads[width] = shifted[in_width].astype('u{}'.format(width))
+    return CompressedBatch(lengths, segment_orders.astype(np.uint8), segment_minimums, references,
+                           segment_widths.astype(np.uint8), payloads, dtype)
+
+
+def decompress_many(batch: CompressedBatch, ragged: bool = False) -> Union[list, Tuple[np.array, np.array]]:
+    """
+    Decompresses every segment of a batch at once, undoing the derivatives of all segments with one running sum per
+    order
+    :param batch: CompressedBatch
+    :param ragged: return the concatenated values and their offsets instead of a list of arrays
+    :return: list of arrays, or tuple of the concatenated values and the offsets
+    """
+    lengths = batch.lengths
+    offsets = _offsets(lengths)
+    logger.debug('decompressing %s arrays of %s values', len(lengths), offsets[-1])
+    starts = offsets[:-1][lengths > 0]
+    orders = batch.orders[lengths > 0]
+    max_order = int(orders.max()) if len(orders) > 0 else 0
+    # the references sit in the first orders[i] positions of each segment
+    data = np.ones(offsets[-1], dtype=bool)
+    for position in range(max_order):
+        data[starts[orders > position] + position] = False
+    values = np.empty(offsets[-1], dtype=np.int64)
+    for width, payload in batch.payloads.items():
+        in_width = data if len(batch.payloads) == 1 else data & np.repeat(batch.widths == width, lengths)
+        values[in_width] = payload.view(np.int64) if width == 8 else payload
+    values += np.repeat(batch.minimums, lengths)
+    values[~data] = batch.references
+    for order in range(max_order, 0, -1):
+        # the running sum of derivative order starts at its reference, in position order - 1
+        region = np.repeat(batch.orders >= order, lengths)
+        for position in range(order - 1):
+            region[starts[orders >= order] + position] = False
+        deltas = np.where(region, values, 0)
+        # the running sum restarts at every segment once the total of the segment before it is taken off
+        totals = np.add.reduceat(deltas, starts)
+        deltas[starts[1:]] -= totals[:-1]
+        np.copyto(values, np.cumsum(deltas), where=region)
+    values = values.astype(batch.dtype, copy=False)
+    if ragged:
+        return values, offsets
+    bounds = offsets.tolist()
+    return [values[start:end] for start, end in zip(bounds[:-1], bounds[1:])]
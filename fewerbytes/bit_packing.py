@@ -0,0 +1,201 @@
+import numpy as np
+from typing import Union
+from fewerbytes.types import NumpyType
+
+# number of values packed per pass, a multiple of 8 so every chunk starts on a byte boundary
+BIT_PACK_CHUNK_SIZE = 65536
+
+# values are laid out most significant bit first, each value taking exactly bit_width bits
+_BITS_PER_VALUE = 64
+
+# widest values read by shifting the bytes they span into a uint64, wider ones starting mid-byte span 9 bytes
+_SHIFTED_MAX_BIT_WIDTH = 57
+
+
+def _validate_bit_width(bit_width: int):
+    if bit_width < 1 or bit_width > _BITS_PER_VALUE:
+        raise ValueError('bit_width must be between 1 and {}, got {}'.format(_BITS_PER_VALUE, bit_width))
+    return
+
+
+def _word_bits(bit_width: int) -> int:
+    """
+    :param bit_width: bits per value
+    :return: bits of the smallest unsigned type holding bit_width bits, values are laid out in it one bit per byte
+    """
+    return NumpyType.from_integer((1 << bit_width) - 1).size.value
+
+
+def packed_length(count: int, bit_width: int) -> int:
+    """
+    Number of bytes needed to pack count values of bit_width bits
+    :param count: number of values
+    :param bit_width: bits per value
+    :return: number of bytes
+    """
+    return (count * bit_width + 7) // 8
+
+
+def pack_bits(arr: np.array, bit_width: int) -> np.array:
+    """
+    Packs non-negative integers into a contiguous stream of bit_width-bit values
+    :param arr: numpy array of non-negative integers, each smaller than 2 ** bit_width
+    :param bit_width: bits per value, 1 to 64
+    :return: numpy uint8 array of packed bits
+    """
+    _validate_bit_width(bit_width)
+    word_bits = _word_bits(bit_width)
+    values = arr.ravel().astype('>u{}'.format(word_bits // 8))
+    packed = np.empty(packed_length(len(values), bit_width), dtype=np.uint8)
+    chunk_bytes = BIT_PACK_CHUNK_SIZE * bit_width // 8
+    for i, start in enumerate(range(0, len(values), BIT_PACK_CHUNK_SIZE)):
+        chunk = values[start:start + BIT_PACK_CHUNK_SIZE]
+        bits = np.unpackbits(chunk.view(np.uint8).reshape(-1, word_bits // 8), axis=1)[:, word_bits - bit_width:]
+        chunk_packed = np.packbits(bits.ravel())
+        packed[i * chunk_bytes:i * chunk_bytes + len(chunk_packed)] = chunk_packed
+    return packed
+
+
+def unpack_bits(packed: np.array, bit_width: int, count: int, out: Union[np.array, None] = None) -> np.array:
+    """
+    Unpacks a stream of bit_width-bit values
+    :param packed: numpy uint8 array produced by pack_bits
+    :param bit_width: bits per value, 1 to 64
+    :param count: number of values packed
+    :param out: optional array of count values to unpack into, in its own dtype
+    :return: numpy array of the smallest unsigned type holding bit_width bits, out if given
+    """
+    _validate_bit_width(bit_width)
+    if len(packed) < packed_length(count, bit_width):
+        raise ValueError('packed array of {} bytes cannot hold {} values of {} bits'.format(
+            len(packed), count, bit_width))
+    if out is None:
+        ret_array = np.empty(count, dtype=NumpyType.from_integer((1 << bit_width) - 1).to_dtype())
+    elif out.shape != (count,):
+        raise ValueError('out has shape {}, expecting ({},)'.format(out.shape, count))
+    else:
+        ret_array = out
+    word_bits = _word_bits(bit_width)
+    chunk_bytes = BIT_PACK_CHUNK_SIZE * bit_width // 8
+    chunk_first_bits = np.arange(BIT_PACK_CHUNK_SIZE, dtype=np.int64) * bit_width
+    for i, start in enumerate(range(0, count, BIT_PACK_CHUNK_SIZE)):
+        chunk_count = min(BIT_PACK_CHUNK_SIZE, count - start)
+        chunk = packed[i * chunk_bytes:i * chunk_bytes + packed_length(chunk_count, bit_width)]
+        if bit_width <= _SHIFTED_MAX_BIT_WIDTH:
+            ret_array[start:start + chunk_count] = _values_at_bits(chunk, bit_width, chunk_first_bits[:chunk_count])
+            continue
+        bits = np.zeros((chunk_count, word_bits), dtype=np.uint8)
+        bits[:, word_bits - bit_width:] = np.unpackbits(chunk)[:chunk_count * bit_width].reshape(
+            chunk_count, bit_width)
+        ret_array[start:start + chunk_count] = np.packbits(bits, axis=1).view('>u{}'.format(word_bits // 8)).ravel()
+    return ret_array
+
+
+def _values_at_bits(packed: np.array, bit_width: int, first_bits: np.array) -> np.array:
+    """
+    Reads the values starting at some bits of a stream of bit_width-bit values
+    :param packed: numpy uint8 array produced by pack_bits
+    :param bit_width: bits per value, 1 to 64
+    :param first_bits: numpy int64 array of the first bit of each value, in bounds
+    :return: numpy uint64 array of the values
+    """
+    if len(first_bits) == 0:
+        return np.zeros(0, dtype=np.uint64)
+    # a value starting anywhere in a byte spans at most num_bytes bytes, those past the end are clipped and only hold
+    # bits after the value
+    num_bytes = (bit_width + 14) // 8
+    byte_positions = first_bits // 8
+    if bit_width <= _SHIFTED_MAX_BIT_WIDTH:
+        values = np.zeros(len(first_bits), dtype=np.uint64)
+        for i in range(num_bytes):
+            values <<= np.uint64(8)
+            values |= np.take(packed, byte_positions + i, mode='clip')
+        values >>= np.uint64(8 * num_bytes - bit_width) - (first_bits % 8).astype(np.uint64)
+        values &= np.uint64((1 << bit_width) - 1)
+        return values
+    bits = np.unpackbits(np.take(packed, byte_positions[:, np.newaxis] + np.arange(num_bytes), mode='clip'), axis=1)
+    value_bits = np.zeros((len(first_bits), _BITS_PER_VALUE), dtype=np.uint8)
+    value_bits[:, _BITS_PER_VALUE - bit_width:] = np.take_along_axis(
+        bits, (first_bits % 8)[:, np.newaxis] + np.arange(bit_width, dtype=np.int64), axis=1)
+    return np.packbits(value_bits, axis=1).view('>u8').ravel().astype(np.uint64)
+
+
+def unpack_bits_at(packed: np.array, bit_width: int, indices: np.array) -> np.array:
+    """
+    Unpacks the values at some indices of a stream of bit_width-bit values, without unpacking the others
+    :param packed: numpy uint8 array produced by pack_bits
+    :param bit_width: bits per value, 1 to 64
+    :param indices: numpy integer array of indices of the values, in bounds
+    :return: numpy uint64 array of the values
+    """
+    _validate_bit_width(bit_width)
+    return _values_at_bits(packed, bit_width, indices.astype(np.int64) * bit_width)
+
+
+def bit_lengths(arr: np.array) -> np.array:
+    """
+    Vectorized int.bit_length of non-negative integers
+    :param arr: numpy array of non-negative integers
+    :return: numpy uint8 array with the number of bits each value needs, 0 for 0
+    """
+    powers_of_two = np.left_shift(np.uint64(1), np.arange(_BITS_PER_VALUE, dtype=np.uint64))
+    return np.searchsorted(powers_of_two, arr.astype(np.uint64), side='right').astype(np.uint8)
+
+
+def block_byte_offsets(bit_widths: np.array, block_size: int) -> np.array:
+    """
+    Byte offset of each block in a stream of blocks packed at their own widths
+    :param bit_widths: bits per value of each block
+    :param block_size: number of values per block, a multiple of 8
+    :return: numpy int64 array of num_blocks + 1 offsets, the last one being the total length
+    """
+    offsets = np.zeros(len(bit_widths) + 1, dtype=np.int64)
+    np.cumsum(bit_widths.astype(np.int64) * (block_size // 8), out=offsets[1:])
+    return offsets
+
+
+def _block_byte_positions(starts: np.array, num_bytes: int) -> np.array:
+    return (starts[:, np.newaxis] + np.arange(num_bytes, dtype=np.int64)).ravel()
+
+
+def pack_blocks(blocks: np.array, bit_widths: np.array) -> np.array:
+    """
+    Packs each row of blocks at its own bit width, one pack_bits call per distinct width
+    :param blocks: 2d numpy array of non-negative integers, one block per row, row length a multiple of 8
+    :param bit_widths: bits per value of each block, 0 stores nothing
+    :return: numpy uint8 array of packed blocks laid out one after the other
+    """
+    num_blocks, block_size = blocks.shape
+    if block_size % 8 != 0:
+        raise ValueError('block size must be a multiple of 8, got {}'.format(block_size))
+    offsets = block_byte_offsets(bit_widths, block_size)
+    packed = np.empty(offsets[-1], dtype=np.uint8)
+    for bit_width in np.unique(bit_widths):
+        if bit_width == 0:
+            continue
+        selected = np.nonzero(bit_widths == bit_width)[0]
+        positions = _block_byte_positions(offsets[selected], block_size * int(bit_width) // 8)
+        packed[positions] = pack_bits(blocks[selected], int(bit_width))
+    return packed
+
+
+def unpack_blocks(packed: np.array, bit_widths: np.array, block_size: int) -> np.array:
+    """
+    Unpacks blocks produced by pack_blocks
+    :param packed: numpy uint8 array of packed blocks
+    :param bit_widths: bits per value of each block
+    :param block_size: number of values per block
+    :return: 2d numpy uint64 array, one block per row
+    """
+    offsets = block_byte_offsets(bit_widths, block_size)
+    if len(packed) < offsets[-1]:
+        raise ValueError('packed array of {} bytes cannot hold blocks of {} bytes'.format(len(packed), offsets[-1]))
+    blocks = np.zeros((len(bit_widths), block_size), dtype=np.uint64)
+    for bit_width in np.unique(bit_widths):
+        if bit_width == 0:
+            continue
+        selected = np.nonzero(bit_widths == bit_width)[0]
+        positions = _block_byte_positions(offsets[selected], block_size * int(bit_width) // 8)
+        blocks[selected] = unpack_bits(packed[positions], int(bit_width), len(selected) * block_size).reshape(
+            len(selected), block_size)
+    return blocks
@@ -0,0 +1,220 @@
+import logging
+import numpy as np
+from concurrent.futures import Executor, ThreadPoolExecutor, ProcessPoolExecutor
+from typing import Tuple, Union
+from fewerbytes.types import NumpyType
+from fewerbytes.reductions import min_max
+from fewerbytes.integer_compression import combined_integer_compression
+from fewerbytes.integer_decompression import integer_decompression_from_transforms
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHUNK_SIZE = 1 << 20
+
+
+class CompressedChunk:
+    def __init__(self, array: np.array, array_type: NumpyType, transforms: list, length: int):
+        """
+        One independently compressed piece of a larger array
+        :param array: compressed array
+        :param array_type: NumpyType of the compressed array
+        :param transforms: list of transforms, in the order they are to be undone
+        :param length: number of values in the uncompressed chunk
+        """
+        self.array = array
+        self.array_type = array_type
+        self.transforms = transforms
+        self.length = length
+        return
+
+    def __repr__(self):
+        return '<{}, {} array_type={}, length={}, transforms={}>'.format(
+            self.__class__.__name__, hex(id(self)), self.array_type, self.length, self.transforms)
+
+
+class ChunkedCompressedArray:
+    def __init__(self, chunks: list):
+        """
+        An array compressed as a sequence of independently compressed chunks. Every chunk starts from its own
+        reference values, so chunks act as checkpoints: indexing only decompresses the chunks it touches
+        :param chunks: list of CompressedChunk, in array order
+        """
+        self.chunks = chunks
+        self._chunk_offsets = None
+        # (chunk index, decompressed chunk), replaced as a whole so threads sharing the array never see a mixed pair
+        self._cached_chunk = None
+        return
+
+    def __repr__(self):
+        return '<{}, {} length={}, num_chunks={}>'.format(
+            self.__class__.__name__, hex(id(self)), len(self), len(self.chunks))
+
+    def __len__(self):
+        return int(self.chunk_offsets[-1])
+
+    def __getitem__(self, item: Union[int, slice]) -> Union[np.integer, np.array]:
+        """
+        Random access without decompressing the whole array. Every chunk touched is decompressed in full, so reading
+        a single value costs a whole chunk, DEFAULT_CHUNK_SIZE values unless compressed with a smaller chunk_size
+        :param item: integer index or slice, negative values and steps are supported
+        :return: value at the index, or array of the values of the slice
+        """
+        length = len(self)
+        if isinstance(item, slice):
+            indices = np.arange(*item.indices(length))
+            if len(indices) == 0:
+                return np.zeros(0, dtype=np.uint8)
+            first, last = int(indices.min()), int(indices.max())
+            first_chunk, last_chunk = self._chunk_of(first), self._chunk_of(last)
+            decoded = _stitch([self.decompress_chunk(i) for i in range(first_chunk, last_chunk + 1)])
+            return decoded[indices - self.chunk_offsets[first_chunk]]
+        index = int(item)
+        if index < 0:
+            index += length
+        if index < 0 or index >= length:
+            raise IndexError('index {} is out of bounds for length {}'.format(item, length))
+        chunk_index = self._chunk_of(index)
+        return self.decompress_chunk(chunk_index)[index - self.chunk_offsets[chunk_index]]
+
+    @property
+    def chunk_offsets(self) -> np.array:
+        """
+        :return: numpy int64 array of num_chunks + 1 offsets of each chunk in the uncompressed array
+        """
+        if self._chunk_offsets is None:
+            self._chunk_offsets = np.zeros(len(self.chunks) + 1, dtype=np.int64)
+            np.cumsum([chunk.length for chunk in self.chunks], out=self._chunk_offsets[1:])
+        return self._chunk_offsets
+
+    def _chunk_of(self, index: int) -> int:
+        return int(np.searchsorted(self.chunk_offsets, index, side='right')) - 1
+
+    def decompress_chunk(self, chunk_index: int) -> np.array:
+        """
+        Decompresses a single chunk, the last decompressed chunk is cached for sequential access
+        :param chunk_index: index of the chunk
+        :return: decompressed chunk
+        """
+        cached = self._cached_chunk
+        if cached is None or cached[0] != chunk_index:
+            chunk = self.chunks[chunk_index]
+            cached = (chunk_index, integer_decompression_from_transforms(chunk.array, chunk.transforms))
+            self._cached_chunk = cached
+        return cached[1]
+
+
+def _compress_chunk(arr: np.array, bit_pack: bool) -> CompressedChunk:
+    array, array_type, transforms = combined_integer_compression(arr, bit_pack=bit_pack)
+    return CompressedChunk(array, array_type, transforms, len(arr))
+
+
+def _decompress_chunk(chunk: CompressedChunk) -> Tuple[np.array, int, int]:
+    arr = integer_decompression_from_transforms(chunk.array, chunk.transforms)
+    if len(arr) == 0:
+        return arr, 0, 0
+    return (arr,) + min_max(arr)
+
+
+def _stitch(arrays: list, extremes: Union[list, None] = None) -> np.array:
+    """
+    Concatenates decompressed chunks into the smallest type holding all of them
+    :param arrays: list of decompressed chunks
+    :param extremes: list of (minimum, maximum) of each chunk, computed here if None
+    :return: concatenated array
+    """
+    if len(arrays) == 1:
+        return arrays[0]
+    if extremes is None:
+        extremes = [min_max(arr) if len(arr) > 0 else (0, 0) for arr in arrays]
+    extremes = [e for arr, e in zip(arrays, extremes) if len(arr) > 0]
+    if len(extremes) == 0:
+        return np.zeros(0, dtype=np.uint8)
+    ret_type = NumpyType.from_integer(maximum=max(e[1] for e in extremes), minimum=min(e[0] for e in extremes))
+    logger.debug('stitching %s chunks into %s', len(arrays), ret_type)
+    ret_array = np.empty(sum(len(arr) for arr in arrays), dtype=ret_type.to_dtype())
+    offset = 0
+    for arr in arrays:
+        ret_array[offset:offset + len(arr)] = arr
+        offset += len(arr)
+    return ret_array
+
+
+def _make_executor(executor: Union[str, Executor], max_workers: Union[int, None]) -> Tuple[Executor, bool]:
+    """
+    Resolves the executor argument
+    :param executor: 'thread', 'process', or an Executor instance
+    :param max_workers: number of workers of a newly created pool, None for the pool's default
+    :return: the executor and whether it was created here and must be shut down
+    """
+    if isinstance(executor, Executor):
+        return executor, False
+    if executor == 'thread':
+        return ThreadPoolExecutor(max_workers=max_workers), True
+    if executor == 'process':
+        return ProcessPoolExecutor(max_workers=max_workers), True
+    raise ValueError('executor must be thread, process or an Executor, got: {}'.format(executor))
+
+
+def chunked_integer_compression(arr: np.array, chunk_size: int = DEFAULT_CHUNK_SIZE,
+                                max_workers: Union[int, None] = None, executor: Union[str, Executor] = 'thread',
+                                bit_pack: bool = False) -> ChunkedCompressedArray:
+    """
+    Splits the array into chunks and compresses each chunk with combined_integer_compression on a pool of workers.
+    Numpy releases the GIL in its heavy kernels, so a thread pool scales well and avoids copying chunks
+    :param arr: numpy array of integers
+    :param chunk_size: number of values per chunk
+    :param max_workers: number of workers, None for the pool's default
+    :param executor: 'thread', 'process', or an existing Executor to submit to
+    :param bit_pack: whether each chunk finishes with a bit-packing compression
+    :return: ChunkedCompressedArray
+    """
+    if chunk_size <= 0:
+        raise ValueError('chunk size must be positive, got {}'.format(chunk_size))
+    logger.debug('compressing array of length %s in chunks of %s', len(arr), chunk_size)
+    pieces = [arr[start:start + chunk_size] for start in range(0, len(arr), chunk_size)]
+    pool, owned = _make_executor(executor, max_workers)
+    try:
+        chunks = list(pool.map(_compress_chunk, pieces, [bit_pack] * len(pieces)))
+    finally:
+        if owned:
+            pool.shutdown()
+    return ChunkedCompressedArray(chunks)
+
+
+def chunked_integer_decompression(chunked: ChunkedCompressedArray, max_workers: Union[int, None] = None,
+                                  executor: Union[str, Executor] = 'thread', out: Union[np.array, None] = None,
+                                  dtype=None) -> np.array:
+    """
+    Decompresses every chunk on a pool of workers and stitches them together
+    :param chunked: ChunkedCompressedArray
+    :param max_workers: number of workers, None for the pool's default
+    :param executor: 'thread', 'process', or an existing Executor to submit to
+    :param out: optional array of len(chunked) values every chunk decompresses straight into, in its own dtype.
+        Workers write into their slice of out, so it requires a thread pool
+    :param dtype: optional dtype of the result, skips stitching like out does
+    :return: decompressed array, in the smallest type holding every chunk, out if given
+    """
+    if out is None and dtype is None:
+        pool, owned = _make_executor(executor, max_workers)
+        try:
+            decompressed = list(pool.map(_decompress_chunk, chunked.chunks))
+        finally:
+            if owned:
+                pool.shutdown()
+        return _stitch([d[0] for d in decompressed], [d[1:] for d in decompressed])
+    if executor == 'process' or isinstance(executor, ProcessPoolExecutor):
+        raise ValueError('decompressing into out requires a thread pool, processes would write into copies')
+    if out is None:
+        out = np.empty(len(chunked), dtype=dtype)
+    elif out.shape != (len(chunked),):
+        raise ValueError('out has shape {}, expecting ({},)'.format(out.shape, len(chunked)))
+    offsets = chunked.chunk_offsets
+    slices = [out[offsets[i]:offsets[i + 1]] for i in range(len(chunked.chunks))]
+    pool, owned = _make_executor(executor, max_workers)
+    try:
+        list(pool.map(lambda chunk, piece: integer_decompression_from_transforms(
+            chunk.array, chunk.transforms, out=piece), chunked.chunks, slices))
+    finally:
+        if owned:
+            pool.shutdown()
+    return out
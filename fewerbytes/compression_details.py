@@ -1,12 +1,34 @@
 from enum import Enum
 import numpy as np
-from fewerbytes.types import NumpyType
+from typing import Union
+from fewerbytes.types import NumpyType, NumpyKinds
 
 
 class IntegerTransformTypes(Enum):
     MINIMIZE = 'm'
     DERIVATIVE = 'e'
     HASH = 'h'
+    BIT_PACK = 'b'
+    BLOCK_MINIMIZE = 'k'
+    RUN_LENGTH = 'l'
+    ZIGZAG = 'z'
+    DICTIONARY = 'd'
+    SPARSE = 's'
+    DATETIME = 't'
+    PATCHED = 'p'
+    ELIAS_FANO = 'o'
+    ENTROPY = 'c'
+
+
+class FloatTransformTypes(Enum):
+    ROUNDING = 'r'
+    XOR_DELTA = 'x'
+
+
+class EntropyCodecs(Enum):
+    ZLIB = 'zlib'
+    LZMA = 'lzma'
+    BZ2 = 'bz2'
 
 
 class IntegerMinimizeTransformation:
@@ -24,17 +46,21 @@ class IntegerMinimizeTransformation:
 
 
 class IntegerElementWiseTransformation:
-    def __init__(self, first_value: int):
+    def __init__(self, first_value: int, source_kind: Union[NumpyKinds, None] = None):
         """
         first_value, baseline for calculation
         :param first_value:
+        :param source_kind: NumpyKinds of the differenced array, the running sums are read back as unsigned for
+            UNSIGNED, None if unknown
         """
         self.transform_type = IntegerTransformTypes.DERIVATIVE
         self.reference_value = first_value
+        self.source_kind = source_kind
         return
 
     def __repr__(self):
-        return '<{}, {} reference_value={}>'.format(self.__class__.__name__, hex(id(self)), self.reference_value)
+        return '<{}, {} reference_value={}, source_kind={}>'.format(
+            self.__class__.__name__, hex(id(self)), self.reference_value, self.source_kind)
 
 
 class IntegerHashTransformation:
@@ -53,6 +79,233 @@ class IntegerHashTransformation:
             self.__class__.__name__, hex(id(self)), self.key_values_type, self.key_values)
 
 
+class IntegerDictionaryTransformation:
+    def __init__(self, dictionary_id: int, num_keys: int):
+        """
+        Hash of the values against a shared HashDictionary, stored by its id rather than its values
+        :param dictionary_id: id of the dictionary
+        :param num_keys: number of values in the dictionary when the array was compressed
+        """
+        self.transform_type = IntegerTransformTypes.DICTIONARY
+        self.dictionary_id = dictionary_id
+        self.num_keys = num_keys
+        return
+
+    def __repr__(self):
+        return '<{}, {} dictionary_id={}, num_keys={}>'.format(
+            self.__class__.__name__, hex(id(self)), self.dictionary_id, self.num_keys)
+
+
+class IntegerRunLengthTransformation:
+    def __init__(self, run_lengths: np.array, run_lengths_type: NumpyType):
+        """
+        :param run_lengths: number of times each value is repeated
+        :param run_lengths_type: type of run lengths
+        """
+        self.transform_type = IntegerTransformTypes.RUN_LENGTH
+        self.run_lengths = run_lengths
+        self.run_lengths_type = run_lengths_type
+        return
+
+    def __repr__(self):
+        return '<{}, {} run_lengths_type={}, run_lengths={}>'.format(
+            self.__class__.__name__, hex(id(self)), self.run_lengths_type, self.run_lengths)
+
+
+class IntegerSparseTransformation:
+    def __init__(self, gaps: np.array, gaps_type: NumpyType, length: int):
+        """
+        Only the non-zero values are kept, in order
+        :param gaps: distance of each non-zero value from the previous one, the first one from the start
+        :param gaps_type: type of gaps
+        :param length: number of values in the original array
+        """
+        self.transform_type = IntegerTransformTypes.SPARSE
+        self.gaps = gaps
+        self.gaps_type = gaps_type
+        self.length = length
+        return
+
+    def __repr__(self):
+        return '<{}, {} gaps_type={}, length={}, num_values={}>'.format(
+            self.__class__.__name__, hex(id(self)), self.gaps_type, self.length, len(self.gaps))
+
+
+class IntegerDatetimeTransformation:
+    def __init__(self, datetime_dtype):
+        """
+        Datetime or timedelta values compressed as the int64 counts of their unit
+        :param datetime_dtype: datetime64 or timedelta64 dtype of the original array, unit included
+        """
+        self.transform_type = IntegerTransformTypes.DATETIME
+        self.datetime_dtype = np.dtype(datetime_dtype)
+        return
+
+    def __repr__(self):
+        return '<{}, {} datetime_dtype={}>'.format(self.__class__.__name__, hex(id(self)), self.datetime_dtype)
+
+
+class IntegerPatchedTransformation:
+    def __init__(self, reference_value: int, exception_gaps: np.array, gaps_type: NumpyType,
+                 exception_values: np.array, values_type: NumpyType):
+        """
+        A minimization by a reference that only most values are within a narrow width of, the others are kept apart as
+        exceptions and patched back in
+        :param reference_value: value subtracted from the values within the width
+        :param exception_gaps: distance of each exception from the previous one, the first one from the start
+        :param gaps_type: type of exception_gaps
+        :param exception_values: original values of the exceptions
+        :param values_type: type of exception_values
+        """
+        self.transform_type = IntegerTransformTypes.PATCHED
+        self.reference_value = reference_value
+        self.exception_gaps = exception_gaps
+        self.gaps_type = gaps_type
+        self.exception_values = exception_values
+        self.values_type = values_type
+        return
+
+    def __repr__(self):
+        return '<{}, {} reference_value={}, gaps_type={}, values_type={}, num_exceptions={}>'.format(
+            self.__class__.__name__, hex(id(self)), self.reference_value, self.gaps_type, self.values_type,
+            len(self.exception_values))
+
+
+class IntegerEliasFanoTransformation:
+    def __init__(self, low_bits: int, length: int, reference_value: int, upper_bits: np.array,
+                 rank_samples: np.array, rank_samples_type: NumpyType):
+        """
+        Elias-Fano encoding of a non-decreasing array. The values minus the first one are split into their low bits,
+        bit-packed in the compressed array, and their high parts, kept in unary as the upper bits: the value at index
+        i sets the bit at its high part plus i
+        :param low_bits: number of low bits of each value in the compressed array, 0 for none
+        :param length: number of values
+        :param reference_value: first value, subtracted from all of them
+        :param upper_bits: numpy uint8 array of packed upper bits, padded to whole blocks of rank samples
+        :param rank_samples: number of set upper bits before each block
+        :param rank_samples_type: type of rank_samples
+        """
+        self.transform_type = IntegerTransformTypes.ELIAS_FANO
+        self.low_bits = low_bits
+        self.length = length
+        self.reference_value = reference_value
+        self.upper_bits = upper_bits
+        self.rank_samples = rank_samples
+        self.rank_samples_type = rank_samples_type
+        return
+
+    def __repr__(self):
+        return '<{}, {} low_bits={}, length={}, reference_value={}, upper_bytes={}>'.format(
+            self.__class__.__name__, hex(id(self)), self.low_bits, self.length, self.reference_value,
+            len(self.upper_bits))
+
+
+class IntegerEntropyTransformation:
+    def __init__(self, codec: EntropyCodecs, level: int, array_type: NumpyType, length: int):
+        """
+        The little-endian bytes of the array compressed by a general-purpose coder of the standard library
+        :param codec: EntropyCodecs of the coder
+        :param level: compression level the coder ran at, decoding does not need it
+        :param array_type: type of the array the bytes are of
+        :param length: number of values of the array
+        """
+        self.transform_type = IntegerTransformTypes.ENTROPY
+        self.codec = codec
+        self.level = level
+        self.array_type = array_type
+        self.length = length
+        return
+
+    def __repr__(self):
+        return '<{}, {} codec={}, level={}, array_type={}, length={}>'.format(
+            self.__class__.__name__, hex(id(self)), self.codec, self.level, self.array_type, self.length)
+
+
+class IntegerBitPackTransformation:
+    def __init__(self, bit_width: int, length: int):
+        """
+        :param bit_width: number of bits each value is packed into
+        :param length: number of values packed
+        """
+        self.transform_type = IntegerTransformTypes.BIT_PACK
+        self.bit_width = bit_width
+        self.length = length
+        return
+
+    def __repr__(self):
+        return '<{}, {} bit_width={}, length={}>'.format(
+            self.__class__.__name__, hex(id(self)), self.bit_width, self.length)
+
+
+class IntegerBlockMinimizeTransformation:
+    def __init__(self, block_size: int, length: int, reference_values: np.array, reference_values_type: NumpyType,
+                 bit_widths: np.array):
+        """
+        Per-block frame of reference, each block has its own minimum and is bit-packed at its own width
+        :param block_size: number of values per block
+        :param length: number of values in the original array
+        :param reference_values: minimum value of each block
+        :param reference_values_type: type of the reference values
+        :param bit_widths: number of bits each value of a block is packed into
+        """
+        self.transform_type = IntegerTransformTypes.BLOCK_MINIMIZE
+        self.block_size = block_size
+        self.length = length
+        self.reference_values = reference_values
+        self.reference_values_type = reference_values_type
+        self.bit_widths = bit_widths
+        return
+
+    def __repr__(self):
+        return '<{}, {} block_size={}, length={}, reference_values_type={}, num_blocks={}>'.format(
+            self.__class__.__name__, hex(id(self)), self.block_size, self.length, self.reference_values_type,
+            len(self.reference_values))
+
+
+class IntegerZigzagTransformation:
+    def __init__(self):
+        """
+        Signed values interleaved into unsigned ones of the same width, 0, -1, 1, -2, 2, ... to 0, 1, 2, 3, 4, ...,
+        so values of small magnitude stay small whatever their sign
+        """
+        self.transform_type = IntegerTransformTypes.ZIGZAG
+        return
+
+    def __repr__(self):
+        return '<{}, {}>'.format(self.__class__.__name__, hex(id(self)))
+
+
+class FloatRoundingTransformation:
+    def __init__(self, decimals: int, float_type: NumpyType):
+        """
+        Floats scaled by 10 ** decimals and rounded to integers
+        :param decimals: number of decimals kept, may be negative
+        :param float_type: type of the original floats
+        """
+        self.transform_type = FloatTransformTypes.ROUNDING
+        self.decimals = decimals
+        self.float_type = float_type
+        return
+
+    def __repr__(self):
+        return '<{}, {} decimals={}, float_type={}>'.format(
+            self.__class__.__name__, hex(id(self)), self.decimals, self.float_type)
+
+
+class FloatXorDeltaTransformation:
+    def __init__(self, float_type: NumpyType):
+        """
+        Bits of each float XOR-ed with the bits of the previous one, the first one with 0
+        :param float_type: type of the original floats
+        """
+        self.transform_type = FloatTransformTypes.XOR_DELTA
+        self.float_type = float_type
+        return
+
+    def __repr__(self):
+        return '<{}, {} float_type={}>'.format(self.__class__.__name__, hex(id(self)), self.float_type)
+
+
 # class CompressionDetails:
 #     """
 #     Class which stores all the options and information required
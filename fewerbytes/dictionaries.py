@@ -0,0 +1,204 @@
+import logging
+import uuid
+import numpy as np
+from typing import Tuple, Union
+from fewerbytes.types import NumpyType
+from fewerbytes.compression_details import (
+    IntegerDictionaryTransformation,
+    IntegerHashTransformation,
+    IntegerTransformTypes
+)
+from fewerbytes.exceptions import UnknownDictionaryException
+from fewerbytes.integer_compression import downcast_integers
+
+logger = logging.getLogger(__name__)
+
+# widest span of values looked up through a table indexed by value, wider dictionaries are binary searched
+LOOKUP_TABLE_SPAN = 1 << 16
+
+# dictionaries found by id when none is passed to the decompression, filled only by register_dictionary
+_REGISTRY = {}
+
+
+class HashDictionary:
+    def __init__(self, key_values: Union[np.array, None] = None, dictionary_id: Union[int, None] = None):
+        """
+        A table of values shared by many hash compressed arrays, which store only its id. Values keep their key
+        once added, so arrays compressed against the dictionary stay valid as it is extended
+        :param key_values: initial values, in key order, without duplicates
+        :param dictionary_id: 64-bit id of the dictionary, a random one if None
+        """
+        self.dictionary_id = uuid.uuid4().int >> 64 if dictionary_id is None else int(dictionary_id)
+        self.key_values = np.zeros(0, dtype=np.uint8)
+        self.key_values_type = NumpyType.from_dtype(self.key_values.dtype)
+        self._sorted_values = self.key_values
+        self._sorted_keys = np.zeros(0, dtype=np.int64)
+        self._table = None
+        self._table_minimum = 0
+        if key_values is not None:
+            key_values = np.asarray(key_values)
+            if len(np.unique(key_values)) != len(key_values):
+                raise ValueError('dictionary values must be unique')
+            self._set_values(key_values)
+        return
+
+    def __repr__(self):
+        return '<{}, {} dictionary_id={}, key_values_type={}, num_keys={}>'.format(
+            self.__class__.__name__, hex(id(self)), self.dictionary_id, self.key_values_type, len(self))
+
+    def __len__(self):
+        return len(self.key_values)
+
+    @classmethod
+    def train(cls, arr: np.array, dictionary_id: Union[int, None] = None) -> 'HashDictionary':
+        """
+        :param arr: numpy integer array holding the values expected in later arrays
+        :param dictionary_id: 64-bit id of the dictionary, a random one if None
+        :return: HashDictionary of the distinct values of arr, in ascending order
+        """
+        return cls(np.unique(arr), dictionary_id)
+
+    def _set_values(self, key_values: np.array):
+        self.key_values, self.key_values_type = downcast_integers(key_values) if len(key_values) > 0 else \
+            (key_values, NumpyType.from_dtype(key_values.dtype))
+        self._sorted_keys = np.argsort(self.key_values, kind='stable')
+        self._sorted_values = self.key_values[self._sorted_keys]
+        self._table = None
+        if len(self) > 0 and int(self._sorted_values[-1]) - int(self._sorted_values[0]) < LOOKUP_TABLE_SPAN:
+            # key of every value in the span, -1 for the values not in the dictionary and in the last entry, which
+            # values out of the span are clipped to
+            self._table_minimum = int(self._sorted_values[0])
+            self._table = np.full(int(self._sorted_values[-1]) - self._table_minimum + 2, -1, dtype=np.int32)
+            self._table[self.key_values.astype(np.int64) - self._table_minimum] = np.arange(len(self))
+        return
+
+    def _lookup(self, arr: np.array) -> Tuple[np.array, np.array]:
+        """
+        :param arr: numpy integer array
+        :return: tuple of the key of every value, and whether the value is in the dictionary
+        """
+        if len(self) == 0:
+            return np.zeros(len(arr), dtype=np.int64), np.zeros(len(arr), dtype=bool)
+        if self._table is not None and arr.dtype != np.uint64:
+            offsets = np.subtract(arr, self._table_minimum, dtype=np.int64)
+            np.clip(offsets, -1, len(self._table) - 1, out=offsets)
+            keys = self._table[offsets]
+            return keys, keys >= 0
+        positions = np.searchsorted(self._sorted_values, arr)
+        np.minimum(positions, len(self) - 1, out=positions)
+        return self._sorted_keys[positions], self._sorted_values[positions] == arr
+
+    def extend(self, values: np.array) -> int:
+        """
+        Adds the values not in the dictionary yet, after the existing ones
+        :param values: numpy integer array
+        :return: number of values added
+        """
+        _, found = self._lookup(values)
+        if np.all(found):
+            return 0
+        new_values = np.unique(values[~found])
+        logger.debug('extending dictionary %s of %s values with %s values', self.dictionary_id, len(self),
+                     len(new_values))
+        # sorted new values, the extremes of both sides give a type holding them together
+        values_type = NumpyType.from_integer(maximum=max(int(self.key_values.max(initial=0)), int(new_values[-1])),
+                                             minimum=min(int(self.key_values.min(initial=0)), int(new_values[0])))
+        self._set_values(np.concatenate([self.key_values.astype(values_type.to_dtype()),
+                                         new_values.astype(values_type.to_dtype())]))
+        return len(new_values)
+
+    def encode(self, arr: np.array, extend: bool = False) -> Tuple[np.array, NumpyType]:
+        """
+        Keys of the values of an array, looked up in a table or binary searched instead of computed with np.unique
+        :param arr: numpy integer array
+        :param extend: whether values missing from the dictionary are added to it, otherwise they raise ValueError
+        :return: tuple of the array of keys and its NumpyType
+        """
+        keys, found = self._lookup(arr)
+        if not np.all(found):
+            if not extend:
+                raise ValueError('{} values are missing from dictionary {}'.format(
+                    int(np.count_nonzero(~found)), self.dictionary_id))
+            self.extend(arr)
+            keys, found = self._lookup(arr)
+        key_type = NumpyType.from_integer(max(len(self) - 1, 0))
+        return keys.astype(key_type.to_dtype()), key_type
+
+
+def register_dictionary(dictionary: HashDictionary):
+    """
+    Makes a dictionary the fallback of the decompressions of this process not given it
+    :param dictionary: HashDictionary
+    :return:
+    """
+    registered = _REGISTRY.get(dictionary.dictionary_id)
+    if registered is not None and registered is not dictionary:
+        logger.debug('replacing registered dictionary %s', dictionary.dictionary_id)
+    _REGISTRY[dictionary.dictionary_id] = dictionary
+    return
+
+
+def unregister_dictionary(dictionary_id: int):
+    """
+    :param dictionary_id: id of a registered dictionary, ignored if not registered
+    :return:
+    """
+    _REGISTRY.pop(int(dictionary_id), None)
+    return
+
+
+def get_dictionary(dictionary_id: int, dictionaries: Union[dict, None] = None) -> HashDictionary:
+    """
+    :param dictionary_id: id of a dictionary
+    :param dictionaries: mapping of dictionary ids to HashDictionary, searched before the registered dictionaries
+    :return: HashDictionary
+    """
+    dictionary_id = int(dictionary_id)
+    if dictionaries is not None and dictionary_id in dictionaries:
+        return dictionaries[dictionary_id]
+    try:
+        return _REGISTRY[dictionary_id]
+    except KeyError:
+        raise UnknownDictionaryException('dictionary {} is neither given nor registered'.format(dictionary_id))
+
+
+def resolve_dictionary(transform: IntegerDictionaryTransformation,
+                       dictionaries: Union[dict, None] = None) -> IntegerHashTransformation:
+    """
+    The hash transform a dictionary transform stands for, undone like any other hash
+    :param transform: IntegerDictionaryTransformation
+    :param dictionaries: mapping of dictionary ids to HashDictionary, searched before the registered dictionaries
+    :return: IntegerHashTransformation holding the values of the dictionary
+    """
+    dictionary = get_dictionary(transform.dictionary_id, dictionaries)
+    if len(dictionary) < transform.num_keys:
+        raise UnknownDictionaryException('dictionary {} has {} values, the array uses {}'.format(
+            transform.dictionary_id, len(dictionary), transform.num_keys))
+    return IntegerHashTransformation(dictionary.key_values, dictionary.key_values_type)
+
+
+def resolve_dictionaries(transforms: list, dictionaries: Union[dict, None] = None) -> list:
+    """
+    :param transforms: list of transforms
+    :param dictionaries: mapping of dictionary ids to HashDictionary, searched before the registered dictionaries
+    :return: the transforms, with the dictionary transforms replaced by the hash transforms they stand for
+    """
+    return [resolve_dictionary(transform, dictionaries)
+            if transform.transform_type == IntegerTransformTypes.DICTIONARY else transform
+            for transform in transforms]
+
+
+def integer_dictionary_compression(arr: np.array, dictionary: HashDictionary, extend: bool = False) -> \
+        Tuple[np.array, NumpyType, IntegerDictionaryTransformation]:
+    """
+    Hash compression against a shared dictionary. The keys are looked up rather than computed with np.unique, and
+    the transform stores the id of the dictionary instead of a table of values. Decompressing the keys takes the
+    dictionary, passed in a mapping of ids to dictionaries or registered with register_dictionary
+    :param arr: numpy integer array
+    :param dictionary: HashDictionary
+    :param extend: whether values missing from the dictionary are added to it, otherwise they raise ValueError
+    :return: array of keys, its NumpyType, and the IntegerDictionaryTransformation info
+    """
+    keys, key_type = dictionary.encode(arr, extend=extend)
+    logger.debug('encoded %s values with dictionary %s into %s', len(arr), dictionary.dictionary_id, key_type)
+    return keys, key_type, IntegerDictionaryTransformation(dictionary.dictionary_id, len(dictionary))
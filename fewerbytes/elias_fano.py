@@ -0,0 +1,191 @@
+import logging
+import numpy as np
+from typing import Tuple, Union
+from fewerbytes.types import NumpyType, NumpyKinds, NumpySizes
+from fewerbytes.compression_details import IntegerEliasFanoTransformation, IntegerTransformTypes
+from fewerbytes.bit_packing import pack_bits, unpack_bits_at
+from fewerbytes.integer_compression import downcast_integers
+
+logger = logging.getLogger(__name__)
+
+# upper bits per block of rank samples, a block is scanned whole to select a bit within it
+RANK_SAMPLE_BITS = 512
+
+# number of queries whose blocks are scanned per pass
+QUERY_CHUNK_SIZE = 8192
+
+_INT64_MAX = np.iinfo(np.int64).max
+
+
+def integer_elias_fano_compression(arr: np.array) -> \
+        Tuple[np.array, NumpyType, Union[IntegerEliasFanoTransformation, None]]:
+    """
+    Elias-Fano encoding of a non-decreasing array, such as row ids, file offsets or sorted keys, in about
+    2 + log2(range / length) bits per value. Unlike a derivative, it can be searched without being decompressed,
+    see compressed_select and compressed_searchsorted
+    :param arr: numpy integer array, non-decreasing
+    :return: packed uint8 array of the low bits, its NumpyType, and IntegerEliasFanoTransformation info or None if
+        the array is empty or decreases
+    """
+    array_type = NumpyType.from_dtype(arr.dtype)
+    if len(arr) == 0:
+        logger.debug('array is empty, cannot Elias-Fano encode')
+        return arr, array_type, None
+    if np.any(arr[1:] < arr[:-1]):
+        logger.debug('array is not non-decreasing, cannot Elias-Fano encode')
+        return arr, array_type, None
+    length = len(arr)
+    # unsigned 64-bit modular differences, exact as none of them is negative
+    offsets = arr.astype(np.uint64) - arr[:1].astype(np.uint64)
+    low_bits = max(0, (int(offsets[-1]) // length).bit_length() - 1)
+    positions = (offsets >> np.uint64(low_bits)).astype(np.int64) + np.arange(length, dtype=np.int64)
+    # at least one bit of padding, so the last high part is followed by a zero like the others
+    num_blocks = (int(positions[-1]) + 1 + RANK_SAMPLE_BITS) // RANK_SAMPLE_BITS
+    bits = np.zeros(num_blocks * RANK_SAMPLE_BITS, dtype=np.uint8)
+    bits[positions] = 1
+    rank_samples = np.zeros(num_blocks, dtype=np.int64)
+    np.cumsum(np.bincount(positions // RANK_SAMPLE_BITS, minlength=num_blocks)[:-1], out=rank_samples[1:])
+    rank_samples, rank_samples_type = downcast_integers(rank_samples)
+    low_array = pack_bits(offsets & np.uint64((1 << low_bits) - 1), low_bits) if low_bits > 0 else \
+        np.zeros(0, dtype=np.uint8)
+    logger.debug('%s values encoded with %s low bits and %s upper blocks', length, low_bits, num_blocks)
+    return low_array, NumpyType(NumpyKinds.UNSIGNED, NumpySizes.BYTE), IntegerEliasFanoTransformation(
+        low_bits, length, arr[0], np.packbits(bits), rank_samples, rank_samples_type)
+
+
+def _elias_fano_transform(transforms: list) -> IntegerEliasFanoTransformation:
+    """
+    :param transforms: list of transforms, in the order they are to be undone
+    :return: the IntegerEliasFanoTransformation the list is made of
+    """
+    if len(transforms) != 1 or transforms[0].transform_type != IntegerTransformTypes.ELIAS_FANO:
+        raise ValueError('searching a compressed array requires a single Elias-Fano transform, got {}'.format(
+            transforms))
+    return transforms[0]
+
+
+def _select_bits(transform: IntegerEliasFanoTransformation, ranks: np.array, bit_value: int) -> np.array:
+    """
+    Positions of upper bits of a value, found from the rank sample of their block and a scan of the block
+    :param transform: IntegerEliasFanoTransformation
+    :param ranks: numpy int64 array, for each position the number of bits of the value before it
+    :param bit_value: 1 to select set bits, 0 for unset ones
+    :return: numpy int64 array of the positions of the bits
+    """
+    samples = transform.rank_samples.astype(np.int64)
+    if bit_value == 0:
+        samples = np.arange(len(samples), dtype=np.int64) * RANK_SAMPLE_BITS - samples
+    blocks = transform.upper_bits.reshape(-1, RANK_SAMPLE_BITS // 8)
+    positions = np.empty(len(ranks), dtype=np.int64)
+    for start in range(0, len(ranks), QUERY_CHUNK_SIZE):
+        chunk = ranks[start:start + QUERY_CHUNK_SIZE]
+        block = np.searchsorted(samples, chunk, side='right') - 1
+        bits = np.unpackbits(blocks[block], axis=1)
+        if bit_value == 0:
+            np.bitwise_xor(bits, 1, out=bits)
+        counts = np.cumsum(bits, axis=1, dtype=np.int16)
+        positions[start:start + len(chunk)] = block * RANK_SAMPLE_BITS + np.argmax(
+            counts > (chunk - samples[block])[:, np.newaxis], axis=1)
+    return positions
+
+
+def _low_values(arr: np.array, transform: IntegerEliasFanoTransformation, indices: np.array) -> np.array:
+    """
+    :param arr: packed low bits
+    :param transform: IntegerEliasFanoTransformation
+    :param indices: numpy int64 array of indices
+    :return: numpy uint64 array of the low bits of the values at the indices
+    """
+    if transform.low_bits == 0:
+        return np.zeros(len(indices), dtype=np.uint64)
+    return unpack_bits_at(arr, transform.low_bits, indices)
+
+
+def _offsets(arr: np.array, transform: IntegerEliasFanoTransformation, indices: np.array) -> np.array:
+    """
+    :param arr: packed low bits
+    :param transform: IntegerEliasFanoTransformation
+    :param indices: numpy int64 array of indices, in bounds
+    :return: numpy uint64 array of the values at the indices minus the first value
+    """
+    high = (_select_bits(transform, indices, 1) - indices).astype(np.uint64)
+    return (high << np.uint64(transform.low_bits)) | _low_values(arr, transform, indices)
+
+
+def compressed_select(arr: np.array, transforms: list, indices: Union[np.array, int]) -> Union[np.array, int]:
+    """
+    Values at some indices of an Elias-Fano encoded array, like arr[indices] on the decompressed array but only
+    touching one block of upper bits and one packed low value per index
+    :param arr: packed low bits
+    :param transforms: list made of the IntegerEliasFanoTransformation
+    :param indices: index or numpy integer array of indices, negative ones counting from the end
+    :return: value, or numpy int64 array of values, uint64 if they do not fit
+    """
+    transform = _elias_fano_transform(transforms)
+    positions = np.array(indices, dtype=np.int64, ndmin=1)
+    positions = np.where(positions < 0, positions + transform.length, positions)
+    if np.any((positions < 0) | (positions >= transform.length)):
+        raise IndexError('index out of bounds for an array of {} values'.format(transform.length))
+    # unsigned 64-bit modular sums, viewed as signed when the values fit
+    values = _offsets(arr, transform, positions) + np.array(transform.reference_value).astype(np.uint64)
+    if int(transform.reference_value) < 0 or len(values) == 0 or int(values.max()) <= _INT64_MAX:
+        values = values.view(np.int64)
+    if np.ndim(indices) == 0:
+        return int(values[0])
+    return values
+
+
+def compressed_searchsorted(arr: np.array, transforms: list, values: Union[np.array, int],
+                            side: str = 'left') -> Union[np.array, int]:
+    """
+    Like np.searchsorted on the decompressed array. The high part of each value picks a bucket of the upper bits
+    through its rank samples, the low parts of the bucket are binary searched
+    :param arr: packed low bits
+    :param transforms: list made of the IntegerEliasFanoTransformation
+    :param values: value or numpy integer array of values to search
+    :param side: 'left' for the index of the first value not smaller, 'right' for that of the first larger one
+    :return: index, or numpy int64 array of indices
+    """
+    if side not in ('left', 'right'):
+        raise ValueError('side must be left or right, got {}'.format(side))
+    transform = _elias_fano_transform(transforms)
+    queries = np.array(values, ndmin=1)
+    reference_value = int(transform.reference_value)
+    low_bits = np.uint64(transform.low_bits)
+    last_high = int(_select_bits(transform, np.array([transform.length - 1]), 1)[0]) - (transform.length - 1)
+    indices = np.zeros(len(queries), dtype=np.int64)
+    # queries before the first value are found at 0, the others are searched by their offset from it
+    searched = np.flatnonzero(queries > reference_value if side == 'left' else queries >= reference_value)
+    offsets = queries[searched].astype(np.uint64) - np.array(reference_value).astype(np.uint64)
+    bucketed = (offsets >> low_bits) <= np.uint64(last_high)
+    indices[searched[~bucketed]] = transform.length
+    searched, offsets = searched[bucketed], offsets[bucketed]
+    high = (offsets >> low_bits).astype(np.int64)
+    # the values of bucket high lie between the unset upper bits ending buckets high - 1 and high
+    low = np.where(high > 0, _select_bits(transform, np.maximum(high - 1, 0), 0) + 1 - high, 0)
+    upper = _select_bits(transform, high, 0) - high
+    query_low = offsets & np.uint64((1 << transform.low_bits) - 1)
+    while True:
+        active = low < upper
+        if not np.any(active):
+            break
+        middle = (low + upper) // 2
+        middle_low = _low_values(arr, transform, np.minimum(middle, transform.length - 1))
+        after = middle_low < query_low if side == 'left' else middle_low <= query_low
+        low = np.where(active & after, middle + 1, low)
+        upper = np.where(active & ~after, middle, upper)
+    indices[searched] = low
+    if np.ndim(values) == 0:
+        return int(indices[0])
+    return indices
+
+
+def compressed_rank(arr: np.array, transforms: list, values: Union[np.array, int]) -> Union[np.array, int]:
+    """
+    Number of values of an Elias-Fano encoded array smaller than each value
+    :param arr: packed low bits
+    :param transforms: list made of the IntegerEliasFanoTransformation
+    :param values: value or numpy integer array of values
+    :return: count, or numpy int64 array of counts
+    """
+    return compressed_searchsorted(arr, transforms, values, side='left')
@@ -0,0 +1,98 @@
+import logging
+import numpy as np
+from typing import Union
+from fewerbytes.planner import IntegerStatistics, collect_statistics, plan_from_statistics, worth_deriving
+
+logger = logging.getLogger(__name__)
+
+# number of consecutive values in each sampled segment, derivatives are only taken within a segment
+SAMPLE_SEGMENT_LENGTH = 1024
+
+
+class CompressionEstimate:
+    def __init__(self, chain: list, predicted_bytes: int, original_bytes: int, sample_size: int):
+        """
+        Predicted outcome of compressing an array
+        :param chain: recommended list of IntegerTransformTypes, in the order they are to be applied
+        :param predicted_bytes: predicted size of the compressed array and its transform metadata
+        :param original_bytes: size of the original array
+        :param sample_size: number of values the prediction is based on
+        """
+        self.chain = chain
+        self.predicted_bytes = predicted_bytes
+        self.original_bytes = original_bytes
+        self.sample_size = sample_size
+        return
+
+    def __repr__(self):
+        return '<{}, {} chain={}, predicted_bytes={}, ratio={:.2f}>'.format(
+            self.__class__.__name__, hex(id(self)), self.chain, self.predicted_bytes, self.ratio)
+
+    @property
+    def ratio(self) -> float:
+        """
+        :return: predicted compression ratio, original size over compressed size
+        """
+        return self.original_bytes / max(1, self.predicted_bytes)
+
+
+def _segment_starts(length: int, num_segments: int, segment_length: int, method: str,
+                    seed: Union[int, None]) -> np.array:
+    last_start = length - segment_length
+    if method == 'strided':
+        return np.linspace(0, last_start, num_segments).astype(np.int64)
+    if method == 'random':
+        rng = np.random.RandomState(seed)
+        return np.sort(rng.choice(last_start + 1, size=num_segments, replace=False))
+    raise ValueError('sampling method must be strided or random, got: {}'.format(method))
+
+
+def sample_statistics(arr: np.array, sample_fraction: float = 0.01, method: str = 'strided',
+                      seed: Union[int, None] = None, max_derivatives: int = 3, bit_pack: bool = False) -> list:
+    """
+    Computes IntegerStatistics of the array and its derivatives from contiguous sampled segments, scaled to the
+    length of the whole array
+    :param arr: numpy integer array
+    :param sample_fraction: fraction of the values to sample, between 0 and 1
+    :param method: 'strided' for evenly spaced segments, or 'random'
+    :param seed: seed of the random segment positions
+    :param max_derivatives: number of derivatives to consider
+    :param bit_pack: whether candidates may finish with a bit-packing compression
+    :return: list of IntegerStatistics, index k being the k-th derivative
+    """
+    if not 0 < sample_fraction <= 1:
+        raise ValueError('sample fraction must be in (0, 1], got {}'.format(sample_fraction))
+    length = len(arr)
+    num_segments = int(np.ceil(length * sample_fraction / SAMPLE_SEGMENT_LENGTH))
+    if num_segments * SAMPLE_SEGMENT_LENGTH >= length:
+        logger.debug('sample would cover the whole array, using all of it')
+        return collect_statistics(arr, max_derivatives, bit_pack)
+    starts = _segment_starts(length, num_segments, SAMPLE_SEGMENT_LENGTH, method, seed)
+    logger.debug('sampling %s segments of %s values', num_segments, SAMPLE_SEGMENT_LENGTH)
+    segments = arr[starts[:, np.newaxis] + np.arange(SAMPLE_SEGMENT_LENGTH)].astype(np.int64, copy=False)
+    statistics = [IntegerStatistics.from_array(segments.ravel(), length)]
+    for order in range(1, max_derivatives + 1):
+        if not worth_deriving(statistics[-1], bit_pack):
+            break
+        segments = np.diff(segments, axis=1)
+        statistics.append(IntegerStatistics.from_array(segments.ravel(), length - order))
+    return statistics
+
+
+def estimate_compression(arr: np.array, sample_fraction: float = 0.01, method: str = 'strided',
+                         seed: Union[int, None] = None, bit_pack: bool = False) -> CompressionEstimate:
+    """
+    Predicts the compressed size and the recommended transform chain from a sample of the array, without
+    compressing anything
+    :param arr: numpy integer array
+    :param sample_fraction: fraction of the values to sample, between 0 and 1
+    :param method: 'strided' for evenly spaced segments, or 'random'
+    :param seed: seed of the random segment positions
+    :param bit_pack: whether candidates may finish with a bit-packing compression
+    :return: CompressionEstimate
+    """
+    statistics = sample_statistics(arr, sample_fraction, method, seed, bit_pack=bit_pack)
+    plan = plan_from_statistics(statistics, bit_pack)
+    sample_size = min(len(arr), int(np.ceil(len(arr) * sample_fraction / SAMPLE_SEGMENT_LENGTH))
+                      * SAMPLE_SEGMENT_LENGTH)
+    return CompressionEstimate(plan.chain, plan.predicted_bytes, arr.nbytes, sample_size)
@@ -4,3 +4,11 @@ class NumpyDtypeKindInvalidException(KeyError):
 
 class NumpyDtypeSizeInvalidException(KeyError):
     pass
+
+
+class InvalidCompressedFormatException(ValueError):
+    pass
+
+
+class UnknownDictionaryException(KeyError):
+    pass
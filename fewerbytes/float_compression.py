@@ -0,0 +1,81 @@
+import numpy as np
+import logging
+from typing import Tuple, Union
+from fewerbytes.types import NumpyType, NumpyKinds
+from fewerbytes.compression_details import FloatRoundingTransformation, FloatXorDeltaTransformation
+from fewerbytes.exceptions import NumpyDtypeKindInvalidException
+from fewerbytes.integer_compression import (
+    downcast_integers,
+    combined_integer_compression,
+    integer_block_minimize_compression
+)
+
+logger = logging.getLogger(__name__)
+
+
+def _float_type(arr: np.array) -> NumpyType:
+    arr_type = NumpyType.from_dtype(arr.dtype)
+    if arr_type.kind is not NumpyKinds.FLOAT:
+        raise NumpyDtypeKindInvalidException('invalid dtype kind. expecting FLOAT, got: {}'.format(arr.dtype.kind))
+    return arr_type
+
+
+def float_rounding_compression(arr: np.array, decimals: int) -> Tuple[np.array, NumpyType, FloatRoundingTransformation]:
+    """
+    Lossy compression keeping a declared number of decimals: floats are scaled by 10 ** decimals, rounded, and
+    stored as the smallest integers holding them, ready for the integer compressions
+    :param arr: numpy float array
+    :param decimals: number of decimals to keep, may be negative to round to tens, hundreds, ...
+    :return: tuple of the integer array, its NumpyType, and the FloatRoundingTransformation info
+    """
+    arr_type = _float_type(arr)
+    logger.debug('rounding float array of type %s to %s decimals', arr_type, decimals)
+    if not np.all(np.isfinite(arr)):
+        raise ValueError('cannot round an array holding NaN or infinite values')
+    scaled = np.round(arr.astype(np.float64) * 10.0 ** decimals)
+    if len(scaled) > 0 and np.amax(np.abs(scaled)) >= 2.0 ** 63:
+        raise ValueError('values scaled by 10 ** {} do not fit in a 64-bit integer'.format(decimals))
+    int_array, int_array_type = downcast_integers(scaled.astype(np.int64))
+    return int_array, int_array_type, FloatRoundingTransformation(decimals, arr_type)
+
+
+def float_xor_delta_compression(arr: np.array) -> Tuple[np.array, NumpyType, FloatXorDeltaTransformation]:
+    """
+    Lossless Gorilla-style compression: the bits of each float are XOR-ed with those of the previous one. Close
+    values share their sign, exponent and leading mantissa bits, so the results have many leading zeros
+    :param arr: numpy float array
+    :return: tuple of the unsigned integer array of XOR-ed bits, its NumpyType, and the FloatXorDeltaTransformation
+    """
+    arr_type = _float_type(arr)
+    logger.debug('xor delta compression on float array of type %s', arr_type)
+    bits_type = NumpyType(NumpyKinds.UNSIGNED, arr_type.size)
+    bits = np.ascontiguousarray(arr).view(bits_type.to_dtype())
+    xor_array = np.empty_like(bits)
+    if len(bits) > 0:
+        xor_array[0] = bits[0]
+        np.bitwise_xor(bits[1:], bits[:-1], out=xor_array[1:])
+    return xor_array, bits_type, FloatXorDeltaTransformation(arr_type)
+
+
+def combined_float_compression(arr: np.array, decimals: Union[int, None] = None, bit_pack: bool = False,
+                               block_size: int = 128) -> Tuple[np.array, NumpyType, list]:
+    """
+    Compresses a float array, lossy by rounding to decimals then with combined_integer_compression, or lossless
+    by XOR delta then bit-packing each block at the width of its XOR-ed bits
+    :param arr: numpy float array
+    :param decimals: number of decimals to keep, None for lossless compression
+    :param bit_pack: whether the rounded integers finish with a bit-packing compression
+    :param block_size: number of values per block of the lossless compression, a multiple of 8
+    :return: tuple of the compressed array, its NumpyType, and a list of transforms in the order they are to be undone
+    """
+    if decimals is not None:
+        int_array, _, rounding_transform = float_rounding_compression(arr, decimals)
+        ret_array, ret_type, transforms = combined_integer_compression(int_array, bit_pack=bit_pack)
+        return ret_array, ret_type, transforms + [rounding_transform]
+    xor_array, xor_type, xor_transform = float_xor_delta_compression(arr)
+    packed, packed_type, block_transform = integer_block_minimize_compression(xor_array, block_size)
+    if block_transform is None or packed.nbytes + block_transform.reference_values.nbytes + \
+            block_transform.bit_widths.nbytes >= xor_array.nbytes:
+        logger.debug('packing the xor-ed bits does not save space')
+        return xor_array, xor_type, [xor_transform]
+    return packed, packed_type, [block_transform, xor_transform]
@@ -0,0 +1,109 @@
+import logging
+import numpy as np
+from itertools import groupby
+from typing import Union
+from fewerbytes.compression_details import (
+    FloatRoundingTransformation,
+    FloatXorDeltaTransformation,
+    FloatTransformTypes
+)
+from fewerbytes.dictionaries import resolve_dictionaries
+from fewerbytes.integer_decompression import (
+    integer_decompression_from_transform,
+    integer_decompression_from_transforms,
+    _output_array
+)
+
+logger = logging.getLogger(__name__)
+
+
+def float_rounding_decompression(arr: np.array, transform: FloatRoundingTransformation,
+                                 out: Union[np.array, None] = None, dtype=None) -> np.array:
+    """
+    Decompresses a rounded float array
+    :param arr: integer array of scaled values
+    :param transform: transformation info
+    :param out: optional array of len(arr) values to decompress into, in its own dtype
+    :param dtype: optional dtype of the result, transform.float_type if None
+    :return: float array, rounded to transform.decimals, out if given
+    """
+    logger.debug('decompressing rounded float array with info: %s', transform)
+    out = _output_array(out, transform.float_type.to_dtype() if dtype is None else dtype, len(arr))
+    # divided in float64 whatever the output type, so float32 results round exactly like the originals
+    np.divide(arr, 10.0 ** transform.decimals, out=out, dtype=np.float64, casting='unsafe')
+    return out
+
+
+def float_xor_delta_decompression(arr: np.array, transform: FloatXorDeltaTransformation,
+                                  out: Union[np.array, None] = None, dtype=None) -> np.array:
+    """
+    Decompresses a XOR delta float array
+    :param arr: unsigned integer array of XOR-ed bits
+    :param transform: transformation info
+    :param out: optional array of len(arr) values to decompress into, in its own dtype
+    :param dtype: optional dtype of the result, transform.float_type if None
+    :return: float array, out if given
+    """
+    logger.debug('decompressing xor delta float array with info: %s', transform)
+    float_dtype = np.dtype(transform.float_type.to_dtype())
+    bits_dtype = 'u{}'.format(float_dtype.itemsize)
+    if out is None and (dtype is None or np.dtype(dtype) == float_dtype):
+        return np.bitwise_xor.accumulate(arr.astype(bits_dtype, copy=False)).view(float_dtype)
+    out = _output_array(out, dtype, len(arr))
+    if out.dtype != float_dtype:
+        out[...] = float_xor_delta_decompression(arr, transform)
+        return out
+    # xor the bits in place, through an unsigned view of out
+    bits = out.view(bits_dtype)
+    bits[...] = arr
+    np.bitwise_xor.accumulate(bits, out=bits)
+    return out
+
+
+def float_decompression_from_transform(arr: np.array, transform, out: Union[np.array, None] = None,
+                                       dtype=None) -> np.array:
+    """
+    Decompresses an array from a float transformation, or from an integer one applied to the integers a float
+    transformation produced
+    :param arr: compressed array
+    :param transform: transformation information
+    :param out: optional array to decompress into, in its own dtype
+    :param dtype: optional dtype of the result
+    :return: decompressed array, out if given
+    """
+    if transform.transform_type == FloatTransformTypes.ROUNDING:
+        return float_rounding_decompression(arr, transform, out=out, dtype=dtype)
+    elif transform.transform_type == FloatTransformTypes.XOR_DELTA:
+        return float_xor_delta_decompression(arr, transform, out=out, dtype=dtype)
+    return integer_decompression_from_transform(arr, transform, out=out, dtype=dtype)
+
+
+def float_decompression_from_transforms(arr: np.array, transforms: list, out: Union[np.array, None] = None,
+                                        dtype=None, dictionaries: Union[dict, None] = None) -> np.array:
+    """
+    Decompresses a float array using a series of transforms. Runs of integer transforms are decompressed together by
+    integer_decompression_from_transforms. Only the last transform writes into out
+    :param arr: compressed array
+    :param transforms: list of transforms, IN THE ORDER THEY ARE TO BE UNDONE, as returned by
+        combined_float_compression
+    :param out: optional array to decompress into, in its own dtype
+    :param dtype: optional dtype of the result
+    :param dictionaries: optional mapping of dictionary ids to HashDictionary for dictionary transforms, the
+        registered dictionaries are searched after it
+    :return: decompressed array, out if given
+    """
+    transforms = resolve_dictionaries(transforms, dictionaries)
+    if len(transforms) == 0:
+        return integer_decompression_from_transforms(arr, transforms, out=out, dtype=dtype)
+    groups = [list(group) for _, group in groupby(
+        transforms, key=lambda transform: isinstance(transform.transform_type, FloatTransformTypes))]
+    ret_array = arr
+    for i, group in enumerate(groups):
+        step_out, step_dtype = (out, dtype) if i == len(groups) - 1 else (None, None)
+        if not isinstance(group[0].transform_type, FloatTransformTypes):
+            ret_array = integer_decompression_from_transforms(ret_array, group, out=step_out, dtype=step_dtype)
+            continue
+        for transform in group[:-1]:
+            ret_array = float_decompression_from_transform(ret_array, transform)
+        ret_array = float_decompression_from_transform(ret_array, group[-1], out=step_out, dtype=step_dtype)
+    return ret_array
@@ -1,3 +1,6 @@
+import bz2
+import lzma
+import zlib
 import numpy as np
 import logging
 from typing import Tuple, Union
@@ -5,54 +8,104 @@ from fewerbytes.types import NumpyType, NumpySizes, NumpyKinds
 from fewerbytes.compression_details import (
     IntegerMinimizeTransformation,
     IntegerElementWiseTransformation,
-    IntegerHashTransformation
+    IntegerHashTransformation,
+    IntegerBitPackTransformation,
+    IntegerBlockMinimizeTransformation,
+    IntegerRunLengthTransformation,
+    IntegerZigzagTransformation,
+    IntegerSparseTransformation,
+    IntegerPatchedTransformation,
+    IntegerEntropyTransformation,
+    EntropyCodecs
 )
+from fewerbytes.bit_packing import pack_bits, pack_blocks, bit_lengths
 from fewerbytes.exceptions import NumpyDtypeKindInvalidException
+from fewerbytes.reductions import min_max
 
+logger = logging.getLogger(__name__)
 
-def downcast_integers(arr: np.array) -> Tuple[np.array, NumpyType]:
+# number of evenly spaced values the width of a patched compression is estimated from, at most
+PATCHED_SAMPLE_SIZE = 1 << 16
+
+# compress(data, level) and a decompressor factory of each entropy codec, the decompressors decompress(data,
+# max_length) any contiguous buffer and report eof and unused_data, and raise one of ENTROPY_ERRORS on corrupt data
+ENTROPY_CODERS = {
+    EntropyCodecs.ZLIB: (lambda data, level: zlib.compress(data, level), zlib.decompressobj),
+    EntropyCodecs.LZMA: (lambda data, level: lzma.compress(data, preset=level), lzma.LZMADecompressor),
+    EntropyCodecs.BZ2: (lambda data, level: bz2.compress(data, level), bz2.BZ2Decompressor),
+}
+ENTROPY_ERRORS = (zlib.error, lzma.LZMAError, OSError, EOFError)
+ENTROPY_DEFAULT_LEVELS = {EntropyCodecs.ZLIB: 6, EntropyCodecs.LZMA: 6, EntropyCodecs.BZ2: 9}
+ENTROPY_LEVEL_RANGES = {EntropyCodecs.ZLIB: (0, 9), EntropyCodecs.LZMA: (0, 9), EntropyCodecs.BZ2: (1, 9)}
+
+
+def downcast_integers(arr: np.array, extremes: Union[Tuple[int, int], None] = None) -> Tuple[np.array, NumpyType]:
     """
     Simple downcasting technique, sees if the numpy array can be downcast
     :param arr: numpy array of type uint or int of any size
+    :param extremes: (minimum, maximum) of arr when already known, computed with min_max if None
     :return: numpy array, simply and safely truncated
     """
     arr_type = NumpyType.from_dtype(arr.dtype)
-    logging.debug('downcasting array of shape {}, itemsize {}, and kind {}'.format(
-        arr.shape,
-        arr_type.size,
-        arr_type.kind
-    ))
     if arr_type.kind is not NumpyKinds.INTEGER and arr_type.kind is not NumpyKinds.UNSIGNED:
         raise NumpyDtypeKindInvalidException('invalid dtype kind. expecting '
                                              'INTEGER or UNSIGNED, got: {}'.format(arr.dtype.kind))
-    arr_min = np.min(arr)
-    arr_max = np.max(arr)
-    logging.debug('array min: {}, max: {}'.format(arr_min, arr_max))
-
+    arr_min, arr_max = min_max(arr) if extremes is None else extremes
     downcast_kind = NumpyType.from_integer(maximum=arr_max, minimum=arr_min)
-    logging.debug('downcast smallest storage: {}'.format(downcast_kind))
-
-    existing_kind = NumpyType.from_dtype(arr.dtype)
-    if downcast_kind.size == existing_kind.size:  # no simple downcast
-        logging.debug('existing smallest storage: {}'.format(existing_kind))
+    # a single message per call, downcasting sits on every hot path
+    logger.debug('downcasting array of shape %s and type %s with min %s and max %s to %s',
+                 arr.shape, arr_type, arr_min, arr_max, downcast_kind)
+    if downcast_kind.size == arr_type.size:  # no simple downcast
         return arr, downcast_kind
-
-    logging.debug('truncating down to {}'.format(downcast_kind))
     return arr.astype(dtype=downcast_kind.to_dtype()), downcast_kind
 
 
-def integer_minimize_compression(arr: np.array) -> Tuple[np.array, NumpyType, IntegerMinimizeTransformation]:
+def integer_minimize_compression(arr: np.array, extremes: Union[Tuple[int, int], None] = None) -> \
+        Tuple[np.array, NumpyType, IntegerMinimizeTransformation]:
     """
     Performs a minimization of the integer array
     :param arr: numpy integer array
+    :param extremes: (minimum, maximum) of arr when already known, computed with min_max if None
     :return: tuple of the shifted numpy array, the returned type, and the IntegerMinimizeTransformation info
     """
-    logging.debug('performing a minimization compression on array')
+    min_value, max_value = min_max(arr) if extremes is None else extremes
+    ret_array_type = NumpyType.from_integer(max_value - min_value)
+    logger.debug('minimizing array of dtype %s by %s into %s', arr.dtype, min_value, ret_array_type)
+    # subtracting in the target type wraps around for the out-of-range intermediate values, the results all fit
+    ret_array = np.subtract(arr, arr.dtype.type(min_value), dtype=ret_array_type.to_dtype(), casting='unsafe')
+    return ret_array, ret_array_type, IntegerMinimizeTransformation(arr.dtype.type(min_value))
+
+
+def integer_block_minimize_compression(arr: np.array, block_size: int = 128) -> \
+        Tuple[np.array, NumpyType, Union[IntegerBlockMinimizeTransformation, None]]:
+    """
+    Performs a minimization per block of the integer array, so an outlier or drift only widens its own block.
+    Each block is shifted by its own minimum and bit-packed at its own width
+    :param arr: numpy integer array
+    :param block_size: number of values per block, a multiple of 8
+    :return: packed uint8 array, its NumpyType, and the IntegerBlockMinimizeTransformation info or None
+    """
+    logger.debug('performing a block minimization compression on array with block size %s', block_size)
     arr_type = NumpyType.from_dtype(arr.dtype)
-    logging.debug('array type: {}'.format(arr_type))
-    min_value = np.amin(arr)
-    ret_array, ret_array_type = downcast_integers(arr - min_value)
-    return ret_array, ret_array_type, IntegerMinimizeTransformation(min_value)
+    if block_size <= 0 or block_size % 8 != 0:
+        raise ValueError('block size must be a positive multiple of 8, got {}'.format(block_size))
+    if len(arr) == 0:
+        logger.debug('array is empty, cannot block minimize')
+        return arr, arr_type, None
+    length = len(arr)
+    num_blocks = (length + block_size - 1) // block_size
+    block_starts = np.arange(0, length, block_size)
+    block_mins = np.minimum.reduceat(arr, block_starts)
+    block_maxs = np.maximum.reduceat(arr, block_starts)
+    # work in unsigned 64-bit modular arithmetic, the difference to the block minimum always fits
+    bit_widths = bit_lengths(block_maxs.astype(np.uint64) - block_mins.astype(np.uint64))
+    blocks = np.zeros(num_blocks * block_size, dtype=np.uint64)
+    blocks[:length] = arr.astype(np.uint64) - np.repeat(block_mins.astype(np.uint64), block_size)[:length]
+    packed = pack_blocks(blocks.reshape(num_blocks, block_size), bit_widths)
+    reference_values, reference_values_type = downcast_integers(block_mins)
+    logger.debug('%s blocks packed into %s bytes', num_blocks, len(packed))
+    return packed, NumpyType(NumpyKinds.UNSIGNED, NumpySizes.BYTE), IntegerBlockMinimizeTransformation(
+        block_size, length, reference_values, reference_values_type, bit_widths)
 
 
 def integer_derivative_compression(arr: np.array) -> Tuple[np.array, NumpyType, IntegerElementWiseTransformation]:
@@ -61,46 +114,76 @@ def integer_derivative_compression(arr: np.array) -> Tuple[np.array, NumpyType,
     :param arr: numpy array of integers
     :return: tuple of the new numpy array, the NumpyType, and a list of IntegerTransformations
     """
-    logging.debug('single derivative integer compression beginning')
     first_value = arr[0]
-    arr_type = NumpyType.from_dtype(arr.dtype)
-    logging.debug('first value: {}, array type: {}'.format(first_value, arr_type))
+    source_kind = NumpyKinds.from_dtype(arr.dtype)
+    # differences of unsigned values can be negative, and those of narrow signed values can overflow. They are taken
+    # modulo 2 ** 64, the source kind tells whether the running sums are read back as signed or unsigned
+    arr = arr.astype(np.int64, copy=False)
     elem_array, elem_array_type = downcast_integers(np.ediff1d(arr))
-    logging.debug('element wise array NumpyType: {}'.format(elem_array_type))
-    return elem_array, elem_array_type, IntegerElementWiseTransformation(first_value)
+    logger.debug('derivative from first value %s into %s', first_value, elem_array_type)
+    return elem_array, elem_array_type, IntegerElementWiseTransformation(first_value, source_kind)
+
+
+def integer_zigzag_compression(arr: np.array, extremes: Union[Tuple[int, int], None] = None) -> \
+        Tuple[np.array, NumpyType, Union[IntegerZigzagTransformation, None]]:
+    """
+    Interleaves the negative values of a signed array with the positive ones, 0, -1, 1, -2, 2, ... becoming
+    0, 1, 2, 3, 4, ..., so deltas of either sign become small unsigned values in a single pass. The array is
+    downcast to the smallest signed type first, the zigzag values take the unsigned type of the same width
+    :param arr: numpy integer array
+    :param extremes: (minimum, maximum) of arr when already known, computed with min_max if None
+    :return: unsigned array, its NumpyType, and the IntegerZigzagTransformation info or None without negative values
+    """
+    array_type = NumpyType.from_dtype(arr.dtype)
+    if len(arr) == 0:
+        return arr, array_type, None
+    min_value, max_value = min_max(arr) if extremes is None else extremes
+    if min_value >= 0:
+        logger.debug('array has no negative values, zigzag does not apply')
+        return arr, array_type, None
+    signed_type = NumpyType.from_integer(maximum=max_value, minimum=min_value)
+    arr = arr.astype(signed_type.to_dtype(), copy=False)
+    # the left shift drops the sign bit, the arithmetic right shift spreads it, which XOR-ed flips the negative ones
+    ret_array = np.left_shift(arr, 1)
+    np.bitwise_xor(ret_array, np.right_shift(arr, signed_type.size.value - 1), out=ret_array)
+    ret_array_type = NumpyType(NumpyKinds.UNSIGNED, signed_type.size)
+    logger.debug('zigzag of array with min %s and max %s into %s', min_value, max_value, ret_array_type)
+    return ret_array.view(ret_array_type.to_dtype()), ret_array_type, IntegerZigzagTransformation()
 
 
 def integer_derivative_then_minimize_compression(arr: np.array) -> \
         Tuple[np.array, NumpyType, IntegerElementWiseTransformation, Union[IntegerMinimizeTransformation, None]]:
     """
-    Tries to perform a derivative compression, then optionally tries to minimize. It will return the compressed array
-    as well as the element-wise and minimum transformation or None
+    Performs a derivative compression, then a minimization if the extremes of the deltas show it shrinks them.
+    The extremes decide it without a trial minimization, so deltas spread around zero cost no extra pass. It will
+    return the compressed array as well as the element-wise and minimum transformation or None
     :param arr: integer numpy array
     :return: compressed array, its NumpyType, and the element-transform and minimize-transform, or None if not done
     """
-    logging.debug('integer derivative and minimization compression function')
-    arr_type = NumpyType.from_dtype(arr.dtype)
-    logging.debug('array NumpyType {}'.format(arr_type))
     elem_array, elem_array_type, elem_transform = integer_derivative_compression(arr)
-    logging.debug('element-wise NumpyType {}'.format(elem_array_type))
-    em_array, em_array_type, min_transform = integer_minimize_compression(elem_array)
-    logging.debug('minimize array NumpyType {}'.format(em_array_type))
-    if em_array_type.is_smaller_than(elem_array_type):
-        logging.debug('minimized element-wise array is better, returning that')
-        return em_array, em_array_type, elem_transform, min_transform
-    else:
-        logging.debug('minimized element-wise array does not improve compression')
+    min_value, max_value = min_max(elem_array)
+    if not NumpyType.from_integer(max_value - min_value).is_smaller_than(elem_array_type):
+        logger.debug('minimized element-wise array would not improve compression')
         return elem_array, elem_array_type, elem_transform, None
+    logger.debug('minimized element-wise array is better, returning that')
+    em_array, em_array_type, min_transform = integer_minimize_compression(elem_array, (min_value, max_value))
+    return em_array, em_array_type, elem_transform, min_transform
 
 
-def combined_integer_compression(arr: np.array) -> Tuple[np.array, NumpyType, list]:
+def combined_integer_compression(arr: np.array, bit_pack: bool = False,
+                                 entropy: Union[EntropyCodecs, str, None] = None,
+                                 entropy_level: Union[int, None] = None) -> Tuple[np.array, NumpyType, list]:
     """
-    Executes 3 single_derivative_integer_compressions as well as hash attempts and returns the compressed array,
-    its type, and a list of transforms
+    Executes 3 single_derivative_integer_compressions as well as hash attempts, then run-length attempts on the
+    original and the best array, and returns the compressed array, its type, and a list of transforms
     :param arr: numpy array of integers
-    :return: tuple of the compressed array, its NumpyType, and a list of transformations
+    :param bit_pack: whether to finish with a bit-packing compression when it saves space
+    :param entropy: EntropyCodecs or its name to run over the bytes of the result when it saves space, None to skip
+    :param entropy_level: compression level of the entropy codec, its default if None
+    :return: tuple of the compressed array, its NumpyType, and a list of transformations in the order they
+        are to be undone, i.e. ready for integer_decompression_from_transforms
     """
-    logging.debug('attempting to compress the integer array')
+    logger.debug('attempting to compress the integer array')
     max_loops = 3
     which_loop = 0
     working_array = arr
@@ -114,52 +197,139 @@ def combined_integer_compression(arr: np.array) -> Tuple[np.array, NumpyType, li
     best_hash_type = None
     best_hash_transforms = None
     best_hash_array = None
-    while which_loop < max_loops and working_type.size > NumpySizes.BYTE:
+    while which_loop < max_loops and working_type.size.value > NumpySizes.BYTE.value and len(working_array) > 1:
         which_loop += 1
-        logging.debug('starting {} of {} loops'.format(which_loop, max_loops))
+        logger.debug('starting %s of %s loops', which_loop, max_loops)
         working_array, working_type, elem_t, min_t = integer_derivative_then_minimize_compression(working_array)
-        working_transforms.extend([elem_t, min_t])
+        working_transforms.append(elem_t)
+        if min_t is not None:
+            working_transforms.append(min_t)
 
         hashed_array, hash_keys_type, hash_transform = integer_hash_compression(working_array)
         if hash_transform is not None:  # this requires 20% better improvement than working_array
             if best_hash_array is None:
-                logging.debug('hash was successful, best hash saved')
+                logger.debug('hash was successful, best hash saved')
                 best_hash_type = hash_keys_type
                 best_hash_array = hashed_array
-                best_hash_transforms = working_transforms
-                best_hash_transforms.append(hash_transform)
+                best_hash_transforms = working_transforms + [hash_transform]
             else:  # need to see if it is better
-                logging.debug('hash was successful and better than the working array, see if '
-                              'it is better than previously best hash')
+                logger.debug('hash was successful and better than the working array, see if '
+                             'it is better than previously best hash')
                 prev_best_transform = best_hash_transforms[-1]
-                best_hash_bytes = best_hash_type.size * len(best_hash_array) + \
-                    prev_best_transform.key_values_type.size * len(prev_best_transform.key_values)
-                new_hash_bytes = hash_keys_type.size * len(hashed_array) + \
-                    hash_transform.key_values_type.size * len(hash_transform.key_values)
-                logging.debug('previous best hash requires {} bytes, new hash '
-                              'requires {}'.format(best_hash_bytes, new_hash_bytes))
+                best_hash_bytes = best_hash_type.size.value * len(best_hash_array) + \
+                    prev_best_transform.key_values_type.size.value * len(prev_best_transform.key_values)
+                new_hash_bytes = hash_keys_type.size.value * len(hashed_array) + \
+                    hash_transform.key_values_type.size.value * len(hash_transform.key_values)
+                logger.debug('previous best hash requires %s bytes, new hash '
+                             'requires %s', best_hash_bytes, new_hash_bytes)
                 # require a 10% improvement in order to make the extra transform worth it
                 if new_hash_bytes < 0.9 * best_hash_bytes:
-                    logging.debug('new hash is at least 10% better, saving new hash')
+                    logger.debug('new hash is at least 10% better, saving new hash')
                     best_hash_array = hashed_array
                     best_hash_type = hash_keys_type
-                    best_hash_transforms = working_transforms
-                    best_hash_transforms.append(hash_transform)
-        elif working_type.is_smaller_than(best_type):  # else, we are at least byte-wise smaller, even if no hash
-            logging.debug('element-wise differential and minimized array type is smaller than previous best')
-            best_transforms = working_transforms
+                    best_hash_transforms = working_transforms + [hash_transform]
+        if working_type.is_smaller_than(best_type):  # we are at least byte-wise smaller, even if no hash
+            logger.debug('element-wise differential and minimized array type is smaller than previous best')
+            best_transforms = list(working_transforms)
             best_array = working_array
             best_type = working_type
     if best_hash_array is not None:
-        logging.debug('deciding whether best hash array is better than best non-hash array')
+        logger.debug('deciding whether best hash array is better than best non-hash array')
         hash_transform = best_hash_transforms[-1]
-        hash_bytes = best_hash_type.size * len(best_hash_array) + \
-            hash_transform.key_values_type.size * len(hash_transform.key_values)
-        unhashed_bytes = best_type.size * len(best_array)
+        hash_bytes = best_hash_type.size.value * len(best_hash_array) + \
+            hash_transform.key_values_type.size.value * len(hash_transform.key_values)
+        unhashed_bytes = best_type.size.value * len(best_array)
         if hash_bytes < 0.8 * unhashed_bytes:
-            logging.debug('hashed array is sufficiently better, returning it')
-            return best_hash_array, best_hash_type, best_hash_transforms
-    return best_array, best_type, best_transforms
+            logger.debug('hashed array is sufficiently better, returning it')
+            best_array, best_type, best_transforms = best_hash_array, best_hash_type, best_hash_transforms
+    best_bytes = best_type.size.value * len(best_array) + _transform_table_bytes(best_transforms)
+    for run_source, run_source_transforms in [(arr, []), (best_array, best_transforms)]:
+        run_array, run_type, run_transform = integer_run_length_compression(run_source)
+        if run_transform is None:
+            continue
+        run_bytes = run_type.size.value * len(run_array) + _transform_table_bytes(run_source_transforms) + \
+            run_transform.run_lengths_type.size.value * len(run_transform.run_lengths)
+        logger.debug('run-length array requires %s bytes, best array %s', run_bytes, best_bytes)
+        if run_bytes < 0.8 * best_bytes:  # require a 20% improvement in order to make the extra transform worth it
+            logger.debug('run-length array is sufficiently better, saving it')
+            best_array, best_type, best_bytes = run_array, run_type, run_bytes
+            best_transforms = run_source_transforms + [run_transform]
+    # with bit-packing to come, arrays are compared by the bits of their values rather than by their types
+    best_bytes += len(best_array) * (_value_bits(best_array, best_type, bit_pack) - best_type.size.value)
+    for patch_source, patch_source_transforms in [(arr, []), (best_array, best_transforms)]:
+        # values take at least a bit, or a byte without bit-packing
+        if len(patch_source) * (1 if bit_pack else NumpySizes.BYTE.value) >= 0.8 * best_bytes:
+            continue
+        patched_array, patched_type, patched_transform = integer_patched_compression(patch_source, bit_pack=bit_pack)
+        if patched_transform is None:
+            continue
+        patched_bytes = len(patched_array) * _value_bits(patched_array, patched_type, bit_pack) + \
+            _transform_table_bytes(patch_source_transforms) + len(patched_transform.exception_values) * (
+                patched_transform.values_type.size.value + patched_transform.gaps_type.size.value)
+        logger.debug('patched array requires %s bytes, best array %s', patched_bytes, best_bytes)
+        if patched_bytes < 0.8 * best_bytes:  # require a 20% improvement in order to make the extra transform worth it
+            logger.debug('patched array is sufficiently better, saving it')
+            best_array, best_type, best_bytes = patched_array, patched_type, patched_bytes
+            best_transforms = patch_source_transforms + [patched_transform]
+    if bit_pack:
+        pack_source, pack_transforms = _unsigned_for_bit_pack(best_array, best_type, best_transforms)
+        packed_array, packed_type, bit_pack_transform = integer_bitpack_compression(pack_source)
+        if bit_pack_transform is not None:
+            logger.debug('bit-packing the best array into %s bits', bit_pack_transform.bit_width)
+            best_array, best_type = packed_array, packed_type
+            best_transforms = pack_transforms + [bit_pack_transform]
+    if entropy is not None:
+        entropy_array, entropy_type, entropy_transform = integer_entropy_compression(best_array, entropy,
+                                                                                     entropy_level)
+        if entropy_transform is not None:
+            best_array, best_type = entropy_array, entropy_type
+            best_transforms = best_transforms + [entropy_transform]
+    return best_array, best_type, best_transforms[::-1]
+
+
+def _unsigned_for_bit_pack(arr: np.array, arr_type: NumpyType, transforms: list) -> Tuple[np.array, list]:
+    """
+    Bit-packing needs non-negative values, a signed array is minimized or zigzag encoded first, whichever needs fewer
+    bits. Minimizing only wins for values leaning to one side of zero
+    :param arr: best array of combined_integer_compression
+    :param arr_type: its NumpyType
+    :param transforms: its transforms, in the order they were applied
+    :return: tuple of the array to bit-pack and its transforms, in the order they were applied
+    """
+    if arr_type.kind != NumpyKinds.INTEGER or len(arr) == 0:
+        return arr, transforms
+    extremes = min_max(arr)
+    min_value, max_value = extremes
+    if min_value >= 0:
+        return arr, transforms
+    if (max_value - min_value).bit_length() < max(2 * max_value, -2 * min_value - 1).bit_length():
+        unsigned_array, _, unsigned_transform = integer_minimize_compression(arr, extremes)
+    else:
+        unsigned_array, _, unsigned_transform = integer_zigzag_compression(arr, extremes)
+    return unsigned_array, transforms + [unsigned_transform]
+
+
+def _value_bits(arr: np.array, arr_type: NumpyType, bit_pack: bool) -> int:
+    """
+    :param arr: numpy integer array
+    :param arr_type: its NumpyType
+    :param bit_pack: whether the array is to be bit-packed
+    :return: bits each value takes, those of its range when bit-packed, those of its type otherwise
+    """
+    if not bit_pack or len(arr) == 0:
+        return arr_type.size.value
+    min_value, max_value = min_max(arr)
+    return max(1, (max_value - min_value).bit_length())
+
+
+def _transform_table_bytes(transforms: list) -> int:
+    """
+    Size of the value tables stored in hash transforms, in the units of NumpySizes
+    :param transforms: list of transforms
+    :return: size of the tables
+    """
+    return sum(t.key_values_type.size.value * len(t.key_values) for t in transforms
+               if isinstance(t, IntegerHashTransformation))
 
 
 def integer_hash_compression(arr: np.array) -> Tuple[np.array, NumpyType, Union[IntegerHashTransformation, None]]:
@@ -169,35 +339,194 @@ def integer_hash_compression(arr: np.array) -> Tuple[np.array, NumpyType, Union[
     :return: array of keys, NumpyType of array of keys, IntegerHashTransformation info or None
     """
     array_type = NumpyType.from_dtype(arr.dtype)
-    logging.debug('starting hash integer compression on array with type {}'.format(array_type))
+    logger.debug('starting hash integer compression on array with type %s', array_type)
     if array_type.size == NumpySizes.BYTE:  # no improvement possible
-        logging.debug('array elements are already 1 byte, cannot compress')
+        logger.debug('array elements are already 1 byte, cannot compress')
         return arr, array_type, None
     array_length = len(arr)
     array_bytes = array_length * array_type.size.value
-    logging.debug('array currently is {} bytes'.format(array_bytes))
+    logger.debug('array currently is %s bytes', array_bytes)
 
-    unique_values, unique_values_type = downcast_integers(np.unique(arr))
+    unique_values, inverse = np.unique(arr, return_inverse=True)
+    unique_values, unique_values_type = downcast_integers(unique_values)
     unique_values_len = len(unique_values)
     unique_values_bytes = unique_values_len * unique_values_type.size.value
-    logging.debug('{} unique values of type {}'.format(unique_values_len, unique_values_type))
+    logger.debug('%s unique values of type %s', unique_values_len, unique_values_type)
 
     key_type = NumpyType.from_integer(unique_values_len - 1)
-    logging.debug('key type: {}'.format(key_type))
+    logger.debug('key type: %s', key_type)
     if not key_type.is_smaller_than(array_type):  # keys type isn't less than current size, no improvement
-        logging.debug('key type is not smaller than original array type. hash does not make sense')
+        logger.debug('key type is not smaller than original array type. hash does not make sense')
         return arr, array_type, None
     keys_bytes = array_length * key_type.size.value
-    logging.debug('hash keys require {} bytes'.format(keys_bytes))
+    logger.debug('hash keys require %s bytes', keys_bytes)
     if (keys_bytes + unique_values_bytes) < 0.8 * array_bytes:  # if a 20% byte-wise improvement, proceed
-        logging.debug('at least 20% byte improvement gained, using hash table')
-        hash_dict = {}
-        for i in range(len(unique_values)):
-            hash_dict[unique_values[i]] = i
-        key_array = np.zeros(arr.shape, dtype=key_type.to_dtype())
-        for i in range(len(key_array)):
-            key_array[i] = hash_dict[arr[i]]
+        logger.debug('at least 20% byte improvement gained, using hash table')
+        key_array = inverse.reshape(arr.shape).astype(key_type.to_dtype())
         return key_array, key_type, IntegerHashTransformation(unique_values, unique_values_type)
     else:
-        logging.debug('hash does not give enough byte improvement, abandoning hash')
+        logger.debug('hash does not give enough byte improvement, abandoning hash')
         return arr, array_type, None  # else, no improvement
+
+
+def integer_bitpack_compression(arr: np.array) -> \
+        Tuple[np.array, NumpyType, Union[IntegerBitPackTransformation, None]]:
+    """
+    Packs non-negative integers into as few bits as the largest value needs, below the 8-bit floor of NumpySizes
+    :param arr: numpy integer array
+    :return: packed uint8 array, its NumpyType, and IntegerBitPackTransformation info or None
+    """
+    array_type = NumpyType.from_dtype(arr.dtype)
+    logger.debug('starting bit-pack integer compression on array with type %s', array_type)
+    if len(arr) == 0:
+        logger.debug('array is empty, cannot bit-pack')
+        return arr, array_type, None
+    min_value, max_value = min_max(arr)
+    if min_value < 0:
+        logger.debug('array has negative values, cannot bit-pack')
+        return arr, array_type, None
+    bit_width = max(1, max_value.bit_length())
+    logger.debug('array values fit in %s bits', bit_width)
+    if bit_width >= array_type.size.value:
+        logger.debug('bit width is not smaller than the array type, bit-packing does not make sense')
+        return arr, array_type, None
+    return pack_bits(arr, bit_width), NumpyType(NumpyKinds.UNSIGNED, NumpySizes.BYTE), \
+        IntegerBitPackTransformation(bit_width, len(arr))
+
+
+def integer_run_length_compression(arr: np.array) -> \
+        Tuple[np.array, NumpyType, Union[IntegerRunLengthTransformation, None]]:
+    """
+    Collapses runs of repeated values into one value each, the run lengths are kept in the transformation
+    :param arr: numpy integer array
+    :return: array of run values, its NumpyType, and IntegerRunLengthTransformation info or None
+    """
+    array_type = NumpyType.from_dtype(arr.dtype)
+    if len(arr) == 0:
+        return arr, array_type, None
+    array_bytes = len(arr) * array_type.size.value
+    run_starts = np.flatnonzero(np.concatenate([[True], arr[1:] != arr[:-1]]))
+    run_lengths, run_lengths_type = downcast_integers(np.diff(np.append(run_starts, len(arr))))
+    run_values, run_values_type = downcast_integers(arr[run_starts])
+    run_bytes = len(run_starts) * (run_values_type.size.value + run_lengths_type.size.value)
+    logger.debug('%s runs require %s bytes, array currently is %s bytes', len(run_starts), run_bytes, array_bytes)
+    if run_bytes < 0.8 * array_bytes:  # if a 20% byte-wise improvement, proceed
+        logger.debug('at least 20% byte improvement gained, using run lengths')
+        return run_values, run_values_type, IntegerRunLengthTransformation(run_lengths, run_lengths_type)
+    logger.debug('run lengths do not give enough byte improvement, abandoning run lengths')
+    return arr, array_type, None
+
+
+def integer_sparse_compression(arr: np.array) -> \
+        Tuple[np.array, NumpyType, Union[IntegerSparseTransformation, None]]:
+    """
+    Keeps only the non-zero values, the gaps between them are kept in the transformation
+    :param arr: numpy integer array
+    :return: array of the non-zero values, its NumpyType, and IntegerSparseTransformation info or None
+    """
+    array_type = NumpyType.from_dtype(arr.dtype)
+    if len(arr) == 0:
+        return arr, array_type, None
+    array_bytes = len(arr) * array_type.size.value
+    positions = np.flatnonzero(arr)
+    gaps, gaps_type = downcast_integers(np.ediff1d(positions, to_begin=positions[:1])) if len(positions) > 0 else \
+        (positions.astype(np.uint8), NumpyType(NumpyKinds.UNSIGNED, NumpySizes.BYTE))
+    values, values_type = downcast_integers(arr[positions]) if len(positions) > 0 else \
+        (positions.astype(np.uint8), NumpyType(NumpyKinds.UNSIGNED, NumpySizes.BYTE))
+    sparse_bytes = len(positions) * (values_type.size.value + gaps_type.size.value)
+    logger.debug('%s non-zero values require %s bytes, array currently is %s bytes', len(positions), sparse_bytes,
+                 array_bytes)
+    if sparse_bytes < 0.8 * array_bytes:  # if a 20% byte-wise improvement, proceed
+        logger.debug('at least 20% byte improvement gained, keeping the non-zero values')
+        return values, values_type, IntegerSparseTransformation(gaps, gaps_type, len(arr))
+    logger.debug('non-zero values do not give enough byte improvement, abandoning sparse')
+    return arr, array_type, None
+
+
+def integer_patched_compression(arr: np.array, coverage: float = 0.99, bit_pack: bool = False) -> \
+        Tuple[np.array, NumpyType, Union[IntegerPatchedTransformation, None]]:
+    """
+    Patched frame of reference. The values are minimized by a reference that a share of them are within a narrow
+    width of, the values out of the width are kept apart as exceptions, so a few spikes do not widen the whole array
+    :param arr: numpy integer array
+    :param coverage: share of the values the width is picked for, the others may become exceptions. The share is
+        taken of at most PATCHED_SAMPLE_SIZE evenly spaced values
+    :param bit_pack: whether the result is to be bit-packed, the width is then counted in bits rather than NumpySizes
+    :return: array of the values minus the reference, 0 for the exceptions, its NumpyType, and
+        IntegerPatchedTransformation info or None
+    """
+    array_type = NumpyType.from_dtype(arr.dtype)
+    sample = arr[::max(1, len(arr) // PATCHED_SAMPLE_SIZE)]
+    num_outliers = int(len(sample) * (1.0 - coverage))
+    if num_outliers == 0:
+        logger.debug('no value of the array may be an exception, cannot patch')
+        return arr, array_type, None
+    min_value, max_value = min_max(arr)
+    array_bits = max(1, (max_value - min_value).bit_length()) if bit_pack else array_type.size.value
+    array_bytes = len(arr) * array_bits
+    # the width covers the sampled values between the ranks, the outliers split evenly below and above them
+    low_rank = num_outliers // 2
+    high_rank = len(sample) - 1 - (num_outliers - low_rank)
+    partitioned = np.partition(sample, [low_rank, high_rank])
+    high_value = int(partitioned[high_rank])
+    span = high_value - int(partitioned[low_rank])
+    bit_width = max(1, span.bit_length())
+    patched_type = NumpyType.from_integer(span)
+    value_bits = bit_width if bit_pack else patched_type.size.value
+    if len(arr) * value_bits >= 0.8 * array_bytes:
+        logger.debug('%s bits per value are not narrow enough to patch an array of %s bytes', value_bits, array_bytes)
+        return arr, array_type, None
+    width_max = (1 << bit_width) - 1 if bit_pack else int(np.iinfo(patched_type.to_dtype()).max)
+    # the reference slides down to the lowest value the width still reaches the high rank from
+    reference_value = arr[arr >= arr.dtype.type(max(high_value - width_max, min_value))].min()
+    upper_value = min(int(reference_value) + width_max, max_value)
+    positions = np.flatnonzero((arr < reference_value) | (arr > arr.dtype.type(upper_value)))
+    gaps, gaps_type = downcast_integers(np.ediff1d(positions, to_begin=positions[:1])) if len(positions) > 0 else \
+        (positions.astype(np.uint8), NumpyType(NumpyKinds.UNSIGNED, NumpySizes.BYTE))
+    values, values_type = downcast_integers(arr[positions]) if len(positions) > 0 else \
+        (positions.astype(np.uint8), NumpyType(NumpyKinds.UNSIGNED, NumpySizes.BYTE))
+    patched_bytes = len(arr) * value_bits + len(positions) * (values_type.size.value + gaps_type.size.value)
+    logger.debug('%s values patched in %s bits with %s exceptions require %s bytes, array currently is %s bytes',
+                 len(arr), value_bits, len(positions), patched_bytes, array_bytes)
+    if patched_bytes < 0.8 * array_bytes:  # if a 20% byte-wise improvement, proceed
+        logger.debug('at least 20% byte improvement gained, patching the exceptions')
+        patched_array = np.subtract(arr, reference_value, dtype=patched_type.to_dtype(), casting='unsafe')
+        patched_array[positions] = 0
+        return patched_array, patched_type, IntegerPatchedTransformation(reference_value, gaps, gaps_type, values,
+                                                                         values_type)
+    logger.debug('exceptions do not give enough byte improvement, abandoning patching')
+    return arr, array_type, None
+
+
+def integer_entropy_compression(arr: np.array, codec: Union[EntropyCodecs, str] = EntropyCodecs.ZLIB,
+                                level: Union[int, None] = None) -> \
+        Tuple[np.array, NumpyType, Union[IntegerEntropyTransformation, None]]:
+    """
+    Compresses the bytes of an array with a general-purpose coder of the standard library, reading them straight from
+    the array's buffer. Meant as the last stage after the numeric transforms, whose narrow output often still has
+    repeated byte patterns
+    :param arr: numpy integer array
+    :param codec: EntropyCodecs or its name, zlib, lzma or bz2
+    :param level: compression level, from 0 to 9 or from 1 to 9 for bz2, the codec's default if None
+    :return: uint8 array of the compressed bytes, its NumpyType, and IntegerEntropyTransformation info or None
+    """
+    codec = EntropyCodecs(codec)
+    level = ENTROPY_DEFAULT_LEVELS[codec] if level is None else level
+    min_level, max_level = ENTROPY_LEVEL_RANGES[codec]
+    if not min_level <= level <= max_level:
+        raise ValueError('{} level must be between {} and {}, got {}'.format(codec.value, min_level, max_level,
+                                                                            level))
+    array_type = NumpyType.from_dtype(arr.dtype)
+    if len(arr) == 0:
+        logger.debug('array is empty, nothing to entropy code')
+        return arr, array_type, None
+    # little-endian, so the bytes decode the same on any machine, a view when arr already is
+    payload = np.ascontiguousarray(arr, dtype=arr.dtype.newbyteorder('<'))
+    compressed = ENTROPY_CODERS[codec][0](memoryview(payload), level)
+    logger.debug('%s coded %s bytes into %s at level %s', codec, payload.nbytes, len(compressed), level)
+    if len(compressed) < 0.8 * payload.nbytes:  # if a 20% byte-wise improvement, proceed
+        logger.debug('at least 20% byte improvement gained, keeping the entropy coded bytes')
+        return np.frombuffer(compressed, dtype=np.uint8), NumpyType(NumpyKinds.UNSIGNED, NumpySizes.BYTE), \
+            IntegerEntropyTransformation(codec, level, array_type, len(arr))
+    logger.debug('entropy coding does not give enough byte improvement, abandoning it')
+    return arr, array_type, None
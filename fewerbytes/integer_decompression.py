@@ -5,84 +5,627 @@ from fewerbytes.compression_details import (
     IntegerMinimizeTransformation,
     IntegerElementWiseTransformation,
     IntegerHashTransformation,
+    IntegerBitPackTransformation,
+    IntegerBlockMinimizeTransformation,
+    IntegerRunLengthTransformation,
+    IntegerZigzagTransformation,
+    IntegerDictionaryTransformation,
+    IntegerSparseTransformation,
+    IntegerDatetimeTransformation,
+    IntegerPatchedTransformation,
+    IntegerEliasFanoTransformation,
+    IntegerEntropyTransformation,
     IntegerTransformTypes
 )
-from fewerbytes.integer_compression import downcast_integers
+from fewerbytes.bit_packing import unpack_bits, unpack_blocks
+from fewerbytes.integer_compression import downcast_integers, ENTROPY_CODERS, ENTROPY_ERRORS
+from fewerbytes.dictionaries import resolve_dictionary, resolve_dictionaries
+from fewerbytes.exceptions import InvalidCompressedFormatException
 import fewerbytes.types as t
 
+logger = logging.getLogger(__name__)
 
-def integer_minimize_decompression(arr: np.array, transform: IntegerMinimizeTransformation) -> np.array:
+# passes of downcast_integers over an array, one for the minimum, one for the maximum and one to copy it
+DOWNCAST_PASSES = 3
+
+
+def _accumulator_dtype(arr: np.array, reference_value: int) -> type:
+    """
+    Picks the 64-bit integer type used to undo a transform, signed if either the array or the reference is signed
+    :param arr: compressed array
+    :param reference_value: reference value of the transform
+    :return: numpy dtype, np.int64 or np.uint64
+    """
+    if t.NumpyKinds.from_dtype(arr.dtype) == t.NumpyKinds.INTEGER or reference_value < 0:
+        return np.int64
+    return np.uint64
+
+
+def _output_array(out: Union[np.array, None], dtype, length: int) -> np.array:
+    """
+    Array a decompression writes into
+    :param out: caller-provided array, or None
+    :param dtype: dtype of the array to allocate when out is None
+    :param length: number of decompressed values
+    :return: out, or a new uninitialized array
+    """
+    if out is None:
+        return np.empty(length, dtype=dtype)
+    if out.shape != (length,):
+        raise ValueError('out has shape {}, expecting ({},)'.format(out.shape, length))
+    return out
+
+
+def _wrapped(value: int, dtype) -> np.generic:
+    """
+    Casts a reference value to dtype, wrapping around like the modular arithmetic of the decompressions does. The
+    result is exact as long as the decompressed values fit in dtype
+    :param value: python integer
+    :param dtype: numpy dtype
+    :return: numpy scalar of dtype
+    """
+    return np.array(value, dtype=np.int64 if value < 0 else np.uint64).astype(dtype)[()]
+
+
+def integer_minimize_decompression(arr: np.array, transform: IntegerMinimizeTransformation,
+                                   out: Union[np.array, None] = None, dtype=None) -> np.array:
     """
     Decompresses a minimize transform
     :param arr: minimized array
     :param transform: transformation info
-    :return: un-minimized array
+    :param out: optional array of len(arr) values to decompress into, in its own dtype
+    :param dtype: optional dtype of the result, the smallest integer type holding it if None
+    :return: un-minimized array, out if given
+    """
+    logger.debug('decompressing minimized array with info: %s', transform)
+    if out is None and dtype is None:
+        # make it as big as possible then shrink after addition
+        ret_dtype = _accumulator_dtype(arr, transform.reference_value)
+        return downcast_integers(np.add(arr, ret_dtype(transform.reference_value), dtype=ret_dtype))[0]
+    out = _output_array(out, dtype, len(arr))
+    np.add(arr, _wrapped(transform.reference_value, out.dtype), out=out, dtype=out.dtype, casting='unsafe')
+    return out
+
+
+def integer_block_minimize_decompression(arr: np.array, transform: IntegerBlockMinimizeTransformation,
+                                         out: Union[np.array, None] = None, dtype=None) -> np.array:
+    """
+    Decompresses a block minimize transform
+    :param arr: packed uint8 array
+    :param transform: transformation info
+    :param out: optional array of transform.length values to decompress into, in its own dtype
+    :param dtype: optional dtype of the result, the smallest integer type holding it if None
+    :return: un-minimized array, out if given
     """
-    logging.debug('decompressing minimized array with info: {}'.format(transform))
-    ret_array_type = t.NumpyType(
-        kind=t.NumpyKinds.from_dtype(arr.dtype),
-        size=t.NumpySizes.DOUBLE  # make it as big as possible then shrink after addition
-    )
-    return downcast_integers(arr.astype(ret_array_type.to_dtype()) + transform.reference_value)[0]
+    logger.debug('decompressing block minimized array with info: %s', transform)
+    blocks = unpack_blocks(arr, transform.bit_widths, transform.block_size)
+    # unsigned 64-bit modular addition, viewed as signed afterwards if any reference is negative
+    blocks += transform.reference_values.astype(np.uint64)[:, np.newaxis]
+    ret_array = blocks.ravel()[:transform.length]
+    if transform.reference_values_type.kind == t.NumpyKinds.INTEGER:
+        ret_array = ret_array.view(np.int64)
+    if out is None and dtype is None:
+        return downcast_integers(ret_array)[0]
+    out = _output_array(out, dtype, transform.length)
+    out[...] = ret_array
+    return out
 
 
-def integer_derivative_decompression(arr: np.array, transform: IntegerElementWiseTransformation) -> np.array:
+def integer_derivative_decompression(arr: np.array, transform: IntegerElementWiseTransformation,
+                                     out: Union[np.array, None] = None, dtype=None) -> np.array:
     """
     Decompresses an element-wise derivative transform
     :param arr: derivative array
     :param transform: transformation info
-    :return: decompressed array
+    :param out: optional array of len(arr) + 1 values to decompress into, in its own dtype
+    :param dtype: optional dtype of the result, the smallest integer type holding it if None
+    :return: decompressed array, out if given
     """
-    logging.debug('decompressing derivative array with info: {}'.format(transform))
-    ret_array_type = t.NumpyType(
-        kind=t.NumpyKinds.from_dtype(arr.dtype),
-        size=t.NumpySizes.DOUBLE
-    )
-    ret_array = np.cumsum(arr.astype(ret_array_type.to_dtype())) + transform.reference_value
-    ret_array = np.insert(ret_array, 0, transform.reference_value)
-    return downcast_integers(ret_array)[0]
+    logger.debug('decompressing derivative array with info: %s', transform)
+    if out is None and dtype is None:
+        ret_dtype = np.uint64 if transform.source_kind == t.NumpyKinds.UNSIGNED else \
+            _accumulator_dtype(arr, transform.reference_value)
+        return downcast_integers(integer_derivative_decompression(arr, transform, dtype=ret_dtype))[0]
+    out = _output_array(out, dtype, len(arr) + 1)
+    # the reference value leads the deltas, so a single in-place running sum restores every value
+    out[0] = _wrapped(transform.reference_value, out.dtype)
+    out[1:] = arr
+    np.cumsum(out, dtype=out.dtype, out=out)
+    return out
 
 
-def integer_hash_decompression(arr: np.array, transform: IntegerHashTransformation) -> np.array:
+def _check_hash_keys(arr: np.array, num_keys: int):
+    """
+    Validates the keys of a hashed array once, so the lookups can take them unchecked
+    :param arr: compressed key array
+    :param num_keys: number of key values of the hash transform
+    :return:
+    """
+    if len(arr) == 0:
+        return
+    if int(arr.max()) >= num_keys or (arr.dtype.kind == 'i' and int(arr.min()) < 0):
+        raise InvalidCompressedFormatException('hashed array has keys outside of its {} key values'.format(num_keys))
+    return
+
+
+def integer_hash_decompression(arr: np.array, transform: IntegerHashTransformation,
+                               out: Union[np.array, None] = None, dtype=None) -> np.array:
     """
     Decompresses a hashed integer array
     :param arr: compressed key array
     :param transform: hash transform info
-    :return: decompressed array
+    :param out: optional array of len(arr) values to decompress into, in its own dtype
+    :param dtype: optional dtype of the result, the smallest integer type holding it if None
+    :return: decompressed array, out if given
+    """
+    logger.debug('decompressing hash array with info: %s', transform)
+    # a single max reduction validates the keys, clipping then avoids the buffered bounds check of mode='raise'
+    _check_hash_keys(arr, len(transform.key_values))
+    if out is None and dtype is None:
+        ret_array = np.take(transform.key_values, arr, mode='clip').astype(transform.key_values_type.to_dtype(),
+                                                                         copy=False)
+        return downcast_integers(ret_array)[0]
+    out = _output_array(out, dtype, len(arr))
+    np.take(transform.key_values.astype(out.dtype), arr, out=out, mode='clip')
+    return out
+
+
+def integer_run_length_decompression(arr: np.array, transform: IntegerRunLengthTransformation,
+                                     out: Union[np.array, None] = None, dtype=None) -> np.array:
+    """
+    Decompresses a run-length integer array
+    :param arr: array of run values
+    :param transform: run-length transform info
+    :param out: optional array of sum(run_lengths) values to decompress into, in its own dtype
+    :param dtype: optional dtype of the result, the type of arr if None
+    :return: decompressed array, out if given
+    """
+    logger.debug('decompressing run-length array with info: %s', transform)
+    if out is None and dtype is None:
+        return np.repeat(arr, transform.run_lengths)
+    run_ends = np.cumsum(transform.run_lengths, dtype=np.int64)
+    out = _output_array(out, dtype, int(run_ends[-1]) if len(run_ends) > 0 else 0)
+    values = arr.astype(out.dtype)
+    if out.dtype.kind not in 'iu' or len(values) == 0:
+        out[...] = np.repeat(values, transform.run_lengths)
+        return out
+    # write the step between runs at the start of each run, then a running sum fills the runs in place
+    out.fill(0)
+    out[0] = values[0]
+    out[run_ends[:-1]] = np.diff(values)
+    np.cumsum(out, dtype=out.dtype, out=out)
+    return out
+
+
+def integer_bitpack_decompression(arr: np.array, transform: IntegerBitPackTransformation,
+                                  out: Union[np.array, None] = None, dtype=None) -> np.array:
+    """
+    Decompresses a bit-packed integer array
+    :param arr: packed uint8 array
+    :param transform: bit-pack transform info
+    :param out: optional array of transform.length values to decompress into, in its own dtype
+    :param dtype: optional dtype of the result, the smallest unsigned type holding bit_width bits if None
+    :return: decompressed array, out if given
+    """
+    logger.debug('decompressing bit-packed array with info: %s', transform)
+    if out is None and dtype is None:
+        return unpack_bits(arr, transform.bit_width, transform.length)
+    return unpack_bits(arr, transform.bit_width, transform.length,
+                       out=_output_array(out, dtype, transform.length))
+
+
+def integer_zigzag_decompression(arr: np.array, transform: IntegerZigzagTransformation,
+                                 out: Union[np.array, None] = None, dtype=None) -> np.array:
+    """
+    Decompresses a zigzag encoded array, the halved values XOR-ed with the sign spread from the lowest bit
+    :param arr: unsigned zigzag array
+    :param transform: zigzag transform info
+    :param out: optional array of len(arr) values to decompress into, in its own dtype
+    :param dtype: optional dtype of the result, the signed type of the width of arr if None
+    :return: decompressed array, out if given
+    """
+    logger.debug('decompressing zigzag array with info: %s', transform)
+    signed_dtype = np.dtype('i{}'.format(arr.dtype.itemsize))
+    ret_array = np.right_shift(arr, 1).view(signed_dtype)
+    np.bitwise_xor(ret_array, np.negative(np.bitwise_and(arr, 1).view(signed_dtype)), out=ret_array)
+    if out is None and dtype is None:
+        return ret_array
+    out = _output_array(out, dtype, len(arr))
+    out[...] = ret_array
+    return out
+
+
+def integer_sparse_decompression(arr: np.array, transform: IntegerSparseTransformation,
+                                 out: Union[np.array, None] = None, dtype=None) -> np.array:
+    """
+    Decompresses a sparse array, scattering the non-zero values into zeros
+    :param arr: array of the non-zero values
+    :param transform: sparse transform info
+    :param out: optional array of transform.length values to decompress into, in its own dtype
+    :param dtype: optional dtype of the result, the type of arr if None
+    :return: decompressed array, out if given
+    """
+    logger.debug('decompressing sparse array with info: %s', transform)
+    out = _output_array(out, arr.dtype if dtype is None else dtype, transform.length)
+    out.fill(0)
+    out[np.cumsum(transform.gaps, dtype=np.int64)] = arr
+    return out
+
+
+def integer_datetime_decompression(arr: np.array, transform: IntegerDatetimeTransformation,
+                                   out: Union[np.array, None] = None, dtype=None) -> np.array:
+    """
+    Restores datetime or timedelta values from the int64 counts of their unit
+    :param arr: integer array
+    :param transform: datetime transform info
+    :param out: optional array of len(arr) values to decompress into, a datetime one of the same unit is written
+        through an int64 view
+    :param dtype: optional dtype of the result, transform.datetime_dtype if None
+    :return: decompressed array, out if given
+    """
+    logger.debug('decompressing datetime array with info: %s', transform)
+    if out is None and (dtype is None or np.dtype(dtype) == transform.datetime_dtype):
+        return arr.astype(np.int64, copy=False).view(transform.datetime_dtype)
+    out = _output_array(out, dtype, len(arr))
+    if out.dtype == transform.datetime_dtype:
+        out.view(np.int64)[...] = arr
+    else:
+        out[...] = arr.astype(np.int64, copy=False).view(transform.datetime_dtype)
+    return out
+
+
+def integer_patched_decompression(arr: np.array, transform: IntegerPatchedTransformation,
+                                  out: Union[np.array, None] = None, dtype=None) -> np.array:
+    """
+    Decompresses a patched frame of reference, adding the reference and scattering the exceptions back
+    :param arr: minimized array, 0 at the exceptions
+    :param transform: patched transform info
+    :param out: optional array of len(arr) values to decompress into, in its own dtype
+    :param dtype: optional dtype of the result, the smallest integer type holding it if None
+    :return: decompressed array, out if given
     """
-    logging.debug('decompressing hash array with info: {}'.format(transform))
-    ret_array = np.zeros(arr.shape, dtype=transform.key_values_type.to_dtype())
-    for i in range(len(arr)):
-        ret_array[i] = transform.key_values[arr[i]]
-    return downcast_integers(ret_array)[0]
+    logger.debug('decompressing patched array with info: %s', transform)
+    positions = np.cumsum(transform.exception_gaps, dtype=np.int64)
+    if out is None and dtype is None:
+        ret_dtype = np.int64 if transform.values_type.kind == t.NumpyKinds.INTEGER else \
+            _accumulator_dtype(arr, transform.reference_value)
+        ret_array = np.add(arr, _wrapped(int(transform.reference_value), ret_dtype), dtype=ret_dtype)
+        ret_array[positions] = transform.exception_values
+        return downcast_integers(ret_array)[0]
+    out = _output_array(out, dtype, len(arr))
+    np.add(arr, _wrapped(int(transform.reference_value), out.dtype), out=out, dtype=out.dtype, casting='unsafe')
+    out[positions] = transform.exception_values
+    return out
+
+
+def integer_elias_fano_decompression(arr: np.array, transform: IntegerEliasFanoTransformation,
+                                     out: Union[np.array, None] = None, dtype=None) -> np.array:
+    """
+    Decompresses an Elias-Fano encoded array, the high part of every value being the position of its upper bit minus
+    its index
+    :param arr: packed low bits
+    :param transform: Elias-Fano transform info
+    :param out: optional array of transform.length values to decompress into, in its own dtype
+    :param dtype: optional dtype of the result, the smallest integer type holding it if None
+    :return: decompressed array, out if given
+    """
+    logger.debug('decompressing Elias-Fano array with info: %s', transform)
+    ret_array = np.flatnonzero(np.unpackbits(transform.upper_bits))[:transform.length]
+    ret_array -= np.arange(transform.length, dtype=np.int64)
+    ret_array = ret_array.view(np.uint64)
+    ret_array <<= np.uint64(transform.low_bits)
+    if transform.low_bits > 0:
+        ret_array |= unpack_bits(arr, transform.low_bits, transform.length)
+    # unsigned 64-bit modular addition, viewed as signed afterwards if the reference is negative
+    ret_array += _wrapped(int(transform.reference_value), np.uint64)
+    if transform.reference_value < 0:
+        ret_array = ret_array.view(np.int64)
+    if out is None and dtype is None:
+        return downcast_integers(ret_array)[0]
+    out = _output_array(out, dtype, transform.length)
+    out[...] = ret_array
+    return out
+
+
+def integer_entropy_decompression(arr: np.array, transform: IntegerEntropyTransformation,
+                                  out: Union[np.array, None] = None, dtype=None) -> np.array:
+    """
+    Decodes the bytes of an entropy coded array, reading them straight from the array's buffer. Decoding stops one
+    byte past the expected length, so a corrupt stream cannot inflate beyond it
+    :param arr: uint8 array of the compressed bytes
+    :param transform: entropy transform info
+    :param out: optional array of transform.length values to decompress into, in its own dtype
+    :param dtype: optional dtype of the result, the type of the coded array if None
+    :return: decompressed array, read-only when neither out nor dtype is given, out if given
+    """
+    logger.debug('decompressing entropy coded array with info: %s', transform)
+    array_dtype = np.dtype(transform.array_type.to_dtype()).newbyteorder('<')
+    expected_bytes = transform.length * array_dtype.itemsize
+    decompressor = ENTROPY_CODERS[transform.codec][1]()
+    try:
+        data = decompressor.decompress(memoryview(np.ascontiguousarray(arr)), expected_bytes + 1)
+    except ENTROPY_ERRORS as e:
+        raise InvalidCompressedFormatException('invalid {} coded array: {}'.format(transform.codec, e))
+    if len(data) != expected_bytes or not decompressor.eof:
+        raise InvalidCompressedFormatException('{} coded array does not decode into {} values of {}'.format(
+            transform.codec, transform.length, transform.array_type))
+    if decompressor.unused_data:
+        raise InvalidCompressedFormatException('{} coded array has {} bytes of trailing data'.format(
+            transform.codec, len(decompressor.unused_data)))
+    ret_array = np.frombuffer(data, dtype=array_dtype)
+    if out is None and dtype is None:
+        return ret_array
+    out = _output_array(out, dtype, transform.length)
+    out[...] = ret_array
+    return out
 
 
 def integer_decompression_from_transform(
         arr: np.array, transform: Union[IntegerElementWiseTransformation, IntegerMinimizeTransformation,
-                                        IntegerHashTransformation]) -> np.array:
+                                        IntegerHashTransformation, IntegerBitPackTransformation,
+                                        IntegerBlockMinimizeTransformation, IntegerRunLengthTransformation,
+                                        IntegerZigzagTransformation, IntegerDictionaryTransformation,
+                                        IntegerSparseTransformation, IntegerDatetimeTransformation,
+                                        IntegerPatchedTransformation, IntegerEliasFanoTransformation,
+                                        IntegerEntropyTransformation],
+        out: Union[np.array, None] = None, dtype=None, dictionaries: Union[dict, None] = None) -> np.array:
     """
     Decompresses an integer array from a transformation
     :param arr: compressed integer array
     :param transform: transformation information
-    :return: decompressed array
+    :param out: optional array to decompress into, in its own dtype
+    :param dtype: optional dtype of the result
+    :param dictionaries: optional mapping of dictionary ids to HashDictionary for dictionary transforms, the
+        registered dictionaries are searched after it
+    :return: decompressed array, out if given
     """
     if transform.transform_type == IntegerTransformTypes.MINIMIZE:
-        return integer_minimize_decompression(arr, transform)
+        return integer_minimize_decompression(arr, transform, out=out, dtype=dtype)
     elif transform.transform_type == IntegerTransformTypes.DERIVATIVE:
-        return integer_derivative_decompression(arr, transform)
+        return integer_derivative_decompression(arr, transform, out=out, dtype=dtype)
     elif transform.transform_type == IntegerTransformTypes.HASH:
-        return integer_hash_decompression(arr, transform)
+        return integer_hash_decompression(arr, transform, out=out, dtype=dtype)
+    elif transform.transform_type == IntegerTransformTypes.BIT_PACK:
+        return integer_bitpack_decompression(arr, transform, out=out, dtype=dtype)
+    elif transform.transform_type == IntegerTransformTypes.BLOCK_MINIMIZE:
+        return integer_block_minimize_decompression(arr, transform, out=out, dtype=dtype)
+    elif transform.transform_type == IntegerTransformTypes.RUN_LENGTH:
+        return integer_run_length_decompression(arr, transform, out=out, dtype=dtype)
+    elif transform.transform_type == IntegerTransformTypes.ZIGZAG:
+        return integer_zigzag_decompression(arr, transform, out=out, dtype=dtype)
+    elif transform.transform_type == IntegerTransformTypes.DICTIONARY:
+        return integer_hash_decompression(arr, resolve_dictionary(transform, dictionaries), out=out, dtype=dtype)
+    elif transform.transform_type == IntegerTransformTypes.SPARSE:
+        return integer_sparse_decompression(arr, transform, out=out, dtype=dtype)
+    elif transform.transform_type == IntegerTransformTypes.DATETIME:
+        return integer_datetime_decompression(arr, transform, out=out, dtype=dtype)
+    elif transform.transform_type == IntegerTransformTypes.PATCHED:
+        return integer_patched_decompression(arr, transform, out=out, dtype=dtype)
+    elif transform.transform_type == IntegerTransformTypes.ELIAS_FANO:
+        return integer_elias_fano_decompression(arr, transform, out=out, dtype=dtype)
+    elif transform.transform_type == IntegerTransformTypes.ENTROPY:
+        return integer_entropy_decompression(arr, transform, out=out, dtype=dtype)
     raise ValueError('Unable to decompress array using transform: {}'.format(transform))
 
 
-def integer_decompression_from_transforms(arr: np.array, transforms: list) -> np.array:
+def _decompressed_length(arr: np.array, transform) -> int:
+    """
+    :param arr: compressed array
+    :param transform: transform to undo
+    :return: number of values undoing transform on arr produces
+    """
+    if transform.transform_type in (IntegerTransformTypes.BIT_PACK, IntegerTransformTypes.BLOCK_MINIMIZE,
+                                    IntegerTransformTypes.SPARSE, IntegerTransformTypes.ELIAS_FANO,
+                                    IntegerTransformTypes.ENTROPY):
+        return transform.length
+    if transform.transform_type == IntegerTransformTypes.RUN_LENGTH:
+        return int(np.sum(transform.run_lengths, dtype=np.int64))
+    if transform.transform_type == IntegerTransformTypes.DERIVATIVE:
+        return len(arr) + 1
+    return len(arr)
+
+
+class FusedDecompression:
+    def __init__(self, source=None):
+        """
+        A run of minimize and derivative transforms undone together. The values are laid out once behind the
+        derivative references, with the offsets of the leading minimize transforms added on the way, then every
+        derivative is one in-place running sum. Minimize transforms following a derivative only shift its reference
+        :param source: transform undone right before the run, decompressed straight into the output, or None
+        """
+        self.source = source
+        self.offset = 0
+        self.references = []
+        # whether the run ends with the derivative of an unsigned array, whose values are read back as unsigned
+        self.unsigned = False
+        return
+
+    def __repr__(self):
+        return '<{}, {} source={}, offset={}, references={}>'.format(
+            self.__class__.__name__, hex(id(self)), self.source, self.offset, self.references)
+
+    def add_transform(self, transform: Union[IntegerMinimizeTransformation, IntegerElementWiseTransformation]):
+        """
+        :param transform: next minimize or derivative transform to undo
+        """
+        if transform.transform_type == IntegerTransformTypes.DERIVATIVE:
+            self.references.append(int(transform.reference_value))
+            self.unsigned = transform.source_kind == t.NumpyKinds.UNSIGNED
+        elif len(self.references) == 0:
+            self.offset += int(transform.reference_value)
+        else:
+            # a constant added after a running sum is the same as a constant added to its first value
+            self.references[-1] += int(transform.reference_value)
+            self.unsigned = False
+        return
+
+    @property
+    def passes(self) -> int:
+        """
+        :return: number of passes over the output
+        """
+        passes = 1 + len(self.references)
+        if self.source is not None and self.source.transform_type == IntegerTransformTypes.BLOCK_MINIMIZE:
+            passes += 1
+        if self.offset != 0 and self.source is not None and self.source.transform_type in (
+                IntegerTransformTypes.BIT_PACK, IntegerTransformTypes.BLOCK_MINIMIZE):
+            passes += 1
+        return passes
+
+    def accumulator_dtype(self, arr: np.array) -> type:
+        """
+        Picks the 64-bit integer type the run is undone in, signed if the values it starts from or any offset or
+        reference is, like _accumulator_dtype. A run ending with the derivative of an unsigned array is undone
+        unsigned whatever the signs of its deltas, the sums modulo 2 ** 64 being the same
+        :param arr: compressed array
+        :return: numpy dtype, np.int64 or np.uint64
+        """
+        if self.unsigned:
+            return np.uint64
+        int64_max = np.iinfo(np.int64).max
+        if self.offset > int64_max or any(r > int64_max for r in self.references):
+            return np.uint64
+        if self.offset < 0 or any(r < 0 for r in self.references):
+            return np.int64
+        if self.source is None or self.source.transform_type in (IntegerTransformTypes.RUN_LENGTH,
+                                                                 IntegerTransformTypes.SPARSE):
+            kind = t.NumpyKinds.from_dtype(arr.dtype)
+        elif self.source.transform_type == IntegerTransformTypes.HASH:
+            kind = t.NumpyKinds.from_dtype(self.source.key_values.dtype)
+        elif self.source.transform_type == IntegerTransformTypes.BLOCK_MINIMIZE:
+            kind = self.source.reference_values_type.kind
+        elif self.source.transform_type == IntegerTransformTypes.ZIGZAG:
+            kind = t.NumpyKinds.INTEGER
+        elif self.source.transform_type == IntegerTransformTypes.ENTROPY:
+            kind = self.source.array_type.kind
+        elif self.source.transform_type == IntegerTransformTypes.ELIAS_FANO:
+            kind = t.NumpyKinds.INTEGER if self.source.reference_value < 0 else t.NumpyKinds.UNSIGNED
+        elif self.source.transform_type == IntegerTransformTypes.PATCHED:
+            kind = t.NumpyKinds.INTEGER if self.source.values_type.kind == t.NumpyKinds.INTEGER or \
+                self.source.reference_value < 0 else t.NumpyKinds.UNSIGNED
+        else:
+            kind = t.NumpyKinds.UNSIGNED
+        return np.int64 if kind == t.NumpyKinds.INTEGER else np.uint64
+
+    def execute(self, arr: np.array, out: Union[np.array, None] = None, dtype=None) -> np.array:
+        """
+        Undoes the source transform and the run
+        :param arr: compressed array
+        :param out: optional array to decompress into, in its own dtype
+        :param dtype: dtype of the result when out is None
+        :return: decompressed array, out if given
+        """
+        length = len(arr) if self.source is None else _decompressed_length(arr, self.source)
+        depth = len(self.references)
+        out = _output_array(out, dtype, length + depth)
+        values = out[depth:]
+        offset = _wrapped(self.offset, out.dtype)
+        if self.source is None and self.offset == 0:
+            values[...] = arr
+        elif self.source is None:
+            np.add(arr, offset, out=values, dtype=out.dtype, casting='unsafe')
+        elif self.source.transform_type == IntegerTransformTypes.HASH:
+            _check_hash_keys(arr, len(self.source.key_values))
+            np.take(np.add(self.source.key_values, offset, dtype=out.dtype, casting='unsafe'), arr, out=values,
+                    mode='clip')
+        elif self.source.transform_type == IntegerTransformTypes.RUN_LENGTH:
+            integer_run_length_decompression(np.add(arr, offset, dtype=out.dtype, casting='unsafe'), self.source,
+                                             out=values)
+        else:
+            integer_decompression_from_transform(arr, self.source, out=values)
+            if self.offset != 0:
+                values += offset
+        for position in range(depth - 1, -1, -1):
+            out[position] = _wrapped(self.references[depth - 1 - position], out.dtype)
+            np.cumsum(out[position:], dtype=out.dtype, out=out[position:])
+        return out
+
+
+class DecompressionPlan:
+    def __init__(self, steps: list):
+        """
+        Decode of a transform chain, planned once
+        :param steps: transforms and FusedDecompression runs, in the order they are to be undone
+        """
+        self.steps = steps
+        return
+
+    def __repr__(self):
+        return '<{}, {} steps={}>'.format(self.__class__.__name__, hex(id(self)), self.steps)
+
+    @property
+    def passes(self) -> int:
+        """
+        :return: number of passes over full-length arrays when decompressing without out or dtype, the downcast after
+            every fused run taking DOWNCAST_PASSES
+        """
+        return sum(step.passes + DOWNCAST_PASSES if isinstance(step, FusedDecompression) else 1
+                   for step in self.steps)
+
+    def execute(self, arr: np.array, out: Union[np.array, None] = None, dtype=None) -> np.array:
+        """
+        :param arr: compressed array
+        :param out: optional array to decompress into, in its own dtype
+        :param dtype: optional dtype of the result, the smallest integer type holding it if None
+        :return: decompressed array, out if given
+        """
+        if len(self.steps) == 0:
+            if out is None and dtype is None:
+                return arr
+            out = _output_array(out, dtype, len(arr))
+            out[...] = arr
+            return out
+        ret_array = arr
+        for i, step in enumerate(self.steps):
+            if i == len(self.steps) - 1 and (out is not None or dtype is not None):
+                if isinstance(step, FusedDecompression):
+                    return step.execute(ret_array, out=out, dtype=dtype)
+                return integer_decompression_from_transform(ret_array, step, out=out, dtype=dtype)
+            if isinstance(step, FusedDecompression) and i + 1 < len(self.steps) and \
+                    getattr(self.steps[i + 1], 'transform_type', None) == IntegerTransformTypes.DATETIME:
+                # datetimes are restored from int64, the downcast would only be undone
+                ret_array = step.execute(ret_array, dtype=np.int64)
+            elif isinstance(step, FusedDecompression):
+                logger.debug('decompressing fused run %s', step)
+                ret_array = downcast_integers(step.execute(ret_array, dtype=step.accumulator_dtype(ret_array)))[0]
+            else:
+                ret_array = integer_decompression_from_transform(ret_array, step)
+        return ret_array
+
+
+def compile_integer_decompression(transforms: list, dictionaries: Union[dict, None] = None) -> DecompressionPlan:
+    """
+    Plans the decode of a transform chain. Runs of minimize and derivative transforms are fused, together with the
+    transform undone right before them, so the chain skips the intermediate downcasts and temporaries. Dictionary
+    transforms are resolved into the hash transforms of their dictionaries
+    :param transforms: list of transforms, in the order they are to be undone
+    :param dictionaries: optional mapping of dictionary ids to HashDictionary for dictionary transforms, the
+        registered dictionaries are searched after it
+    :return: DecompressionPlan
+    """
+    steps = []
+    for transform in resolve_dictionaries(transforms, dictionaries):
+        if transform.transform_type not in (IntegerTransformTypes.MINIMIZE, IntegerTransformTypes.DERIVATIVE):
+            steps.append(transform)
+            continue
+        if len(steps) == 0 or not isinstance(steps[-1], FusedDecompression):
+            steps.append(FusedDecompression(steps.pop() if len(steps) > 0 else None))
+        steps[-1].add_transform(transform)
+    return DecompressionPlan(steps)
+
+
+def integer_decompression_from_transforms(arr: np.array, transforms: list, out: Union[np.array, None] = None,
+                                          dtype=None, dictionaries: Union[dict, None] = None) -> np.array:
     """
-    Decompresses an array using a series of transforms
+    Decompresses an array using a series of transforms, fused by compile_integer_decompression. Only the last step
+    writes into out, the intermediate arrays are the narrow ones the earlier steps produce
     :param arr: compressed array
-    :param transforms: list of transforms, IN THE ORDER THEY WERE APPLIED
-    :return: decompressed array
+    :param transforms: list of transforms, IN THE ORDER THEY ARE TO BE UNDONE (the reverse of the order they were
+        applied), as returned by combined_integer_compression
+    :param out: optional array to decompress into, in its own dtype, e.g. a view on shared memory or a memmap
+    :param dtype: optional dtype of the result, the smallest integer type holding it if None
+    :param dictionaries: optional mapping of dictionary ids to HashDictionary for dictionary transforms, the
+        registered dictionaries are searched after it
+    :return: decompressed array, out if given
     """
-    ret_array = arr
-    for t in transforms:
-        ret_array = integer_decompression_from_transform(ret_array, t)
-    return ret_array
+    return compile_integer_decompression(transforms, dictionaries).execute(arr, out=out, dtype=dtype)
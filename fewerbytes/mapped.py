@@ -0,0 +1,139 @@
+import logging
+import struct
+import numpy as np
+from collections.abc import Sequence
+from typing import BinaryIO, Tuple
+from fewerbytes.types import NumpyType
+from fewerbytes.chunked import ChunkedCompressedArray, CompressedChunk
+from fewerbytes.serialization import dumps, loads
+from fewerbytes.exceptions import InvalidCompressedFormatException
+
+logger = logging.getLogger(__name__)
+
+# Layout of a chunked file, all little-endian:
+#   magic (4s) | version (B) | chunks, each serialized by dumps
+#   | index: number of chunks + 1 file offsets of the chunks (Q), then number of chunks + 1 value offsets (Q)
+#   | number of chunks (Q) | file offset of the index (Q) | magic (4s)
+# the index sits at the end so chunks can be written as they come, and is found from the trailer. File offsets are
+# relative to the preamble, so a chunked array can follow other data in a file and is read from where it starts
+CHUNKED_MAGIC = b'FWBC'
+CHUNKED_FORMAT_VERSION = 1
+
+_CHUNKED_PREAMBLE = struct.Struct('<4sB')
+_CHUNKED_TRAILER = struct.Struct('<QQ4s')
+
+
+class _MappedChunks(Sequence):
+    def __init__(self, buffer: np.array, file_offsets: np.array, value_offsets: np.array):
+        """
+        Chunks of a mapped file, each parsed from the buffer when accessed. The payloads are views on the buffer, so
+        only the pages of the chunks that are decompressed are read from disk
+        :param buffer: uint8 memmap of the file
+        :param file_offsets: start of every chunk in the file, plus the start of the index
+        :param value_offsets: start of every chunk in the uncompressed array, plus the total
+        """
+        self.buffer = buffer
+        self.file_offsets = file_offsets
+        self.value_offsets = value_offsets
+        return
+
+    def __len__(self):
+        return len(self.file_offsets) - 1
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if index < 0 or index >= len(self):
+            raise IndexError('chunk index {} is out of bounds for {} chunks'.format(index, len(self)))
+        arr, transforms = loads(self.buffer[int(self.file_offsets[index]):int(self.file_offsets[index + 1])])
+        length = int(self.value_offsets[index + 1] - self.value_offsets[index])
+        return CompressedChunk(arr, NumpyType.from_dtype(arr.dtype), transforms, length)
+
+
+class MappedCompressedArray(ChunkedCompressedArray):
+    def __init__(self, path: str, offset: int = 0):
+        """
+        A chunked compressed array read from a file written by dump_chunked through a read-only memory map. Opening
+        only reads the index, every chunk is parsed and decompressed when it is accessed, so memory use follows the
+        chunks touched rather than the size of the file
+        :param path: path of the file
+        :param offset: position in the file where dump_chunked started writing, the array runs to the end of the file
+        """
+        self.path = path
+        self.offset = offset
+        self.buffer = np.memmap(path, dtype=np.uint8, mode='r', offset=offset)
+        file_offsets, value_offsets = _read_index(self.buffer)
+        super().__init__(_MappedChunks(self.buffer, file_offsets, value_offsets))
+        self._chunk_offsets = value_offsets
+        logger.debug('mapped %s chunks of %s values from %s', len(self.chunks), len(self), path)
+        return
+
+    def __repr__(self):
+        return '<{}, {} path={}, offset={}, length={}, num_chunks={}>'.format(
+            self.__class__.__name__, hex(id(self)), self.path, self.offset, len(self), len(self.chunks))
+
+
+def _read_index(buffer: np.array) -> Tuple[np.array, np.array]:
+    """
+    Reads the index of a chunked file from its trailer
+    :param buffer: uint8 array of the file from the preamble to its end
+    :return: views on the file offsets and the value offsets of the chunks
+    """
+    if len(buffer) < _CHUNKED_PREAMBLE.size + _CHUNKED_TRAILER.size:
+        raise InvalidCompressedFormatException('file is too short to hold a chunked array')
+    magic, version = _CHUNKED_PREAMBLE.unpack_from(buffer, 0)
+    if magic != CHUNKED_MAGIC:
+        raise InvalidCompressedFormatException('invalid magic bytes: {}'.format(magic))
+    if version != CHUNKED_FORMAT_VERSION:
+        raise InvalidCompressedFormatException('unsupported chunked format version: {}'.format(version))
+    num_chunks, index_offset, magic = _CHUNKED_TRAILER.unpack_from(buffer, len(buffer) - _CHUNKED_TRAILER.size)
+    if magic != CHUNKED_MAGIC:
+        raise InvalidCompressedFormatException('invalid trailer magic bytes: {}'.format(magic))
+    if index_offset + 2 * (num_chunks + 1) * 8 != len(buffer) - _CHUNKED_TRAILER.size:
+        raise InvalidCompressedFormatException('index does not end at the trailer')
+    index = np.frombuffer(buffer, dtype='<u8', count=2 * (num_chunks + 1), offset=index_offset).astype(np.int64)
+    return index[:num_chunks + 1], index[num_chunks + 1:]
+
+
+def dump_chunked(chunked: ChunkedCompressedArray, fh: BinaryIO):
+    """
+    Writes a chunked compressed array to a binary file object, each chunk serialized by dumps and followed by an
+    index of the chunks, so open_chunked can map the file and decompress single chunks. The index offsets count from
+    the current position of fh, pass that position to open_chunked when it is not the start of the file
+    :param chunked: ChunkedCompressedArray
+    :param fh: binary file object open for writing
+    :return:
+    """
+    # offsets are the bytes written since the preamble, not fh.tell(), so they hold after a prefix and on pipes
+    offset = fh.write(_CHUNKED_PREAMBLE.pack(CHUNKED_MAGIC, CHUNKED_FORMAT_VERSION))
+    file_offsets = [offset]
+    for chunk in chunked.chunks:
+        offset += fh.write(dumps(chunk.array, chunk.transforms))
+        file_offsets.append(offset)
+    value_offsets = chunked.chunk_offsets.tolist()
+    fh.write(np.array(file_offsets + value_offsets, dtype='<u8').tobytes())
+    fh.write(_CHUNKED_TRAILER.pack(len(chunked.chunks), offset, CHUNKED_MAGIC))
+    return
+
+
+def open_chunked(path: str, offset: int = 0) -> MappedCompressedArray:
+    """
+    Opens a file written by dump_chunked through a read-only memory map, decompressing chunks on demand
+    :param path: path of the file
+    :param offset: position in the file where dump_chunked started writing
+    :return: MappedCompressedArray, usable wherever a ChunkedCompressedArray is
+    """
+    return MappedCompressedArray(path, offset)
+
+
+def load_mapped(path: str, offset: int = 0) -> Tuple[np.array, list]:
+    """
+    Reads a file written by dump through a read-only memory map. Only the header is parsed, the compressed array
+    is a view on the map
+    :param path: path of the file
+    :param offset: position in the file where dump started writing
+    :return: compressed array and its list of transforms
+    """
+    return loads(np.memmap(path, dtype=np.uint8, mode='r', offset=offset))
@@ -0,0 +1,257 @@
+import logging
+import math
+import numpy as np
+from typing import Tuple, Union
+from fewerbytes.types import NumpyType, NumpySizes
+from fewerbytes.reductions import min_max
+from fewerbytes.compression_details import IntegerTransformTypes
+from fewerbytes.integer_compression import (
+    downcast_integers,
+    integer_minimize_compression,
+    integer_derivative_compression,
+    integer_hash_compression,
+    integer_bitpack_compression
+)
+
+logger = logging.getLogger(__name__)
+
+# number of values np.unique is run on when the distinct count cannot be counted exactly
+DISTINCT_SAMPLE_SIZE = 8192
+# largest value span whose distinct count is counted exactly with a bincount
+EXACT_DISTINCT_MAX_SPAN = 1 << 20
+
+
+class IntegerStatistics:
+    def __init__(self, length: int, minimum: int, maximum: int, distinct: int):
+        """
+        Cheap statistics of an integer array, enough to predict the cost of every transform chain
+        :param length: number of values
+        :param minimum: minimum value
+        :param maximum: maximum value
+        :param distinct: exact or estimated number of distinct values, None if not counted
+        """
+        self.length = length
+        self.minimum = minimum
+        self.maximum = maximum
+        self.distinct = distinct
+        return
+
+    def __repr__(self):
+        return '<{}, {} length={}, minimum={}, maximum={}, distinct={}>'.format(
+            self.__class__.__name__, hex(id(self)), self.length, self.minimum, self.maximum, self.distinct)
+
+    @staticmethod
+    def from_array(arr: np.array, population: Union[int, None] = None) -> 'IntegerStatistics':
+        """
+        Computes the statistics without sorting the array. Distinct values are only counted when the values need
+        more than a byte, otherwise a hash cannot help
+        :param arr: numpy integer array
+        :param population: number of values arr was sampled from, None if arr is the whole population
+        :return: IntegerStatistics
+        """
+        length = len(arr) if population is None else population
+        if len(arr) == 0:
+            return IntegerStatistics(length, 0, 0, None)
+        minimum, maximum = min_max(arr)
+        distinct = None
+        if NumpyType.from_integer(maximum - minimum).size.value > NumpySizes.BYTE.value:
+            distinct = estimate_distinct(arr, minimum, maximum, population)
+        return IntegerStatistics(length, minimum, maximum, distinct)
+
+
+class CompressionPlan:
+    def __init__(self, chain: list, predicted_bytes: int, statistics: list):
+        """
+        The transform chain predicted to compress an array best
+        :param chain: list of IntegerTransformTypes, in the order they are to be applied
+        :param predicted_bytes: predicted size of the compressed array and its transform metadata
+        :param statistics: list of IntegerStatistics of the array and of each of its derivatives
+        """
+        self.chain = chain
+        self.predicted_bytes = predicted_bytes
+        self.statistics = statistics
+        return
+
+    def __repr__(self):
+        return '<{}, {} chain={}, predicted_bytes={}>'.format(
+            self.__class__.__name__, hex(id(self)), self.chain, self.predicted_bytes)
+
+
+def estimate_distinct(arr: np.array, minimum: int, maximum: int, population: Union[int, None] = None) -> int:
+    """
+    Counts the distinct values exactly with a bincount when their span is small, otherwise from a strided sample.
+    When the counted values are only a sample of a larger population, the guaranteed-error estimator is used unless
+    most distinct values of the sample are singletons, then the sample's distinct ratio is scaled up instead, erring
+    on the high side so a hash is not chosen by mistake
+    :param arr: numpy integer array
+    :param minimum: minimum value of the array
+    :param maximum: maximum value of the array
+    :param population: number of values arr was sampled from, None if arr is the whole population
+    :return: number of distinct values, exact or estimated
+    """
+    population = len(arr) if population is None else population
+    span = maximum - minimum
+    if span < EXACT_DISTINCT_MAX_SPAN and span <= 4 * len(arr):
+        sample_length = len(arr)
+        # subtracted in int64, the span may not fit the array's own type
+        counts = np.bincount(np.subtract(arr, arr.dtype.type(minimum), dtype=np.int64, casting='unsafe'))
+        counts = counts[counts > 0]
+    else:
+        sample = arr[::max(1, len(arr) // DISTINCT_SAMPLE_SIZE)]
+        sample_length = len(sample)
+        counts = np.unique(sample, return_counts=True)[1]
+    if sample_length >= population:
+        return len(counts)
+    singletons = int(np.count_nonzero(counts == 1))
+    if 2 * singletons > len(counts):
+        estimate = len(counts) * population / sample_length
+    else:
+        estimate = len(counts) - singletons + math.sqrt(population / sample_length) * singletons
+    return int(min(population, max(len(counts), round(estimate))))
+
+
+def worth_deriving(statistics: IntegerStatistics, bit_pack: bool) -> bool:
+    """
+    Like combined_integer_compression, another derivative is only worth it while values need more than a byte,
+    unless they may be bit-packed further
+    :param statistics: IntegerStatistics of the current derivative
+    :param bit_pack: whether candidates may finish with a bit-packing compression
+    :return: whether to consider another derivative
+    """
+    return bit_pack or _value_bits(0, statistics.maximum - statistics.minimum, False) > 8
+
+
+def collect_statistics(arr: np.array, max_derivatives: int = 3, bit_pack: bool = False) -> list:
+    """
+    Computes IntegerStatistics of the array and of up to max_derivatives successive element-wise differences
+    :param arr: numpy integer array
+    :param max_derivatives: number of derivatives to consider
+    :param bit_pack: whether candidates may finish with a bit-packing compression
+    :return: list of IntegerStatistics, index k being the k-th derivative
+    """
+    statistics = [IntegerStatistics.from_array(arr)]
+    working_array = arr.astype(np.int64, copy=False)
+    for _ in range(max_derivatives):
+        if len(working_array) < 2 or not worth_deriving(statistics[-1], bit_pack):
+            break
+        working_array = np.diff(working_array)
+        statistics.append(IntegerStatistics.from_array(working_array))
+    return statistics
+
+
+def _value_bits(minimum: int, maximum: int, bit_pack: bool) -> int:
+    """
+    Bits each value of the given range is stored in
+    :param minimum: minimum value
+    :param maximum: maximum value
+    :param bit_pack: whether values are bit-packed, only valid for non-negative ranges
+    :return: number of bits
+    """
+    if bit_pack and minimum >= 0:
+        return max(1, maximum.bit_length())
+    return NumpyType.from_integer(maximum=maximum, minimum=minimum).size.value
+
+
+def _candidate_chains(statistics: list, bit_pack: bool) -> list:
+    """
+    Predicts the cost of every candidate chain from the statistics alone
+    :param statistics: list of IntegerStatistics, as returned by collect_statistics
+    :param bit_pack: whether candidates may finish with a bit-packing compression
+    :return: list of tuples of the chain (list of IntegerTransformTypes) and its predicted size in bits
+    """
+    candidates = []
+    for order, stats in enumerate(statistics):
+        prefix = [IntegerTransformTypes.DERIVATIVE] * order
+        if stats.length == 0:
+            candidates.append((prefix, 0))
+            continue
+        span = stats.maximum - stats.minimum
+        direct_bits = _value_bits(stats.minimum, stats.maximum, False)
+        minimize_bits = _value_bits(0, span, False)
+        if minimize_bits < direct_bits or (bit_pack and stats.minimum != 0):
+            chain, value_bits, value_range = prefix + [IntegerTransformTypes.MINIMIZE], minimize_bits, (0, span)
+        else:
+            chain, value_bits, value_range = prefix, direct_bits, (stats.minimum, stats.maximum)
+        if bit_pack and _value_bits(*value_range, True) < value_bits:
+            candidates.append((chain + [IntegerTransformTypes.BIT_PACK],
+                               stats.length * _value_bits(*value_range, True)))
+        else:
+            candidates.append((chain, stats.length * value_bits))
+        if stats.distinct is not None and value_bits > 8:
+            key_bits = _value_bits(0, stats.distinct - 1, False)
+            hash_bits = stats.length * key_bits + stats.distinct * value_bits
+            if hash_bits < 0.8 * stats.length * value_bits:  # integer_hash_compression requires a 20% improvement
+                hash_chain = chain + [IntegerTransformTypes.HASH]
+                if bit_pack and _value_bits(0, stats.distinct - 1, True) < key_bits:
+                    hash_chain.append(IntegerTransformTypes.BIT_PACK)
+                    hash_bits = stats.length * _value_bits(0, stats.distinct - 1, True) + stats.distinct * value_bits
+                candidates.append((hash_chain, hash_bits))
+    return candidates
+
+
+def plan_from_statistics(statistics: list, bit_pack: bool = False) -> CompressionPlan:
+    """
+    Picks the cheapest candidate chain. Candidates come shortest first, and a longer chain has to save more
+    than 1% to be worth its extra decompression pass
+    :param statistics: list of IntegerStatistics, as returned by collect_statistics
+    :param bit_pack: whether candidates may finish with a bit-packing compression
+    :return: CompressionPlan
+    """
+    best_chain, best_bits = None, None
+    for chain, bits in _candidate_chains(statistics, bit_pack):
+        logger.debug('chain %s predicted to need %s bits', chain, bits)
+        if best_bits is None or bits < 0.99 * best_bits:
+            best_chain, best_bits = chain, bits
+    return CompressionPlan(best_chain, (best_bits + 7) // 8, statistics)
+
+
+def plan_integer_compression(arr: np.array, bit_pack: bool = False, max_derivatives: int = 3) -> CompressionPlan:
+    """
+    Predicts the best transform chain for the array without trial-compressing any candidate
+    :param arr: numpy integer array
+    :param bit_pack: whether candidates may finish with a bit-packing compression
+    :param max_derivatives: number of derivatives to consider
+    :return: CompressionPlan
+    """
+    return plan_from_statistics(collect_statistics(arr, max_derivatives, bit_pack), bit_pack)
+
+
+def execute_plan(arr: np.array, chain: list) -> Tuple[np.array, NumpyType, list]:
+    """
+    Applies a transform chain
+    :param arr: numpy integer array
+    :param chain: list of IntegerTransformTypes, in the order they are to be applied
+    :return: tuple of the compressed array, its NumpyType, and a list of transforms in the order they are to be undone
+    """
+    working_array, working_type = arr, NumpyType.from_dtype(arr.dtype)
+    transforms = []
+    for transform_type in chain:
+        if transform_type == IntegerTransformTypes.DERIVATIVE:
+            working_array, working_type, transform = integer_derivative_compression(working_array)
+        elif transform_type == IntegerTransformTypes.MINIMIZE:
+            working_array, working_type, transform = integer_minimize_compression(working_array)
+        elif transform_type == IntegerTransformTypes.HASH:
+            working_array, working_type, transform = integer_hash_compression(working_array)
+        elif transform_type == IntegerTransformTypes.BIT_PACK:
+            working_array, working_type, transform = integer_bitpack_compression(working_array)
+        else:
+            raise ValueError('Unable to plan transform type: {}'.format(transform_type))
+        if transform is not None:
+            transforms.append(transform)
+    if len(transforms) == 0 and len(working_array) > 0:
+        working_array, working_type = downcast_integers(working_array)
+    return working_array, working_type, transforms[::-1]
+
+
+def planned_integer_compression(arr: np.array, bit_pack: bool = False, max_derivatives: int = 3) -> \
+        Tuple[np.array, NumpyType, list]:
+    """
+    Alternative to combined_integer_compression which only executes the chain a cost model predicts to be best
+    :param arr: numpy integer array
+    :param bit_pack: whether candidates may finish with a bit-packing compression
+    :param max_derivatives: number of derivatives to consider
+    :return: tuple of the compressed array, its NumpyType, and a list of transforms in the order they are to be undone
+    """
+    plan = plan_integer_compression(arr, bit_pack, max_derivatives)
+    logger.debug('executing plan %s', plan)
+    return execute_plan(arr, plan.chain)
@@ -0,0 +1,191 @@
+import logging
+import math
+import numpy as np
+from enum import Enum
+from typing import Iterable, Union
+from fewerbytes.compression_details import IntegerTransformTypes, FloatTransformTypes
+from fewerbytes.dictionaries import resolve_dictionaries
+from fewerbytes.float_decompression import float_decompression_from_transform, float_decompression_from_transforms
+
+logger = logging.getLogger(__name__)
+
+
+class Predicates(Enum):
+    EQUAL = '=='
+    IN = 'in'
+    BETWEEN = 'between'
+
+
+class Predicate:
+    def __init__(self, predicate_type: Predicates, values: tuple):
+        """
+        A filter on array values. Build it with Predicate.equal, Predicate.isin or Predicate.between
+        :param predicate_type: Predicates
+        :param values: (value,) for EQUAL, tuple of values for IN, (low, high) for BETWEEN, either may be None
+        """
+        self.predicate_type = predicate_type
+        self.values = values
+        return
+
+    def __repr__(self):
+        return '<{}, {} predicate_type={}, values={}>'.format(
+            self.__class__.__name__, hex(id(self)), self.predicate_type, self.values)
+
+    @staticmethod
+    def equal(value) -> 'Predicate':
+        return Predicate(Predicates.EQUAL, (value,))
+
+    @staticmethod
+    def isin(values: Iterable) -> 'Predicate':
+        return Predicate(Predicates.IN, tuple(values))
+
+    @staticmethod
+    def between(low=None, high=None) -> 'Predicate':
+        """
+        Inclusive range
+        :param low: lowest value matched, None for no lower bound
+        :param high: highest value matched, None for no upper bound
+        :return: Predicate
+        """
+        return Predicate(Predicates.BETWEEN, (low, high))
+
+    def shifted(self, offset) -> 'Predicate':
+        """
+        :param offset: number subtracted from every value of the predicate
+        :return: Predicate matching value - offset wherever this one matches value
+        """
+        return Predicate(self.predicate_type, tuple(None if v is None else v - offset for v in self.values))
+
+    def evaluate(self, arr: np.array) -> np.array:
+        """
+        Evaluates the predicate on an uncompressed array. Values outside of an integer array's dtype are dropped
+        rather than compared, and small unsigned arrays are matched through a lookup table
+        :param arr: numpy array
+        :return: boolean mask
+        """
+        if arr.dtype.kind not in 'iu':
+            return self._evaluate_float(arr)
+        info = np.iinfo(arr.dtype)
+        if self.predicate_type == Predicates.BETWEEN:
+            low = info.min if self.values[0] is None else max(info.min, math.ceil(self.values[0]))
+            high = info.max if self.values[1] is None else min(info.max, math.floor(self.values[1]))
+            if low > high:
+                return np.zeros(len(arr), dtype=bool)
+            return (arr >= arr.dtype.type(low)) & (arr <= arr.dtype.type(high))
+        values = [int(v) for v in self.values if v == math.floor(v) and info.min <= v <= info.max]
+        if arr.dtype.kind == 'u' and arr.dtype.itemsize <= 2:
+            table = np.zeros(int(info.max) + 1, dtype=bool)
+            table[values] = True
+            return table[arr]
+        if len(values) == 1:
+            return arr == arr.dtype.type(values[0])
+        return np.isin(arr, np.array(values, dtype=arr.dtype))
+
+    def _evaluate_float(self, arr: np.array) -> np.array:
+        if self.predicate_type == Predicates.BETWEEN:
+            mask = np.ones(len(arr), dtype=bool)
+            if self.values[0] is not None:
+                mask &= arr >= self.values[0]
+            if self.values[1] is not None:
+                mask &= arr <= self.values[1]
+            return mask
+        return np.isin(arr, np.array(self.values, dtype=arr.dtype))
+
+
+def _unscaled(predicate: Predicate, decimals: int, float_dtype) -> Predicate:
+    """
+    Translates a predicate on rounded floats into one on the scaled integers they are decompressed from
+    :param predicate: Predicate on the floats
+    :param decimals: decimals of the FloatRoundingTransformation
+    :param float_dtype: type of the floats
+    :return: Predicate on the integers
+    """
+    def decoded(k: int):
+        return float_dtype(np.float64(k) / 10.0 ** decimals)
+
+    scale = 10.0 ** decimals
+    if predicate.predicate_type == Predicates.BETWEEN:
+        low, high = predicate.values
+        if low is not None:
+            k = math.floor(low * scale)
+            while decoded(k) < low:
+                k += 1
+            low = k
+        if high is not None:
+            k = math.ceil(high * scale)
+            while decoded(k) > high:
+                k -= 1
+            high = k
+        return Predicate.between(low, high)
+    candidates = [round(v * scale) for v in predicate.values]
+    return Predicate.isin(k for k, v in zip(candidates, predicate.values) if decoded(k) == v)
+
+
+def compressed_mask(arr: np.array, transforms: list, predicate: Predicate,
+                    dictionaries: Union[dict, None] = None) -> np.array:
+    """
+    Evaluates a predicate on the decompressed array while staying in the compressed domain where possible.
+    Predicates are shifted through minimize transforms, unscaled through rounding transforms, translated into key
+    sets through hash and dictionary transforms, and evaluated once per run through run-length transforms; other
+    transforms are decompressed
+    :param arr: compressed array
+    :param transforms: list of transforms, in the order they are to be undone
+    :param predicate: Predicate
+    :param dictionaries: optional mapping of dictionary ids to HashDictionary for dictionary transforms, the
+        registered dictionaries are searched after it
+    :return: boolean mask of the decompressed array
+    """
+    if len(transforms) == 0:
+        return predicate.evaluate(arr)
+    transforms = resolve_dictionaries(transforms, dictionaries)
+    transform, inner = transforms[-1], transforms[:-1]
+    transform_type = transform.transform_type
+    logger.debug('pushing %s through %s', predicate, transform)
+    if transform_type == IntegerTransformTypes.MINIMIZE:
+        return compressed_mask(arr, inner, predicate.shifted(int(transform.reference_value)))
+    if transform_type == FloatTransformTypes.ROUNDING:
+        float_dtype = np.dtype(transform.float_type.to_dtype()).type
+        return compressed_mask(arr, inner, _unscaled(predicate, transform.decimals, float_dtype))
+    if transform_type == IntegerTransformTypes.HASH:
+        matching_keys = np.flatnonzero(predicate.evaluate(transform.key_values))
+        return compressed_mask(arr, inner, Predicate.isin(matching_keys.tolist()))
+    if transform_type == IntegerTransformTypes.RUN_LENGTH:
+        return np.repeat(compressed_mask(arr, inner, predicate), transform.run_lengths)
+    logger.debug('no pushdown of %s through %s, decompressing', predicate, transform)
+    return predicate.evaluate(
+        float_decompression_from_transform(float_decompression_from_transforms(arr, inner), transform))
+
+
+def compressed_where(arr: np.array, transforms: list, predicate: Predicate,
+                     dictionaries: Union[dict, None] = None) -> np.array:
+    """
+    Indices of the decompressed array matching a predicate, see compressed_mask
+    :param arr: compressed array
+    :param transforms: list of transforms, in the order they are to be undone
+    :param predicate: Predicate
+    :param dictionaries: optional mapping of dictionary ids to HashDictionary for dictionary transforms, the
+        registered dictionaries are searched after it
+    :return: numpy array of indices
+    """
+    return np.flatnonzero(compressed_mask(arr, transforms, predicate, dictionaries))
+
+
+def chunked_mask(chunked, predicate: Predicate) -> np.array:
+    """
+    Evaluates a predicate on every chunk of a ChunkedCompressedArray, see compressed_mask
+    :param chunked: ChunkedCompressedArray
+    :param predicate: Predicate
+    :return: boolean mask of the decompressed array
+    """
+    masks = [compressed_mask(chunk.array, chunk.transforms, predicate) for chunk in chunked.chunks]
+    return np.concatenate(masks) if len(masks) > 0 else np.zeros(0, dtype=bool)
+
+
+def chunked_where(chunked, predicate: Predicate) -> np.array:
+    """
+    Indices of a ChunkedCompressedArray matching a predicate, see compressed_mask
+    :param chunked: ChunkedCompressedArray
+    :param predicate: Predicate
+    :return: numpy array of indices
+    """
+    return np.flatnonzero(chunked_mask(chunked, predicate))
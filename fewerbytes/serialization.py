@@ -0,0 +1,483 @@
+import struct
+import numpy as np
+from typing import BinaryIO, Tuple
+from fewerbytes.types import NumpyType, NumpyKinds, NumpySizes
+from fewerbytes.compression_details import (
+    IntegerMinimizeTransformation,
+    IntegerElementWiseTransformation,
+    IntegerHashTransformation,
+    IntegerBitPackTransformation,
+    IntegerBlockMinimizeTransformation,
+    IntegerRunLengthTransformation,
+    IntegerZigzagTransformation,
+    IntegerDictionaryTransformation,
+    IntegerSparseTransformation,
+    IntegerDatetimeTransformation,
+    IntegerPatchedTransformation,
+    IntegerEliasFanoTransformation,
+    IntegerEntropyTransformation,
+    IntegerTransformTypes,
+    EntropyCodecs,
+    FloatRoundingTransformation,
+    FloatXorDeltaTransformation,
+    FloatTransformTypes
+)
+from fewerbytes.dictionaries import HashDictionary, register_dictionary
+from fewerbytes.exceptions import InvalidCompressedFormatException
+
+# Layout, all little-endian:
+#   magic (4s) | version (B) | payload kind (c) | payload size in bits (B) | ndim (B) | shape (ndim x Q)
+#   | number of transforms (H) | transforms | payload bytes
+# each transform is stored as:
+#   transform type code (c) | body length in bytes (I) | body
+MAGIC = b'FWBY'
+FORMAT_VERSION = 1
+
+_PREAMBLE = struct.Struct('<4sBcBB')
+_DIMENSION = struct.Struct('<Q')
+_TRANSFORM_COUNT = struct.Struct('<H')
+_TRANSFORM_HEADER = struct.Struct('<cI')
+_NUMPY_TYPE = struct.Struct('<cB')
+_SIGNED_REFERENCE = struct.Struct('<cq')
+_UNSIGNED_REFERENCE = struct.Struct('<cQ')
+_BIT_PACK = struct.Struct('<BQ')
+_BLOCK_MINIMIZE = struct.Struct('<IQQ')
+_ROUNDING = struct.Struct('<b')
+_DICTIONARY = struct.Struct('<QQ')
+_SPARSE = struct.Struct('<QQ')
+_ELIAS_FANO = struct.Struct('<BQQQ')
+_ENTROPY = struct.Struct('<8sBQ')
+
+# a dictionary is stored as magic (4s) | dictionary id (Q), followed by its values serialized like an array by dumps
+DICTIONARY_MAGIC = b'FWBD'
+_DICTIONARY_PREAMBLE = struct.Struct('<4sQ')
+
+
+def _little_endian(arr: np.array) -> np.array:
+    """
+    Returns a C-contiguous, little-endian view of the array, copying only if required
+    :param arr: numpy array
+    :return: numpy array safe to write straight from its buffer
+    """
+    return np.ascontiguousarray(arr, dtype=arr.dtype.newbyteorder('<'))
+
+
+def _encode_numpy_type(numpy_type: NumpyType) -> bytes:
+    return _NUMPY_TYPE.pack(numpy_type.kind.value.encode('ascii'), numpy_type.size.value)
+
+
+def _numpy_type_from_codes(kind: bytes, size: int) -> NumpyType:
+    try:
+        return NumpyType(NumpyKinds(kind.decode('ascii')), NumpySizes(size))
+    except ValueError:
+        raise InvalidCompressedFormatException('invalid numpy type kind {} and size {}'.format(kind, size))
+
+
+def _decode_numpy_type(buffer, offset: int) -> Tuple[NumpyType, int]:
+    kind, size = _NUMPY_TYPE.unpack_from(buffer, offset)
+    return _numpy_type_from_codes(kind, size), offset + _NUMPY_TYPE.size
+
+
+def _encode_integer(value: int) -> bytes:
+    value = int(value)
+    if value < 0:
+        return _SIGNED_REFERENCE.pack(b'i', value)
+    return _UNSIGNED_REFERENCE.pack(b'u', value)
+
+
+def _decode_integer(buffer, offset: int) -> Tuple[int, int]:
+    kind = bytes(buffer[offset:offset + 1])
+    if kind == b'i':
+        return np.int64(_SIGNED_REFERENCE.unpack_from(buffer, offset)[1]), offset + _SIGNED_REFERENCE.size
+    if kind == b'u':
+        return np.uint64(_UNSIGNED_REFERENCE.unpack_from(buffer, offset)[1]), offset + _UNSIGNED_REFERENCE.size
+    raise InvalidCompressedFormatException('invalid integer kind: {}'.format(kind))
+
+
+def _decode_array(buffer, offset: int, numpy_type: NumpyType, count: int) -> Tuple[np.array, int]:
+    dtype = np.dtype(numpy_type.to_dtype()).newbyteorder('<')
+    arr = np.frombuffer(buffer, dtype=dtype, count=count, offset=offset)
+    return arr, offset + count * dtype.itemsize
+
+
+def _encode_minimize(transform: IntegerMinimizeTransformation) -> bytes:
+    return _encode_integer(transform.reference_value)
+
+
+def _decode_minimize(body) -> IntegerMinimizeTransformation:
+    return IntegerMinimizeTransformation(_decode_integer(body, 0)[0])
+
+
+def _encode_derivative(transform: IntegerElementWiseTransformation) -> bytes:
+    source_kind = b'' if transform.source_kind is None else transform.source_kind.value.encode('ascii')
+    return _encode_integer(transform.reference_value) + source_kind
+
+
+def _decode_derivative(body) -> IntegerElementWiseTransformation:
+    reference_value, offset = _decode_integer(body, 0)
+    if len(body) == offset:  # written without the source kind
+        return IntegerElementWiseTransformation(reference_value)
+    try:
+        source_kind = NumpyKinds(bytes(body[offset:offset + 1]).decode('ascii'))
+    except (ValueError, UnicodeDecodeError):
+        raise InvalidCompressedFormatException('invalid derivative source kind: {}'.format(bytes(body[offset:])))
+    return IntegerElementWiseTransformation(reference_value, source_kind)
+
+
+def _encode_hash(transform: IntegerHashTransformation) -> bytes:
+    key_values = _little_endian(transform.key_values.astype(transform.key_values_type.to_dtype(), copy=False))
+    return _encode_numpy_type(transform.key_values_type) + _DIMENSION.pack(len(key_values)) + key_values.tobytes()
+
+
+def _decode_hash(body) -> IntegerHashTransformation:
+    key_values_type, offset = _decode_numpy_type(body, 0)
+    count = _DIMENSION.unpack_from(body, offset)[0]
+    key_values, _ = _decode_array(body, offset + _DIMENSION.size, key_values_type, count)
+    return IntegerHashTransformation(key_values, key_values_type)
+
+
+def _encode_run_length(transform: IntegerRunLengthTransformation) -> bytes:
+    run_lengths = _little_endian(transform.run_lengths.astype(transform.run_lengths_type.to_dtype(), copy=False))
+    return _encode_numpy_type(transform.run_lengths_type) + _DIMENSION.pack(len(run_lengths)) + run_lengths.tobytes()
+
+
+def _decode_run_length(body) -> IntegerRunLengthTransformation:
+    run_lengths_type, offset = _decode_numpy_type(body, 0)
+    count = _DIMENSION.unpack_from(body, offset)[0]
+    run_lengths, _ = _decode_array(body, offset + _DIMENSION.size, run_lengths_type, count)
+    return IntegerRunLengthTransformation(run_lengths, run_lengths_type)
+
+
+def _encode_bit_pack(transform: IntegerBitPackTransformation) -> bytes:
+    return _BIT_PACK.pack(transform.bit_width, transform.length)
+
+
+def _decode_bit_pack(body) -> IntegerBitPackTransformation:
+    return IntegerBitPackTransformation(*_BIT_PACK.unpack_from(body, 0))
+
+
+def _encode_block_minimize(transform: IntegerBlockMinimizeTransformation) -> bytes:
+    reference_values = _little_endian(
+        transform.reference_values.astype(transform.reference_values_type.to_dtype(), copy=False))
+    return b''.join([
+        _BLOCK_MINIMIZE.pack(transform.block_size, transform.length, len(reference_values)),
+        _encode_numpy_type(transform.reference_values_type),
+        reference_values.tobytes(),
+        transform.bit_widths.astype(np.uint8, copy=False).tobytes()
+    ])
+
+
+def _decode_block_minimize(body) -> IntegerBlockMinimizeTransformation:
+    block_size, length, num_blocks = _BLOCK_MINIMIZE.unpack_from(body, 0)
+    reference_values_type, offset = _decode_numpy_type(body, _BLOCK_MINIMIZE.size)
+    reference_values, offset = _decode_array(body, offset, reference_values_type, num_blocks)
+    bit_widths, _ = _decode_array(body, offset, NumpyType(NumpyKinds.UNSIGNED, NumpySizes.BYTE), num_blocks)
+    return IntegerBlockMinimizeTransformation(block_size, length, reference_values, reference_values_type, bit_widths)
+
+
+def _encode_zigzag(transform: IntegerZigzagTransformation) -> bytes:
+    return b''
+
+
+def _decode_zigzag(body) -> IntegerZigzagTransformation:
+    return IntegerZigzagTransformation()
+
+
+def _encode_dictionary(transform: IntegerDictionaryTransformation) -> bytes:
+    return _DICTIONARY.pack(transform.dictionary_id, transform.num_keys)
+
+
+def _decode_dictionary(body) -> IntegerDictionaryTransformation:
+    return IntegerDictionaryTransformation(*_DICTIONARY.unpack_from(body, 0))
+
+
+def _encode_sparse(transform: IntegerSparseTransformation) -> bytes:
+    gaps = _little_endian(transform.gaps.astype(transform.gaps_type.to_dtype(), copy=False))
+    return _SPARSE.pack(transform.length, len(gaps)) + _encode_numpy_type(transform.gaps_type) + gaps.tobytes()
+
+
+def _decode_sparse(body) -> IntegerSparseTransformation:
+    length, count = _SPARSE.unpack_from(body, 0)
+    gaps_type, offset = _decode_numpy_type(body, _SPARSE.size)
+    gaps, _ = _decode_array(body, offset, gaps_type, count)
+    return IntegerSparseTransformation(gaps, gaps_type, length)
+
+
+def _encode_datetime(transform: IntegerDatetimeTransformation) -> bytes:
+    return transform.datetime_dtype.newbyteorder('<').str.encode('ascii')
+
+
+def _decode_datetime(body) -> IntegerDatetimeTransformation:
+    try:
+        datetime_dtype = np.dtype(bytes(body).decode('ascii'))
+    except (TypeError, UnicodeDecodeError):
+        raise InvalidCompressedFormatException('invalid datetime dtype: {}'.format(bytes(body)))
+    if datetime_dtype.kind not in 'Mm':
+        raise InvalidCompressedFormatException('invalid datetime dtype: {}'.format(datetime_dtype))
+    return IntegerDatetimeTransformation(datetime_dtype)
+
+
+def _encode_patched(transform: IntegerPatchedTransformation) -> bytes:
+    gaps = _little_endian(transform.exception_gaps.astype(transform.gaps_type.to_dtype(), copy=False))
+    values = _little_endian(transform.exception_values.astype(transform.values_type.to_dtype(), copy=False))
+    return _encode_integer(transform.reference_value) + _DIMENSION.pack(len(values)) + \
+        _encode_numpy_type(transform.gaps_type) + gaps.tobytes() + _encode_numpy_type(transform.values_type) + \
+        values.tobytes()
+
+
+def _decode_patched(body) -> IntegerPatchedTransformation:
+    reference_value, offset = _decode_integer(body, 0)
+    count = _DIMENSION.unpack_from(body, offset)[0]
+    gaps_type, offset = _decode_numpy_type(body, offset + _DIMENSION.size)
+    gaps, offset = _decode_array(body, offset, gaps_type, count)
+    values_type, offset = _decode_numpy_type(body, offset)
+    values, _ = _decode_array(body, offset, values_type, count)
+    return IntegerPatchedTransformation(reference_value, gaps, gaps_type, values, values_type)
+
+
+def _encode_elias_fano(transform: IntegerEliasFanoTransformation) -> bytes:
+    rank_samples = _little_endian(transform.rank_samples.astype(transform.rank_samples_type.to_dtype(), copy=False))
+    return _ELIAS_FANO.pack(transform.low_bits, transform.length, len(transform.upper_bits), len(rank_samples)) + \
+        _encode_integer(transform.reference_value) + transform.upper_bits.tobytes() + \
+        _encode_numpy_type(transform.rank_samples_type) + rank_samples.tobytes()
+
+
+def _decode_elias_fano(body) -> IntegerEliasFanoTransformation:
+    low_bits, length, num_upper_bytes, count = _ELIAS_FANO.unpack_from(body, 0)
+    reference_value, offset = _decode_integer(body, _ELIAS_FANO.size)
+    upper_bits = np.frombuffer(body, dtype=np.uint8, count=num_upper_bytes, offset=offset)
+    rank_samples_type, offset = _decode_numpy_type(body, offset + num_upper_bytes)
+    rank_samples, _ = _decode_array(body, offset, rank_samples_type, count)
+    return IntegerEliasFanoTransformation(low_bits, length, reference_value, upper_bits, rank_samples,
+                                          rank_samples_type)
+
+
+def _encode_entropy(transform: IntegerEntropyTransformation) -> bytes:
+    return _ENTROPY.pack(transform.codec.value.encode('ascii'), transform.level, transform.length) + \
+        _encode_numpy_type(transform.array_type)
+
+
+def _decode_entropy(body) -> IntegerEntropyTransformation:
+    codec, level, length = _ENTROPY.unpack_from(body, 0)
+    try:
+        codec = EntropyCodecs(codec.rstrip(b'\0').decode('ascii'))
+    except (ValueError, UnicodeDecodeError):
+        raise InvalidCompressedFormatException('invalid entropy codec: {}'.format(codec))
+    return IntegerEntropyTransformation(codec, level, _decode_numpy_type(body, _ENTROPY.size)[0], length)
+
+
+def _encode_float_rounding(transform: FloatRoundingTransformation) -> bytes:
+    return _ROUNDING.pack(transform.decimals) + _encode_numpy_type(transform.float_type)
+
+
+def _decode_float_rounding(body) -> FloatRoundingTransformation:
+    return FloatRoundingTransformation(_ROUNDING.unpack_from(body, 0)[0], _decode_numpy_type(body, _ROUNDING.size)[0])
+
+
+def _encode_float_xor_delta(transform: FloatXorDeltaTransformation) -> bytes:
+    return _encode_numpy_type(transform.float_type)
+
+
+def _decode_float_xor_delta(body) -> FloatXorDeltaTransformation:
+    return FloatXorDeltaTransformation(_decode_numpy_type(body, 0)[0])
+
+
+_TRANSFORM_ENCODERS = {
+    IntegerTransformTypes.MINIMIZE: _encode_minimize,
+    IntegerTransformTypes.DERIVATIVE: _encode_derivative,
+    IntegerTransformTypes.HASH: _encode_hash,
+    IntegerTransformTypes.BIT_PACK: _encode_bit_pack,
+    IntegerTransformTypes.BLOCK_MINIMIZE: _encode_block_minimize,
+    IntegerTransformTypes.RUN_LENGTH: _encode_run_length,
+    IntegerTransformTypes.ZIGZAG: _encode_zigzag,
+    IntegerTransformTypes.DICTIONARY: _encode_dictionary,
+    IntegerTransformTypes.SPARSE: _encode_sparse,
+    IntegerTransformTypes.DATETIME: _encode_datetime,
+    IntegerTransformTypes.PATCHED: _encode_patched,
+    IntegerTransformTypes.ELIAS_FANO: _encode_elias_fano,
+    IntegerTransformTypes.ENTROPY: _encode_entropy,
+    FloatTransformTypes.ROUNDING: _encode_float_rounding,
+    FloatTransformTypes.XOR_DELTA: _encode_float_xor_delta,
+}
+
+_TRANSFORM_DECODERS = {
+    IntegerTransformTypes.MINIMIZE: _decode_minimize,
+    IntegerTransformTypes.DERIVATIVE: _decode_derivative,
+    IntegerTransformTypes.HASH: _decode_hash,
+    IntegerTransformTypes.BIT_PACK: _decode_bit_pack,
+    IntegerTransformTypes.BLOCK_MINIMIZE: _decode_block_minimize,
+    IntegerTransformTypes.RUN_LENGTH: _decode_run_length,
+    IntegerTransformTypes.ZIGZAG: _decode_zigzag,
+    IntegerTransformTypes.DICTIONARY: _decode_dictionary,
+    IntegerTransformTypes.SPARSE: _decode_sparse,
+    IntegerTransformTypes.DATETIME: _decode_datetime,
+    IntegerTransformTypes.PATCHED: _decode_patched,
+    IntegerTransformTypes.ELIAS_FANO: _decode_elias_fano,
+    IntegerTransformTypes.ENTROPY: _decode_entropy,
+    FloatTransformTypes.ROUNDING: _decode_float_rounding,
+    FloatTransformTypes.XOR_DELTA: _decode_float_xor_delta,
+}
+
+_TRANSFORM_TYPES = {transform_type.value.encode('ascii'): transform_type for transform_type in _TRANSFORM_DECODERS}
+
+
+def _encode_header(arr: np.array, transforms: list) -> bytes:
+    """
+    Builds the header describing the payload array and its transforms
+    :param arr: payload array
+    :param transforms: list of transforms
+    :return: header bytes
+    """
+    arr_type = NumpyType.from_dtype(arr.dtype)
+    parts = [
+        _PREAMBLE.pack(MAGIC, FORMAT_VERSION, arr_type.kind.value.encode('ascii'), arr_type.size.value, arr.ndim)
+    ]
+    parts.extend(_DIMENSION.pack(d) for d in arr.shape)
+    parts.append(_TRANSFORM_COUNT.pack(len(transforms)))
+    for transform in transforms:
+        if transform.transform_type not in _TRANSFORM_ENCODERS:
+            raise ValueError('Unable to serialize transform: {}'.format(transform))
+        body = _TRANSFORM_ENCODERS[transform.transform_type](transform)
+        parts.append(_TRANSFORM_HEADER.pack(transform.transform_type.value.encode('ascii'), len(body)))
+        parts.append(body)
+    return b''.join(parts)
+
+
+def _decode_header(buffer) -> Tuple[NumpyType, tuple, list, int]:
+    """
+    Parses the header
+    :param buffer: bytes-like object starting with a header
+    :return: payload NumpyType, payload shape, list of transforms, and the offset of the payload
+    """
+    if len(buffer) < _PREAMBLE.size:
+        raise InvalidCompressedFormatException('buffer is too short to hold a header')
+    magic, version, kind, size, ndim = _PREAMBLE.unpack_from(buffer, 0)
+    if magic != MAGIC:
+        raise InvalidCompressedFormatException('invalid magic bytes: {}'.format(magic))
+    if version != FORMAT_VERSION:
+        raise InvalidCompressedFormatException('unsupported format version: {}'.format(version))
+    arr_type = _numpy_type_from_codes(kind, size)
+    offset = _PREAMBLE.size
+    shape = []
+    for _ in range(ndim):
+        shape.append(_DIMENSION.unpack_from(buffer, offset)[0])
+        offset += _DIMENSION.size
+    num_transforms = _TRANSFORM_COUNT.unpack_from(buffer, offset)[0]
+    offset += _TRANSFORM_COUNT.size
+    transforms = []
+    for _ in range(num_transforms):
+        code, body_length = _TRANSFORM_HEADER.unpack_from(buffer, offset)
+        offset += _TRANSFORM_HEADER.size
+        if code not in _TRANSFORM_TYPES:
+            raise InvalidCompressedFormatException('unknown transform type code: {}'.format(code))
+        transform_type = _TRANSFORM_TYPES[code]
+        body = buffer[offset:offset + body_length]
+        if len(body) != body_length:
+            raise InvalidCompressedFormatException('buffer ends inside a transform')
+        transforms.append(_TRANSFORM_DECODERS[transform_type](body))
+        offset += body_length
+    return arr_type, tuple(shape), transforms, offset
+
+
+def _read_header(fh: BinaryIO) -> bytes:
+    """
+    Reads exactly the header bytes from a file object
+    :param fh: binary file object positioned at the start of a header
+    :return: header bytes
+    """
+    header = _read_exactly(fh, _PREAMBLE.size)
+    ndim = _PREAMBLE.unpack(header)[4]
+    header += _read_exactly(fh, ndim * _DIMENSION.size + _TRANSFORM_COUNT.size)
+    num_transforms = _TRANSFORM_COUNT.unpack_from(header, len(header) - _TRANSFORM_COUNT.size)[0]
+    for _ in range(num_transforms):
+        transform_header = _read_exactly(fh, _TRANSFORM_HEADER.size)
+        header += transform_header + _read_exactly(fh, _TRANSFORM_HEADER.unpack(transform_header)[1])
+    return header
+
+
+def _read_exactly(fh: BinaryIO, num_bytes: int) -> bytes:
+    data = fh.read(num_bytes)
+    if len(data) != num_bytes:
+        raise InvalidCompressedFormatException('unexpected end of file')
+    return data
+
+
+def dumps(arr: np.array, transforms: list) -> bytes:
+    """
+    Serializes a compressed array and its transforms
+    :param arr: compressed numpy array
+    :param transforms: list of transforms, as returned by the compression functions
+    :return: bytes
+    """
+    arr = _little_endian(arr)
+    return b''.join([_encode_header(arr, transforms), memoryview(arr).cast('B')])
+
+
+def loads(data) -> Tuple[np.array, list]:
+    """
+    Deserializes a compressed array and its transforms. The array is a read-only view on data, nothing is copied
+    :param data: bytes-like object produced by dumps
+    :return: compressed array and its list of transforms
+    """
+    arr_type, shape, transforms, offset = _decode_header(data)
+    count = int(np.prod(shape, dtype=np.uint64))
+    if len(data) - offset < count * (arr_type.size.value // 8):
+        raise InvalidCompressedFormatException('buffer ends inside the payload')
+    arr, _ = _decode_array(data, offset, arr_type, count)
+    return arr.reshape(shape), transforms
+
+
+def dump(arr: np.array, transforms: list, fh: BinaryIO):
+    """
+    Writes a compressed array and its transforms to a binary file object, straight from the array buffer
+    :param arr: compressed numpy array
+    :param transforms: list of transforms, as returned by the compression functions
+    :param fh: binary file object open for writing
+    :return:
+    """
+    arr = _little_endian(arr)
+    fh.write(_encode_header(arr, transforms))
+    fh.write(memoryview(arr).cast('B'))
+    return
+
+
+def load(fh: BinaryIO) -> Tuple[np.array, list]:
+    """
+    Reads a compressed array and its transforms from a binary file object, straight into the array buffer
+    :param fh: binary file object open for reading
+    :return: compressed array and its list of transforms
+    """
+    arr_type, shape, transforms, _ = _decode_header(_read_header(fh))
+    arr = np.empty(shape, dtype=np.dtype(arr_type.to_dtype()).newbyteorder('<'))
+    view = memoryview(arr).cast('B')
+    if fh.readinto(view) != len(view):
+        raise InvalidCompressedFormatException('unexpected end of file')
+    return arr, transforms
+
+
+def dumps_dictionary(dictionary: HashDictionary) -> bytes:
+    """
+    Serializes a shared dictionary, to be stored once next to the arrays referring to it
+    :param dictionary: HashDictionary
+    :return: bytes
+    """
+    return _DICTIONARY_PREAMBLE.pack(DICTIONARY_MAGIC, dictionary.dictionary_id) + dumps(dictionary.key_values, [])
+
+
+def loads_dictionary(data, register: bool = False) -> HashDictionary:
+    """
+    Deserializes a shared dictionary
+    :param data: bytes-like object produced by dumps_dictionary
+    :param register: whether to register the dictionary as the fallback of the decompressions not given it
+    :return: HashDictionary
+    """
+    if len(data) < _DICTIONARY_PREAMBLE.size:
+        raise InvalidCompressedFormatException('buffer is too short to hold a dictionary')
+    magic, dictionary_id = _DICTIONARY_PREAMBLE.unpack_from(data, 0)
+    if magic != DICTIONARY_MAGIC:
+        raise InvalidCompressedFormatException('invalid dictionary magic bytes: {}'.format(magic))
+    key_values, _ = loads(data[_DICTIONARY_PREAMBLE.size:])
+    dictionary = HashDictionary(np.array(key_values), dictionary_id)
+    if register:
+        register_dictionary(dictionary)
+    return dictionary
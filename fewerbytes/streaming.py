@@ -0,0 +1,106 @@
+import logging
+import numpy as np
+from typing import Iterable, Iterator, Union
+from fewerbytes.types import NumpyType
+from fewerbytes.chunked import CompressedChunk
+from fewerbytes.integer_compression import combined_integer_compression
+from fewerbytes.integer_decompression import integer_decompression_from_transforms
+
+logger = logging.getLogger(__name__)
+
+
+class StreamFrame(CompressedChunk):
+    def __init__(self, array: np.array, array_type: NumpyType, transforms: list, length: int,
+                 leading_reference: bool):
+        """
+        One compressed batch of a stream
+        :param array: compressed array
+        :param array_type: NumpyType of the compressed array
+        :param transforms: list of transforms, in the order they are to be undone
+        :param length: number of values in the uncompressed batch
+        :param leading_reference: whether the decompressed array starts with the last value of the previous batch,
+            which the derivative of this batch is taken against
+        """
+        super().__init__(array, array_type, transforms, length)
+        self.leading_reference = leading_reference
+        return
+
+    def __repr__(self):
+        return '<{}, {} array_type={}, length={}, leading_reference={}, transforms={}>'.format(
+            self.__class__.__name__, hex(id(self)), self.array_type, self.length, self.leading_reference,
+            self.transforms)
+
+
+class StreamCompressor:
+    def __init__(self, bit_pack: bool = False):
+        """
+        Compresses an unbounded stream of integer batches, carrying the last value of each batch over as the
+        derivative reference of the next one. Only that one value is kept between batches
+        :param bit_pack: whether each frame finishes with a bit-packing compression
+        """
+        self.bit_pack = bit_pack
+        self._last_value = None
+        return
+
+    def compress(self, arr: np.array) -> Union[StreamFrame, None]:
+        """
+        Compresses the next batch of the stream
+        :param arr: numpy array of integers
+        :return: StreamFrame, or None if the batch is empty
+        """
+        if len(arr) == 0:
+            return None
+        leading_reference = self._last_value is not None
+        working_array = np.concatenate([self._last_value, arr]) if leading_reference else arr
+        logger.debug('compressing stream batch of length %s, leading reference: %s', len(arr), leading_reference)
+        array, array_type, transforms = combined_integer_compression(working_array, bit_pack=self.bit_pack)
+        self._last_value = arr[-1:].copy()
+        return StreamFrame(array, array_type, transforms, len(arr), leading_reference)
+
+    def compress_stream(self, batches: Iterable[np.array]) -> Iterator[StreamFrame]:
+        """
+        Lazily compresses every batch of an iterable
+        :param batches: iterable of numpy integer arrays
+        :return: generator of StreamFrame
+        """
+        for arr in batches:
+            frame = self.compress(arr)
+            if frame is not None:
+                yield frame
+        return
+
+
+class StreamDecompressor:
+    def __init__(self):
+        """
+        Decompresses frames produced by a StreamCompressor, in order
+        """
+        self._last_value = None
+        return
+
+    def decompress(self, frame: StreamFrame) -> np.array:
+        """
+        Decompresses the next frame of the stream
+        :param frame: StreamFrame
+        :return: decompressed batch
+        """
+        arr = integer_decompression_from_transforms(frame.array, frame.transforms)
+        if frame.leading_reference:
+            if self._last_value is not None and arr[0] != self._last_value:
+                raise ValueError('frame does not continue the stream, expected reference value {}, got {}'.format(
+                    self._last_value, arr[0]))
+            arr = arr[1:]
+        if len(arr) != frame.length:
+            raise ValueError('frame decompressed to {} values, expected {}'.format(len(arr), frame.length))
+        self._last_value = arr[-1]
+        return arr
+
+    def decompress_stream(self, frames: Iterable[StreamFrame]) -> Iterator[np.array]:
+        """
+        Lazily decompresses every frame of an iterable
+        :param frames: iterable of StreamFrame
+        :return: generator of decompressed batches
+        """
+        for frame in frames:
+            yield self.decompress(frame)
+        return
@@ -0,0 +1,75 @@
+import logging
+import numpy as np
+from typing import Tuple
+from fewerbytes.types import NumpyType
+from fewerbytes.compression_details import IntegerDatetimeTransformation
+from fewerbytes.integer_compression import (
+    downcast_integers,
+    integer_derivative_compression,
+    integer_minimize_compression,
+    integer_zigzag_compression,
+    integer_bitpack_compression,
+    integer_sparse_compression
+)
+
+logger = logging.getLogger(__name__)
+
+
+def _compact_candidates(centered: tuple, bit_pack: bool) -> list:
+    """
+    :param centered: tuple of a derivative of the timestamps shifted or zigzag encoded into non-negative values, with
+        its most common value at zero, its NumpyType and its transformation or None
+    :param bit_pack: whether the dense candidate is bit-packed
+    :return: list of (bytes, array, NumpyType, transforms to be undone last to first) for the dense and the sparse
+        encodings of the derivative
+    """
+    centered_array, centered_type, centered_transform = centered
+    centered_transforms = [] if centered_transform is None else [centered_transform]
+    candidates = [(centered_array.nbytes, centered_array, centered_type, centered_transforms)]
+    if bit_pack:
+        packed_array, packed_type, bit_pack_transform = integer_bitpack_compression(centered_array)
+        if bit_pack_transform is not None:
+            candidates[0] = (packed_array.nbytes, packed_array, packed_type, centered_transforms + [bit_pack_transform])
+    sparse_array, sparse_type, sparse_transform = integer_sparse_compression(centered_array)
+    if sparse_transform is not None:
+        candidates.append((sparse_array.nbytes + sparse_transform.gaps.nbytes, sparse_array, sparse_type,
+                           centered_transforms + [sparse_transform]))
+    return candidates
+
+
+def timestamp_compression(arr: np.array, bit_pack: bool = True) -> Tuple[np.array, NumpyType, list]:
+    """
+    Delta-of-delta compression of a timestamp column. Datetime64 and timedelta64 arrays are viewed as int64 without
+    a copy. Regularly sampled timestamps have a second derivative of mostly zeros, which is zigzag encoded and kept
+    either as its non-zero values or bit-packed, whichever is smaller. The minimized first derivative is encoded the
+    same way and kept instead when smaller, as for gaps in the sampling or jitter around a steady period.
+    Decompression is one scatter or unpack followed by running sums
+    :param arr: numpy integer, datetime64 or timedelta64 array
+    :param bit_pack: whether the dense encodings are bit-packed
+    :return: tuple of the compressed array, its NumpyType, and a list of transformations in the order they are to
+        be undone, i.e. ready for integer_decompression_from_transforms
+    """
+    transforms = []
+    if arr.dtype.kind in 'Mm':
+        transforms.append(IntegerDatetimeTransformation(arr.dtype))
+        arr = arr.view(np.int64)
+    if len(arr) < 2:
+        if len(arr) == 0:
+            return arr, NumpyType.from_dtype(arr.dtype), transforms
+        return downcast_integers(arr) + (transforms,)
+    delta, _, delta_transform = integer_derivative_compression(arr)
+    transforms.append(delta_transform)
+    candidates = [(nbytes, candidate_array, candidate_type, transforms + candidate_transforms)
+                  for nbytes, candidate_array, candidate_type, candidate_transforms in
+                  _compact_candidates(integer_minimize_compression(delta), bit_pack)]
+    if len(delta) > 1:
+        delta_of_delta, _, delta_of_delta_transform = integer_derivative_compression(delta)
+        candidates += [(nbytes, candidate_array, candidate_type,
+                        transforms + [delta_of_delta_transform] + candidate_transforms)
+                       for nbytes, candidate_array, candidate_type, candidate_transforms in
+                       _compact_candidates(integer_zigzag_compression(delta_of_delta), bit_pack)]
+    # first candidates win ties, the first derivative decodes with one running sum fewer
+    nbytes, best_array, best_type, best_transforms = min(candidates, key=lambda candidate: candidate[0])
+    logger.debug('timestamps compressed into %s bytes of %s with %s transforms', nbytes, best_type,
+                 len(best_transforms))
+    return best_array, best_type, best_transforms[::-1]
@@ -3,6 +3,7 @@ import numpy as np
 import logging
 import fewerbytes.exceptions as ex
 
+logger = logging.getLogger(__name__)
 
 UNSIGNED_BYTE_MAX = np.iinfo(np.uint8).max
 UNSIGNED_SHORT_MAX = np.iinfo(np.uint16).max
@@ -66,7 +67,7 @@ class NumpySizes(Enum):
         :param int_max: maximum integer size must hold
         :return: size of signed-integer required
         """
-        logging.debug('Making NumpySizes from integer min {} and max {}'.format(int_min, int_max))
+        logger.debug('Making NumpySizes from integer min %s and max %s', int_min, int_max)
         if int_min > int_max:
             raise ValueError('int_min larger than int_max')
         if int_min >= INTEGER_BYTE_MIN and int_max <= INTEGER_BYTE_MAX:
@@ -87,7 +88,7 @@ class NumpySizes(Enum):
         :param unsigned_max: maximum value unsigned integer size must hold
         :return: size of unsigned-integer required
         """
-        logging.debug('Making NumpySizes from unsigned integer max {}'.format(unsigned_max))
+        logger.debug('Making NumpySizes from unsigned integer max %s', unsigned_max)
         if unsigned_max <= UNSIGNED_BYTE_MAX:
             return NumpySizes.BYTE
         if unsigned_max <= UNSIGNED_SHORT_MAX:
@@ -7,9 +7,25 @@ echo ""
 coverage erase
 
 
+coverage run -a --omit "venv_fewerbytes/*" -m tests.test_aggregates
+coverage run -a --omit "venv_fewerbytes/*" -m tests.test_batched
+coverage run -a --omit "venv_fewerbytes/*" -m tests.test_bit_packing
+coverage run -a --omit "venv_fewerbytes/*" -m tests.test_chunked
 coverage run -a --omit "venv_fewerbytes/*" -m tests.test_compression_details
+coverage run -a --omit "venv_fewerbytes/*" -m tests.test_dictionaries
+coverage run -a --omit "venv_fewerbytes/*" -m tests.test_elias_fano
+coverage run -a --omit "venv_fewerbytes/*" -m tests.test_estimation
+coverage run -a --omit "venv_fewerbytes/*" -m tests.test_float_compression
+coverage run -a --omit "venv_fewerbytes/*" -m tests.test_float_decompression
 coverage run -a --omit "venv_fewerbytes/*" -m tests.test_integer_compression
 coverage run -a --omit "venv_fewerbytes/*" -m tests.test_integer_decompression
+coverage run -a --omit "venv_fewerbytes/*" -m tests.test_mapped
+coverage run -a --omit "venv_fewerbytes/*" -m tests.test_planner
+coverage run -a --omit "venv_fewerbytes/*" -m tests.test_predicates
+coverage run -a --omit "venv_fewerbytes/*" -m tests.test_reductions
+coverage run -a --omit "venv_fewerbytes/*" -m tests.test_serialization
+coverage run -a --omit "venv_fewerbytes/*" -m tests.test_streaming
+coverage run -a --omit "venv_fewerbytes/*" -m tests.test_timestamps
 coverage run -a --omit "venv_fewerbytes/*" -m tests.test_types
 
 report_coverage=false
@@ -0,0 +1,152 @@
+import unittest
+import numpy as np
+import fewerbytes.aggregates as ag
+import fewerbytes.chunked as ch
+import fewerbytes.compression_details as cd
+import fewerbytes.exceptions as x
+import fewerbytes.float_compression as fc
+import fewerbytes.integer_compression as ic
+import fewerbytes.types as t
+
+
+def expected_aggregates(arr: np.array) -> dict:
+    return {
+        ag.Aggregates.MIN: arr.min(),
+        ag.Aggregates.MAX: arr.max(),
+        ag.Aggregates.SUM: arr.sum(),
+        ag.Aggregates.COUNT: len(arr),
+        ag.Aggregates.MEAN: arr.mean(),
+        ag.Aggregates.FIRST: arr[0],
+        ag.Aggregates.LAST: arr[-1]
+    }
+
+
+def aggregate_arrays() -> list:
+    rng = np.random.RandomState(0)
+    return [
+        np.cumsum(rng.randint(-50, 50, size=100000)) + 10 ** 10,
+        rng.choice(np.array([10 ** 9, 2 * 10 ** 9, 3 * 10 ** 9, 7]), size=10000),
+        np.repeat(np.array([5, 10 ** 9, 3]), [1000, 2000, 5]),
+        1500000000 + 60 * np.arange(10000),
+        np.array([4]),
+        rng.randint(-2 ** 40, 2 ** 40, size=1000)
+    ]
+
+
+class TestAggregates(unittest.TestCase):
+    def validate_aggregates(self, original: np.array, arr: np.array, transforms: list):
+        for aggregate, expected in expected_aggregates(original).items():
+            self.assertAlmostEqual(expected, ag.compressed_aggregate(arr, transforms, aggregate),
+                                   msg='{} through {}'.format(aggregate, transforms))
+        return
+
+    def test_combined_aggregates(self):
+        for original in aggregate_arrays():
+            for bit_pack in [False, True]:
+                arr, _, transforms = ic.combined_integer_compression(original, bit_pack=bit_pack)
+                self.validate_aggregates(original, arr, transforms)
+        return
+
+    def test_minimize_aggregates(self):
+        arr = np.array([1, 2, 3, 4, 5], dtype=np.uint8)
+        transforms = [cd.IntegerMinimizeTransformation(-1000)]
+        self.assertEqual(-999, ag.compressed_aggregate(arr, transforms, 'min'))
+        self.assertEqual(-995, ag.compressed_aggregate(arr, transforms, 'max'))
+        self.assertEqual(-4985, ag.compressed_aggregate(arr, transforms, 'sum'))
+        self.assertEqual(-997, ag.compressed_aggregate(arr, transforms, 'mean'))
+        return
+
+    def test_hash_aggregates_skip_missing_keys(self):
+        arr = np.array([1, 1, 2], dtype=np.uint8)
+        transforms = [cd.IntegerHashTransformation(
+            np.array([-1000, 0, 1000], dtype=np.int16),
+            t.NumpyType(t.NumpyKinds.INTEGER, t.NumpySizes.SHORT)
+        )]
+        self.assertEqual(0, ag.compressed_aggregate(arr, transforms, 'min'))
+        self.assertEqual(1000, ag.compressed_aggregate(arr, transforms, 'sum'))
+        self.assertEqual(1000, ag.compressed_aggregate(arr, transforms, 'last'))
+        return
+
+    def test_hash_aggregates_invalid_keys(self):
+        transforms = [cd.IntegerHashTransformation(
+            np.array([-1000, 0, 1000], dtype=np.int16),
+            t.NumpyType(t.NumpyKinds.INTEGER, t.NumpySizes.SHORT)
+        )]
+        for aggregate in ['sum', 'min', 'mean']:
+            with self.assertRaises(x.InvalidCompressedFormatException):
+                ag.compressed_aggregate(np.array([1, 3, 2], dtype=np.uint8), transforms, aggregate)
+        return
+
+    def test_hash_aggregates_exact_sum(self):
+        keys = np.array([0, 1, 1] * 100, dtype=np.uint8)
+        transforms = [cd.IntegerHashTransformation(
+            np.array([2 ** 63, 2 ** 63 + 5], dtype=np.uint64),
+            t.NumpyType(t.NumpyKinds.UNSIGNED, t.NumpySizes.DOUBLE)
+        )]
+        self.assertEqual(300 * 2 ** 63 + 1000, ag.compressed_aggregate(keys, transforms, 'sum'))
+        transforms = [cd.IntegerHashTransformation(
+            np.array([2 ** 62, -1], dtype=np.int64),
+            t.NumpyType(t.NumpyKinds.INTEGER, t.NumpySizes.DOUBLE)
+        )]
+        self.assertEqual(100 * 2 ** 62 - 200, ag.compressed_aggregate(keys, transforms, 'sum'))
+        self.assertEqual(3 * 2 ** 63, ag.compressed_aggregate(np.array([2 ** 63] * 3, dtype=np.uint64), [], 'sum'))
+        return
+
+    def test_count_without_decompressing(self):
+        arr = np.array([1, 2, 3], dtype=np.uint8)
+        # exceptions past the end of the array, only reached by decompressing
+        patched = cd.IntegerPatchedTransformation(
+            5, np.array([100], dtype=np.uint8), t.NumpyType(t.NumpyKinds.UNSIGNED, t.NumpySizes.BYTE),
+            np.array([7], dtype=np.uint8), t.NumpyType(t.NumpyKinds.UNSIGNED, t.NumpySizes.BYTE))
+        sparse = cd.IntegerSparseTransformation(
+            np.array([100, 0, 0], dtype=np.uint8), t.NumpyType(t.NumpyKinds.UNSIGNED, t.NumpySizes.BYTE), 10)
+        rounding = cd.FloatRoundingTransformation(2, t.NumpyType(t.NumpyKinds.FLOAT, t.NumpySizes.DOUBLE))
+        with self.assertRaises(IndexError):
+            ag.compressed_aggregate(arr, [patched], 'max')
+        self.assertEqual(3, ag.compressed_aggregate(arr, [patched, cd.IntegerZigzagTransformation(), rounding],
+                                                    'count'))
+        self.assertEqual(10, ag.compressed_aggregate(arr, [sparse], 'count'))
+        return
+
+    def test_derivative_scan_blocks(self):
+        original = np.cumsum(np.random.RandomState(0).randint(-5, 6, size=3 * ag.DERIVATIVE_SCAN_BLOCK_SIZE + 7))
+        arr, _, transforms = ic.integer_derivative_compression(original)
+        self.validate_aggregates(original, arr, [transforms])
+        return
+
+    def test_derivative_wrapped_deltas(self):
+        for original in [np.array([0, 2 ** 64 - 1, 0, 2 ** 64 - 1, 5] * 400, dtype=np.uint64),
+                         np.array([-2 ** 63, 2 ** 63 - 1, 4] * 10, dtype=np.int64)]:
+            arr, _, transform = ic.integer_derivative_compression(original)
+            self.assertEqual(int(original.min()), ag.compressed_aggregate(arr, [transform], 'min'))
+            self.assertEqual(int(original.max()), ag.compressed_aggregate(arr, [transform], 'max'))
+            self.assertEqual(int(original[-1]), ag.compressed_aggregate(arr, [transform], 'last'))
+        return
+
+    def test_float_aggregates(self):
+        original = np.round(20 + np.cumsum(np.random.RandomState(0).normal(0, 0.05, size=1000)), 2)
+        for decimals in [2, None]:
+            arr, _, transforms = fc.combined_float_compression(original, decimals)
+            self.validate_aggregates(original, arr, transforms)
+        return
+
+    def test_chunked_aggregates(self):
+        original = aggregate_arrays()[0]
+        chunked = ch.chunked_integer_compression(original, chunk_size=7000)
+        for aggregate, expected in expected_aggregates(original).items():
+            self.assertAlmostEqual(expected, ag.chunked_aggregate(chunked, aggregate))
+        return
+
+    def test_empty(self):
+        self.assertEqual(0, ag.compressed_aggregate(np.array([], dtype=np.uint8), [], 'count'))
+        with self.assertRaises(ValueError):
+            ag.compressed_aggregate(np.array([], dtype=np.uint8), [], 'min')
+        with self.assertRaises(ValueError):
+            ag.chunked_aggregate(ch.chunked_integer_compression(np.array([], dtype=np.int64)), 'max')
+        with self.assertRaises(ValueError):
+            ag.compressed_aggregate(np.array([1], dtype=np.uint8), [], 'median')
+        return
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,105 @@
+import unittest
+import numpy as np
+import fewerbytes.batched as b
+import fewerbytes.integer_decompression as idc
+
+
+def batch_arrays(count: int = 500) -> list:
+    rng = np.random.RandomState(0)
+    arrays = []
+    for i in range(count):
+        size = rng.randint(0, 200)
+        kind = i % 5
+        if kind == 0:
+            arr = 1500000000 + 60 * np.arange(size) + rng.randint(0, 3, size=size)
+        elif kind == 1:
+            arr = np.cumsum(np.cumsum(rng.randint(-3, 4, size=size)))
+        elif kind == 2:
+            arr = rng.randint(-2 ** 62, 2 ** 62, size=size)
+        elif kind == 3:
+            arr = np.full(size, 7)
+        else:
+            arr = np.cumsum(rng.randint(-50, 50, size=size)) + 10 ** 10
+        arrays.append(arr.astype(np.int64))
+    return arrays
+
+
+class TestBatched(unittest.TestCase):
+    def validate_arrays(self, expected: list, actual: list):
+        self.assertEqual(len(expected), len(actual))
+        for i, (e, a) in enumerate(zip(expected, actual)):
+            self.assertTrue(np.array_equal(e, a), msg='segment {}'.format(i))
+            self.assertEqual(e.dtype, a.dtype)
+        return
+
+    def test_round_trip(self):
+        arrays = batch_arrays()
+        batch = b.compress_many(arrays)
+        self.assertEqual(len(arrays), len(batch))
+        self.validate_arrays(arrays, b.decompress_many(batch))
+        self.assertLess(batch.nbytes, sum(arr.nbytes for arr in arrays) / 2)
+        self.assertTrue({0, 1} <= set(batch.orders.tolist()))
+        return
+
+    def test_ragged(self):
+        arrays = batch_arrays()
+        values = np.concatenate(arrays)
+        offsets = np.zeros(len(arrays) + 1, dtype=np.int64)
+        np.cumsum([len(arr) for arr in arrays], out=offsets[1:])
+        batch = b.compress_many(values, offsets)
+        decompressed, decompressed_offsets = b.decompress_many(batch, ragged=True)
+        self.assertTrue(np.array_equal(values, decompressed))
+        self.assertTrue(np.array_equal(offsets, decompressed_offsets))
+        return
+
+    def test_segment(self):
+        arrays = batch_arrays(50)
+        batch = b.compress_many(arrays)
+        for i, arr in enumerate(arrays):
+            if len(arr) == 0:
+                continue
+            compressed, _, transforms = batch.segment(i)
+            self.assertTrue(np.array_equal(arr, idc.integer_decompression_from_transforms(compressed, transforms)))
+        return
+
+    def test_dtypes(self):
+        rng = np.random.RandomState(1)
+        for dtype in [np.uint8, np.int8, np.int16, np.uint32, np.uint64]:
+            info = np.iinfo(dtype)
+            arrays = [rng.randint(max(int(info.min), -1000), min(int(info.max), 1000), size=size).astype(dtype)
+                      for size in [1, 5, 0, 30]]
+            arrays.append(np.array([info.min, info.max, info.min], dtype=dtype) if dtype != np.uint64 else
+                          np.array([0, np.iinfo(np.int64).max, 0], dtype=dtype))
+            self.validate_arrays(arrays, b.decompress_many(b.compress_many(arrays)))
+        return
+
+    def test_max_derivatives(self):
+        arrays = [np.arange(1000) ** 2, np.arange(0, 5000, 100)]
+        batch = b.compress_many(arrays, max_derivatives=0)
+        self.assertTrue(np.all(batch.orders == 0))
+        self.validate_arrays(arrays, b.decompress_many(batch))
+        self.assertEqual([2, 1], b.compress_many(arrays).orders.tolist())
+        return
+
+    def test_empty(self):
+        batch = b.compress_many([])
+        self.assertEqual(0, len(batch))
+        self.assertEqual([], b.decompress_many(batch))
+        arrays = [np.array([], dtype=np.int32)] * 3
+        self.validate_arrays(arrays, b.decompress_many(b.compress_many(arrays)))
+        return
+
+    def test_invalid(self):
+        with self.assertRaises(ValueError):
+            b.compress_many([np.array([1.5, 2.5])])
+        with self.assertRaises(ValueError):
+            b.compress_many([np.array([2 ** 64 - 1], dtype=np.uint64)])
+        with self.assertRaises(ValueError):
+            b.compress_many(np.arange(10), np.array([0, 4, 9]))
+        with self.assertRaises(ValueError):
+            b.compress_many(np.arange(10), np.array([0, 6, 4, 10]))
+        return
+
+
+if __name__ == '__main__':
+    unittest.main()
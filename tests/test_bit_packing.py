@@ -0,0 +1,93 @@
+import unittest
+import numpy as np
+import fewerbytes.bit_packing as bp
+
+
+class TestBitPacking(unittest.TestCase):
+    def test_packed_length(self):
+        self.assertEqual(0, bp.packed_length(0, 3))
+        self.assertEqual(1, bp.packed_length(2, 3))
+        self.assertEqual(3, bp.packed_length(8, 3))
+        self.assertEqual(8, bp.packed_length(1, 64))
+        return
+
+    def test_pack_bits_layout(self):
+        packed = bp.pack_bits(np.array([1, 2, 3, 0], dtype=np.uint8), 2)
+        self.assertEqual(1, len(packed))
+        self.assertEqual(0b01101100, packed[0])
+        return
+
+    def test_round_trip_widths(self):
+        rng = np.random.RandomState(0)
+        for bit_width in [1, 3, 8, 13, 32, 63]:
+            arr = rng.randint(0, 2 ** bit_width, size=1000, dtype=np.uint64)
+            packed = bp.pack_bits(arr, bit_width)
+            self.assertEqual(bp.packed_length(1000, bit_width), len(packed))
+            self.assertTrue(np.array_equal(arr, bp.unpack_bits(packed, bit_width, 1000)))
+        return
+
+    def test_round_trip_full_width(self):
+        arr = np.array([0, 1, 2 ** 64 - 1, 2 ** 63], dtype=np.uint64)
+        unpacked = bp.unpack_bits(bp.pack_bits(arr, 64), 64, 4)
+        self.assertEqual(np.uint64, unpacked.dtype)
+        self.assertTrue(np.array_equal(arr, unpacked))
+        return
+
+    def test_round_trip_multiple_chunks(self):
+        arr = np.arange(bp.BIT_PACK_CHUNK_SIZE * 2 + 5) % 32
+        unpacked = bp.unpack_bits(bp.pack_bits(arr, 5), 5, len(arr))
+        self.assertEqual(np.uint8, unpacked.dtype)
+        self.assertTrue(np.array_equal(arr, unpacked))
+        return
+
+    def test_unpack_bits_at(self):
+        rng = np.random.RandomState(0)
+        for bit_width in [1, 5, 13, 57, 58, 64]:
+            arr = rng.randint(0, 2 ** min(bit_width, 63), size=1000, dtype=np.uint64)
+            indices = np.array([999, 0, 500, 3, 3])
+            self.assertTrue(np.array_equal(arr[indices], bp.unpack_bits_at(bp.pack_bits(arr, bit_width), bit_width,
+                                                                            indices)))
+        return
+
+    def test_unpack_into_out(self):
+        arr = np.arange(0, 1000, 7, dtype=np.uint16)
+        out = np.zeros(len(arr), dtype=np.int64)
+        self.assertIs(out, bp.unpack_bits(bp.pack_bits(arr, 10), 10, len(arr), out=out))
+        self.assertTrue(np.array_equal(arr, out))
+        with self.assertRaises(ValueError):
+            bp.unpack_bits(bp.pack_bits(arr, 10), 10, len(arr), out=np.zeros(3))
+        return
+
+    def test_invalid_width(self):
+        with self.assertRaises(ValueError):
+            bp.pack_bits(np.zeros(3, dtype=np.uint8), 0)
+        with self.assertRaises(ValueError):
+            bp.unpack_bits(np.zeros(3, dtype=np.uint8), 65, 1)
+        with self.assertRaises(ValueError):
+            bp.unpack_bits(np.zeros(1, dtype=np.uint8), 3, 3)
+        return
+
+    def test_bit_lengths(self):
+        lengths = bp.bit_lengths(np.array([0, 1, 2, 3, 255, 256, 2 ** 64 - 1], dtype=np.uint64))
+        self.assertEqual([0, 1, 2, 2, 8, 9, 64], lengths.tolist())
+        return
+
+    def test_round_trip_blocks(self):
+        blocks = np.array([[0] * 8, [1, 0, 1, 0, 1, 0, 1, 0], list(range(8)), [1000] * 8], dtype=np.uint64)
+        bit_widths = np.array([0, 1, 3, 10], dtype=np.uint8)
+        packed = bp.pack_blocks(blocks, bit_widths)
+        self.assertEqual(14, len(packed))
+        self.assertEqual([0, 0, 1, 4, 14], bp.block_byte_offsets(bit_widths, 8).tolist())
+        self.assertTrue(np.array_equal(blocks, bp.unpack_blocks(packed, bit_widths, 8)))
+        return
+
+    def test_blocks_invalid(self):
+        with self.assertRaises(ValueError):
+            bp.pack_blocks(np.zeros((2, 4), dtype=np.uint64), np.array([1, 1], dtype=np.uint8))
+        with self.assertRaises(ValueError):
+            bp.unpack_blocks(np.zeros(1, dtype=np.uint8), np.array([1, 1], dtype=np.uint8), 8)
+        return
+
+
+if __name__ == '__main__':
+    unittest.main()
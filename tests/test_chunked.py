@@ -0,0 +1,102 @@
+import unittest
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+import fewerbytes.chunked as ch
+
+
+def drifting_array():
+    return np.cumsum(np.random.RandomState(0).randint(-50, 50, size=10000)) + 10 ** 10
+
+
+class TestChunked(unittest.TestCase):
+    def test_chunked_round_trip(self):
+        original = drifting_array()
+        chunked = ch.chunked_integer_compression(original, chunk_size=3000, max_workers=2)
+        self.assertEqual(4, len(chunked.chunks))
+        self.assertEqual(10000, len(chunked))
+        self.assertEqual([0, 3000, 6000, 9000, 10000], chunked.chunk_offsets.tolist())
+        self.assertEqual(1000, chunked.chunks[-1].length)
+        self.assertTrue(np.array_equal(original, ch.chunked_integer_decompression(chunked, max_workers=2)))
+        return
+
+    def test_chunked_decompression_into_out(self):
+        original = drifting_array()
+        chunked = ch.chunked_integer_compression(original, chunk_size=3000)
+        out = np.zeros(len(original), dtype=np.int64)
+        self.assertIs(out, ch.chunked_integer_decompression(chunked, max_workers=2, out=out))
+        self.assertTrue(np.array_equal(original, out))
+        decompressed = ch.chunked_integer_decompression(chunked, dtype=np.float64)
+        self.assertEqual(np.float64, decompressed.dtype)
+        self.assertTrue(np.array_equal(original, decompressed))
+        with self.assertRaises(ValueError):
+            ch.chunked_integer_decompression(chunked, out=np.zeros(3))
+        with self.assertRaises(ValueError):
+            ch.chunked_integer_decompression(chunked, executor='process', out=out)
+        return
+
+    def test_chunked_process_pool(self):
+        original = drifting_array()
+        chunked = ch.chunked_integer_compression(original, chunk_size=5000, max_workers=2, executor='process')
+        decompressed = ch.chunked_integer_decompression(chunked, max_workers=2, executor='process')
+        self.assertTrue(np.array_equal(original, decompressed))
+        return
+
+    def test_chunked_existing_executor(self):
+        original = np.concatenate([np.arange(100, dtype=np.int64) - 10 ** 6, np.full(100, 2 ** 40)])
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            chunked = ch.chunked_integer_compression(original, chunk_size=100, executor=pool, bit_pack=True)
+            decompressed = ch.chunked_integer_decompression(chunked, executor=pool)
+        self.assertEqual(np.int64, decompressed.dtype)
+        self.assertTrue(np.array_equal(original, decompressed))
+        return
+
+    def test_chunked_empty(self):
+        chunked = ch.chunked_integer_compression(np.array([], dtype=np.int32))
+        self.assertEqual(0, len(chunked))
+        self.assertEqual(0, len(ch.chunked_integer_decompression(chunked)))
+        return
+
+    def test_chunked_invalid(self):
+        with self.assertRaises(ValueError):
+            ch.chunked_integer_compression(drifting_array(), chunk_size=0)
+        with self.assertRaises(ValueError):
+            ch.chunked_integer_compression(drifting_array(), executor='fiber')
+        return
+
+    def test_chunked_index(self):
+        original = drifting_array()
+        chunked = ch.chunked_integer_compression(original, chunk_size=1000)
+        for index in [0, 999, 1000, 5555, 9999, -1, -10000]:
+            self.assertEqual(original[index], chunked[index])
+        self.assertEqual(original[5001], chunked[np.int64(5001)])
+        self.assertEqual(5, chunked._cached_chunk[0])
+        with self.assertRaises(IndexError):
+            chunked[10000]
+        with self.assertRaises(IndexError):
+            chunked[-10001]
+        return
+
+    def test_chunked_index_threads(self):
+        original = drifting_array()
+        chunked = ch.chunked_integer_compression(original, chunk_size=100)
+        indices = np.random.RandomState(3).randint(0, len(original), size=2000)
+
+        def read(offset: int) -> list:
+            return [chunked[int(index)] for index in np.roll(indices, offset)]
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            for offset, values in zip(range(8), pool.map(read, range(8))):
+                self.assertEqual(original[np.roll(indices, offset)].tolist(), values)
+        return
+
+    def test_chunked_slice(self):
+        original = drifting_array()
+        chunked = ch.chunked_integer_compression(original, chunk_size=1000)
+        for item in [slice(10, 20), slice(990, 3010), slice(None, None, 7), slice(8000, 1000, -3), slice(-5, None),
+                     slice(50, 50)]:
+            self.assertTrue(np.array_equal(original[item], chunked[item]))
+        return
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -34,5 +34,128 @@ class TestCompressionDetails(unittest.TestCase):
         self.assertTrue('key_values_type=' in ts and 'key_values=' in ts)
         return
 
+    def test_integer_bit_pack_transform(self):
+        t = c.IntegerBitPackTransformation(3, 10)
+        self.assertEqual(c.IntegerTransformTypes.BIT_PACK, t.transform_type)
+        self.assertEqual(3, t.bit_width)
+        self.assertEqual(10, t.length)
+        ts = '{}'.format(t)
+        self.assertTrue('bit_width=' in ts and 'length=' in ts)
+        return
+
+    def test_integer_block_minimize_transform(self):
+        t = c.IntegerBlockMinimizeTransformation(
+            8, 12,
+            np.array([5, 100], dtype=np.uint8),
+            fbt.NumpyType(fbt.NumpyKinds.UNSIGNED, fbt.NumpySizes.BYTE),
+            np.array([0, 3], dtype=np.uint8)
+        )
+        self.assertEqual(c.IntegerTransformTypes.BLOCK_MINIMIZE, t.transform_type)
+        self.assertEqual(8, t.block_size)
+        self.assertEqual(12, t.length)
+        self.assertEqual(100, t.reference_values[1])
+        self.assertEqual(3, t.bit_widths[1])
+        ts = '{}'.format(t)
+        self.assertTrue('block_size=' in ts and 'num_blocks=' in ts)
+        return
+
+    def test_integer_zigzag_transform(self):
+        t = c.IntegerZigzagTransformation()
+        self.assertEqual(c.IntegerTransformTypes.ZIGZAG, t.transform_type)
+        self.assertTrue('IntegerZigzagTransformation' in '{}'.format(t))
+        return
+
+    def test_integer_dictionary_transform(self):
+        t = c.IntegerDictionaryTransformation(7, 40)
+        self.assertEqual(c.IntegerTransformTypes.DICTIONARY, t.transform_type)
+        self.assertEqual(7, t.dictionary_id)
+        self.assertEqual(40, t.num_keys)
+        ts = '{}'.format(t)
+        self.assertTrue('dictionary_id=' in ts and 'num_keys=' in ts)
+        return
+
+    def test_integer_sparse_transform(self):
+        t = c.IntegerSparseTransformation(
+            np.array([3, 1], dtype=np.uint8),
+            fbt.NumpyType(fbt.NumpyKinds.UNSIGNED, fbt.NumpySizes.BYTE),
+            10
+        )
+        self.assertEqual(c.IntegerTransformTypes.SPARSE, t.transform_type)
+        self.assertEqual(10, t.length)
+        self.assertEqual(1, t.gaps[1])
+        ts = '{}'.format(t)
+        self.assertTrue('gaps_type=' in ts and 'num_values=' in ts)
+        return
+
+    def test_integer_patched_transform(self):
+        t = c.IntegerPatchedTransformation(
+            7,
+            np.array([4], dtype=np.uint8),
+            fbt.NumpyType(fbt.NumpyKinds.UNSIGNED, fbt.NumpySizes.BYTE),
+            np.array([-300], dtype=np.int16),
+            fbt.NumpyType(fbt.NumpyKinds.INTEGER, fbt.NumpySizes.SHORT)
+        )
+        self.assertEqual(c.IntegerTransformTypes.PATCHED, t.transform_type)
+        self.assertEqual(7, t.reference_value)
+        self.assertEqual(-300, t.exception_values[0])
+        self.assertTrue('num_exceptions=1' in '{}'.format(t))
+        return
+
+    def test_integer_elias_fano_transform(self):
+        t = c.IntegerEliasFanoTransformation(
+            2, 3, 10, np.zeros(64, dtype=np.uint8), np.array([0], dtype=np.uint8),
+            fbt.NumpyType(fbt.NumpyKinds.UNSIGNED, fbt.NumpySizes.BYTE)
+        )
+        self.assertEqual(c.IntegerTransformTypes.ELIAS_FANO, t.transform_type)
+        self.assertEqual(2, t.low_bits)
+        self.assertEqual(3, t.length)
+        self.assertTrue('upper_bytes=64' in '{}'.format(t))
+        return
+
+    def test_integer_entropy_transform(self):
+        t = c.IntegerEntropyTransformation(c.EntropyCodecs.LZMA, 9,
+                                           fbt.NumpyType(fbt.NumpyKinds.UNSIGNED, fbt.NumpySizes.SHORT), 100)
+        self.assertEqual(c.IntegerTransformTypes.ENTROPY, t.transform_type)
+        self.assertEqual(c.EntropyCodecs.LZMA, t.codec)
+        self.assertEqual(9, t.level)
+        self.assertEqual(100, t.length)
+        self.assertTrue('level=9' in '{}'.format(t))
+        return
+
+    def test_integer_datetime_transform(self):
+        t = c.IntegerDatetimeTransformation('datetime64[ms]')
+        self.assertEqual(c.IntegerTransformTypes.DATETIME, t.transform_type)
+        self.assertEqual(np.dtype('datetime64[ms]'), t.datetime_dtype)
+        self.assertTrue('datetime_dtype=' in '{}'.format(t))
+        return
+
+    def test_float_rounding_transform(self):
+        t = c.FloatRoundingTransformation(2, fbt.NumpyType(fbt.NumpyKinds.FLOAT, fbt.NumpySizes.DOUBLE))
+        self.assertEqual(c.FloatTransformTypes.ROUNDING, t.transform_type)
+        self.assertEqual(2, t.decimals)
+        self.assertEqual(fbt.NumpyType(fbt.NumpyKinds.FLOAT, fbt.NumpySizes.DOUBLE), t.float_type)
+        ts = '{}'.format(t)
+        self.assertTrue('decimals=' in ts and 'float_type=' in ts)
+        return
+
+    def test_float_xor_delta_transform(self):
+        t = c.FloatXorDeltaTransformation(fbt.NumpyType(fbt.NumpyKinds.FLOAT, fbt.NumpySizes.SINGLE))
+        self.assertEqual(c.FloatTransformTypes.XOR_DELTA, t.transform_type)
+        self.assertEqual(fbt.NumpyType(fbt.NumpyKinds.FLOAT, fbt.NumpySizes.SINGLE), t.float_type)
+        self.assertTrue('float_type=' in '{}'.format(t))
+        return
+
+    def test_integer_run_length_transform(self):
+        t = c.IntegerRunLengthTransformation(
+            np.array([3, 1], dtype=np.uint8),
+            fbt.NumpyType(fbt.NumpyKinds.UNSIGNED, fbt.NumpySizes.BYTE)
+        )
+        self.assertEqual(c.IntegerTransformTypes.RUN_LENGTH, t.transform_type)
+        self.assertEqual(3, t.run_lengths[0])
+        self.assertEqual(t.run_lengths_type, fbt.NumpyType(fbt.NumpyKinds.UNSIGNED, fbt.NumpySizes.BYTE))
+        ts = '{}'.format(t)
+        self.assertTrue('run_lengths_type=' in ts and 'run_lengths=' in ts)
+        return
+
 if __name__ == '__main__':
     unittest.main()
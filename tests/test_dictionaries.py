@@ -0,0 +1,113 @@
+import unittest
+import numpy as np
+import fewerbytes.aggregates as ag
+import fewerbytes.compression_details as cd
+import fewerbytes.dictionaries as d
+import fewerbytes.exceptions as x
+import fewerbytes.integer_compression as ic
+import fewerbytes.integer_decompression as idc
+import fewerbytes.predicates as p
+
+
+def status_codes(size: int, seed: int = 0) -> np.array:
+    codes = np.array([200, 201, 204, 301, 302, 304, 400, 401, 403, 404, 500, 502, 503], dtype=np.int64)
+    return np.random.RandomState(seed).choice(codes, size=size)
+
+
+class TestDictionaries(unittest.TestCase):
+    def test_train_and_encode(self):
+        dictionary = d.HashDictionary.train(status_codes(1000))
+        dictionaries = {dictionary.dictionary_id: dictionary}
+        self.assertEqual(13, len(dictionary))
+        self.assertEqual(np.uint16, dictionary.key_values.dtype)
+        for seed in range(1, 4):
+            original = status_codes(5000, seed)
+            keys, key_type, transform = d.integer_dictionary_compression(original, dictionary)
+            self.assertEqual(np.uint8, keys.dtype)
+            self.assertEqual(cd.IntegerTransformTypes.DICTIONARY, transform.transform_type)
+            self.assertEqual(dictionary.dictionary_id, transform.dictionary_id)
+            self.assertTrue(np.array_equal(original, idc.integer_decompression_from_transforms(
+                keys, [transform], dictionaries=dictionaries)))
+        self.assertEqual(13, len(dictionary))
+        return
+
+    def test_extend_keeps_keys(self):
+        dictionary = d.HashDictionary(np.array([5, 3, 9]))
+        dictionaries = {dictionary.dictionary_id: dictionary}
+        original = np.array([3, 3, 5, 9])
+        keys, _, transform = d.integer_dictionary_compression(original, dictionary)
+        self.assertEqual([1, 1, 0, 2], keys.tolist())
+        extended = np.array([-7, 3, 2 ** 40, 5])
+        with self.assertRaises(ValueError):
+            d.integer_dictionary_compression(extended, dictionary)
+        self.assertEqual(3, len(dictionary))
+        new_keys, _, new_transform = d.integer_dictionary_compression(extended, dictionary, extend=True)
+        self.assertEqual([3, 1, 4, 0], new_keys.tolist())
+        self.assertEqual([5, 3, 9, -7, 2 ** 40], dictionary.key_values.tolist())
+        self.assertEqual(5, new_transform.num_keys)
+        self.assertTrue(np.array_equal(original, idc.integer_decompression_from_transforms(
+            keys, [transform], dictionaries=dictionaries)))
+        self.assertTrue(np.array_equal(extended, idc.integer_decompression_from_transforms(
+            new_keys, [new_transform], dictionaries=dictionaries)))
+        with self.assertRaises(ValueError):
+            dictionary.encode(np.array([11]))
+        return
+
+    def test_chained_transforms(self):
+        dictionary = d.HashDictionary.train(status_codes(1000))
+        original = status_codes(1000, 1)
+        keys, _, transform = d.integer_dictionary_compression(original, dictionary)
+        packed, _, bit_pack_transform = ic.integer_bitpack_compression(keys)
+        transforms = [bit_pack_transform, transform]
+        dictionaries = {dictionary.dictionary_id: dictionary}
+        self.assertTrue(np.array_equal(original, idc.integer_decompression_from_transforms(
+            packed, transforms, dictionaries=dictionaries)))
+        out = np.empty(len(original), dtype=np.int32)
+        idc.integer_decompression_from_transforms(packed, transforms, out=out, dictionaries=dictionaries)
+        self.assertTrue(np.array_equal(original, out))
+        self.assertEqual(original.sum(), ag.compressed_aggregate(packed, transforms, 'sum', dictionaries))
+        self.assertEqual(original.max(), ag.compressed_aggregate(packed, transforms, 'max', dictionaries))
+        self.assertAlmostEqual(original.mean(), ag.compressed_aggregate(packed, transforms, 'mean', dictionaries))
+        mask = p.compressed_mask(packed, transforms, p.Predicate.between(400, 499), dictionaries)
+        self.assertTrue(np.array_equal((original >= 400) & (original <= 499), mask))
+        self.assertTrue(np.array_equal(np.flatnonzero(original == 404), p.compressed_where(
+            packed, transforms, p.Predicate.equal(404), dictionaries)))
+        return
+
+    def test_unknown_dictionary(self):
+        with self.assertRaises(x.UnknownDictionaryException):
+            d.get_dictionary(12345)
+        dictionary = d.HashDictionary(np.array([1, 2]), dictionary_id=12346)
+        with self.assertRaises(x.UnknownDictionaryException):
+            d.resolve_dictionary(cd.IntegerDictionaryTransformation(12346, 3), {12346: dictionary})
+        return
+
+    def test_registry_is_explicit(self):
+        dictionary = d.HashDictionary(np.array([10, 20]), dictionary_id=12347)
+        keys, _, transform = d.integer_dictionary_compression(np.array([20, 10, 20]), dictionary)
+        # compressing does not register the dictionary, decompressing needs it given or registered
+        with self.assertRaises(x.UnknownDictionaryException):
+            idc.integer_decompression_from_transforms(keys, [transform])
+        d.register_dictionary(dictionary)
+        try:
+            self.assertEqual([20, 10, 20], idc.integer_decompression_from_transforms(keys, [transform]).tolist())
+            # a given dictionary is searched before the registered one
+            other = d.HashDictionary(np.array([30, 40]), dictionary_id=12347)
+            self.assertEqual([40, 30, 40], idc.integer_decompression_from_transforms(
+                keys, [transform], dictionaries={12347: other}).tolist())
+        finally:
+            d.unregister_dictionary(12347)
+        with self.assertRaises(x.UnknownDictionaryException):
+            d.get_dictionary(12347)
+        return
+
+    def test_invalid(self):
+        with self.assertRaises(ValueError):
+            d.HashDictionary(np.array([1, 2, 1]))
+        keys, _, _ = d.integer_dictionary_compression(np.array([], dtype=np.int64), d.HashDictionary())
+        self.assertEqual(0, len(keys))
+        return
+
+
+if __name__ == '__main__':
+    unittest.main()
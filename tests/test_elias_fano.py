@@ -0,0 +1,86 @@
+import unittest
+import numpy as np
+import fewerbytes.aggregates as ag
+import fewerbytes.compression_details as cd
+import fewerbytes.elias_fano as ef
+import fewerbytes.integer_decompression as idc
+
+
+def row_ids(size: int, seed: int = 0) -> np.array:
+    return np.cumsum(np.random.RandomState(seed).randint(1, 200, size=size)) + 10 ** 12
+
+
+class TestEliasFano(unittest.TestCase):
+    def test_round_trip(self):
+        arrays = [
+            row_ids(10000),
+            np.arange(1000, dtype=np.uint16),
+            np.sort(np.random.RandomState(0).randint(0, 5, size=3000)),
+            np.array([-2 ** 63, -5, 0, 2 ** 63 - 1]),
+            np.array([0, 2 ** 64 - 1], dtype=np.uint64),
+            np.array([7]),
+        ]
+        for original in arrays:
+            arr, nt, transform = ef.integer_elias_fano_compression(original)
+            self.assertEqual(np.uint8, arr.dtype)
+            self.assertEqual(cd.IntegerTransformTypes.ELIAS_FANO, transform.transform_type)
+            self.assertTrue(np.array_equal(original, idc.integer_decompression_from_transforms(arr, [transform])))
+            out = np.empty(len(original), dtype=original.dtype)
+            idc.integer_decompression_from_transforms(arr, [transform], out=out)
+            self.assertTrue(np.array_equal(original, out))
+        return
+
+    def test_bits_per_value(self):
+        original = row_ids(100000)
+        arr, _, transform = ef.integer_elias_fano_compression(original)
+        self.assertEqual(6, transform.low_bits)
+        total_bytes = arr.nbytes + transform.upper_bits.nbytes + transform.rank_samples.nbytes
+        self.assertLess(8 * total_bytes / len(original), 9)
+        return
+
+    def test_select(self):
+        original = row_ids(20000)
+        arr, _, transform = ef.integer_elias_fano_compression(original)
+        indices = np.random.RandomState(1).randint(0, len(original), size=500)
+        self.assertTrue(np.array_equal(original[indices], ef.compressed_select(arr, [transform], indices)))
+        self.assertEqual(int(original[-1]), ef.compressed_select(arr, [transform], -1))
+        self.assertEqual(int(original[0]), ef.compressed_select(arr, [transform], 0))
+        with self.assertRaises(IndexError):
+            ef.compressed_select(arr, [transform], len(original))
+        return
+
+    def test_searchsorted(self):
+        for original in [row_ids(20000), np.sort(np.random.RandomState(0).randint(-50, 50, size=5000))]:
+            arr, _, transform = ef.integer_elias_fano_compression(original)
+            queries = np.random.RandomState(2).randint(int(original[0]) - 100, int(original[-1]) + 100, size=1000)
+            queries[:3] = original[[0, 10, -1]]
+            for side in ['left', 'right']:
+                self.assertTrue(np.array_equal(np.searchsorted(original, queries, side=side),
+                                               ef.compressed_searchsorted(arr, [transform], queries, side=side)))
+            self.assertTrue(np.array_equal(np.searchsorted(original, queries),
+                                           ef.compressed_rank(arr, [transform], queries)))
+            self.assertEqual(int(np.searchsorted(original, queries[5])),
+                             ef.compressed_rank(arr, [transform], int(queries[5])))
+        return
+
+    def test_aggregates(self):
+        original = row_ids(5000)
+        arr, _, transform = ef.integer_elias_fano_compression(original)
+        for aggregate in ['min', 'max', 'first', 'last', 'count', 'sum']:
+            self.assertEqual(ag._direct_aggregate(original, ag.Aggregates(aggregate)),
+                             ag.compressed_aggregate(arr, [transform], aggregate))
+        return
+
+    def test_invalid(self):
+        self.assertEqual(None, ef.integer_elias_fano_compression(np.array([3, 1]))[2])
+        self.assertEqual(None, ef.integer_elias_fano_compression(np.array([], dtype=np.int64))[2])
+        arr, _, transform = ef.integer_elias_fano_compression(np.arange(10))
+        with self.assertRaises(ValueError):
+            ef.compressed_searchsorted(arr, [transform, transform], 3)
+        with self.assertRaises(ValueError):
+            ef.compressed_searchsorted(arr, [transform], 3, side='middle')
+        return
+
+
+if __name__ == '__main__':
+    unittest.main()
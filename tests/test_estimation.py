@@ -0,0 +1,53 @@
+import unittest
+import numpy as np
+import fewerbytes.compression_details as cd
+import fewerbytes.estimation as e
+
+
+def timestamp_array():
+    return 1500000000 + 60 * np.arange(200000, dtype=np.int64) + np.random.RandomState(0).randint(0, 3, size=200000)
+
+
+class TestEstimation(unittest.TestCase):
+    def test_estimate_timestamps(self):
+        estimate = e.estimate_compression(timestamp_array(), sample_fraction=0.05)
+        self.assertEqual([cd.IntegerTransformTypes.DERIVATIVE], estimate.chain)
+        self.assertEqual(199999, estimate.predicted_bytes)
+        self.assertEqual(1600000, estimate.original_bytes)
+        self.assertEqual(10 * e.SAMPLE_SEGMENT_LENGTH, estimate.sample_size)
+        self.assertAlmostEqual(8.0, estimate.ratio, places=3)
+        self.assertTrue('ratio=' in '{}'.format(estimate))
+        return
+
+    def test_estimate_random_hash(self):
+        rng = np.random.RandomState(0)
+        arr = rng.choice(rng.randint(0, 2 ** 40, size=3000), size=1000000)
+        estimate = e.estimate_compression(arr, method='random', seed=0)
+        self.assertEqual([cd.IntegerTransformTypes.HASH], estimate.chain)
+        # 16-bit keys and a table of 3000 8-byte values
+        self.assertTrue(2000000 < estimate.predicted_bytes < 2100000)
+        return
+
+    def test_estimate_bit_pack(self):
+        estimate = e.estimate_compression(timestamp_array(), sample_fraction=0.05, bit_pack=True)
+        self.assertEqual(cd.IntegerTransformTypes.BIT_PACK, estimate.chain[-1])
+        self.assertEqual(75000, estimate.predicted_bytes)
+        return
+
+    def test_sample_statistics_small_array(self):
+        statistics = e.sample_statistics(np.arange(100, dtype=np.int64) * 1000)
+        self.assertEqual(100, statistics[0].length)
+        self.assertEqual(99, statistics[1].length)
+        self.assertEqual(1000, statistics[1].minimum)
+        return
+
+    def test_sample_statistics_invalid(self):
+        with self.assertRaises(ValueError):
+            e.sample_statistics(timestamp_array(), sample_fraction=0)
+        with self.assertRaises(ValueError):
+            e.sample_statistics(timestamp_array(), method='clustered')
+        return
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,67 @@
+import unittest
+import numpy as np
+import fewerbytes.compression_details as cd
+import fewerbytes.exceptions as x
+import fewerbytes.float_compression as fc
+import fewerbytes.float_decompression as fd
+import fewerbytes.types as t
+
+
+def measurement_array():
+    return np.round(20 + np.cumsum(np.random.RandomState(0).normal(0, 0.05, size=10000)), 2)
+
+
+class TestFloatCompression(unittest.TestCase):
+    def test_rounding_works(self):
+        arr, nt, transform = fc.float_rounding_compression(np.array([1.234, -0.5, 2.0]), 2)
+        self.assertEqual([123, -50, 200], arr.tolist())
+        self.assertEqual(t.NumpyType(t.NumpyKinds.INTEGER, t.NumpySizes.SHORT), nt)
+        self.assertEqual(2, transform.decimals)
+        self.assertEqual(t.NumpyType(t.NumpyKinds.FLOAT, t.NumpySizes.DOUBLE), transform.float_type)
+        return
+
+    def test_rounding_negative_decimals(self):
+        arr, nt, transform = fc.float_rounding_compression(np.array([1234.0, 5678.9], dtype=np.float32), -2)
+        self.assertEqual([12, 57], arr.tolist())
+        self.assertEqual(t.NumpyType(t.NumpyKinds.FLOAT, t.NumpySizes.SINGLE), transform.float_type)
+        return
+
+    def test_rounding_invalid(self):
+        with self.assertRaises(ValueError):
+            fc.float_rounding_compression(np.array([1.0, np.nan]), 2)
+        with self.assertRaises(ValueError):
+            fc.float_rounding_compression(np.array([1e300]), 2)
+        with self.assertRaises(x.NumpyDtypeKindInvalidException):
+            fc.float_rounding_compression(np.array([1, 2]), 2)
+        return
+
+    def test_xor_delta_works(self):
+        arr, nt, transform = fc.float_xor_delta_compression(np.array([1.5, 1.5, 1.75]))
+        self.assertEqual(t.NumpyType(t.NumpyKinds.UNSIGNED, t.NumpySizes.DOUBLE), nt)
+        self.assertEqual(np.array([1.5]).view(np.uint64)[0], arr[0])
+        self.assertEqual(0, arr[1])
+        self.assertEqual(1 << 50, arr[2])
+        self.assertEqual(t.NumpyType(t.NumpyKinds.FLOAT, t.NumpySizes.DOUBLE), transform.float_type)
+        return
+
+    def test_combined_rounding(self):
+        original = measurement_array()
+        arr, nt, transforms = fc.combined_float_compression(original, decimals=2)
+        self.assertEqual(t.NumpySizes.BYTE, nt.size)
+        self.assertEqual(cd.FloatTransformTypes.ROUNDING, transforms[-1].transform_type)
+        self.assertTrue(np.array_equal(original, fd.float_decompression_from_transforms(arr, transforms)))
+        return
+
+    def test_combined_lossless(self):
+        for original in [measurement_array(), measurement_array().astype(np.float32), np.array([], dtype=np.float64)]:
+            arr, nt, transforms = fc.combined_float_compression(original)
+            self.assertEqual(cd.FloatTransformTypes.XOR_DELTA, transforms[-1].transform_type)
+            self.assertTrue(arr.nbytes <= original.nbytes)
+            decompressed = fd.float_decompression_from_transforms(arr, transforms)
+            self.assertEqual(original.dtype, decompressed.dtype)
+            self.assertTrue(np.array_equal(original, decompressed))
+        return
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,58 @@
+import unittest
+import numpy as np
+import fewerbytes.float_decompression as fd
+import fewerbytes.compression_details as cd
+import fewerbytes.types as t
+
+
+class TestFloatDecompression(unittest.TestCase):
+    def test_rounding_decompression(self):
+        arr = fd.float_rounding_decompression(
+            np.array([123, -50, 200], dtype=np.int16),
+            cd.FloatRoundingTransformation(2, t.NumpyType(t.NumpyKinds.FLOAT, t.NumpySizes.SINGLE))
+        )
+        self.assertEqual(np.float32, arr.dtype)
+        self.assertTrue(np.array_equal(np.array([1.23, -0.5, 2.0], dtype=np.float32), arr))
+        return
+
+    def test_xor_delta_decompression(self):
+        first = np.array([1.5]).view(np.uint64)[0]
+        arr = fd.float_xor_delta_decompression(
+            np.array([first, 0, 1 << 50], dtype=np.uint64),
+            cd.FloatXorDeltaTransformation(t.NumpyType(t.NumpyKinds.FLOAT, t.NumpySizes.DOUBLE))
+        )
+        self.assertEqual([1.5, 1.5, 1.75], arr.tolist())
+        return
+
+    def test_float_transform_list(self):
+        arr = fd.float_decompression_from_transforms(
+            np.array([1, 0, 1, 0], dtype=np.uint8),
+            [
+                cd.IntegerElementWiseTransformation(1000),
+                cd.FloatRoundingTransformation(1, t.NumpyType(t.NumpyKinds.FLOAT, t.NumpySizes.DOUBLE))
+            ]
+        )
+        self.assertEqual([100.0, 100.1, 100.1, 100.2, 100.2], arr.tolist())
+        return
+
+    def test_float_decompression_into_out(self):
+        double = t.NumpyType(t.NumpyKinds.FLOAT, t.NumpySizes.DOUBLE)
+        transforms = [cd.IntegerElementWiseTransformation(1000), cd.FloatRoundingTransformation(1, double)]
+        out = np.zeros(5)
+        self.assertIs(out, fd.float_decompression_from_transforms(
+            np.array([1, 0, 1, 0], dtype=np.uint8), transforms, out=out))
+        self.assertEqual([100.0, 100.1, 100.1, 100.2, 100.2], out.tolist())
+        arr = fd.float_decompression_from_transforms(np.array([1, 0, 1, 0], dtype=np.uint8), transforms,
+                                                     dtype=np.float32)
+        self.assertEqual(np.float32, arr.dtype)
+        first = np.float64(1.5).view(np.uint64)
+        xor_delta = [cd.FloatXorDeltaTransformation(double)]
+        for dtype in [np.float64, np.float32]:
+            out = np.zeros(3, dtype=dtype)
+            fd.float_decompression_from_transforms(np.array([first, 0, 1 << 50], dtype=np.uint64), xor_delta, out=out)
+            self.assertEqual([1.5, 1.5, 1.75], out.tolist())
+        return
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,7 +1,9 @@
 import unittest
 import numpy as np
+import fewerbytes.compression_details as cd
 import fewerbytes.exceptions as x
 import fewerbytes.integer_compression as ic
+import fewerbytes.integer_decompression as idc
 import fewerbytes.types as t
 
 
@@ -108,6 +110,19 @@ class TestIntegerCompression(unittest.TestCase):
         self.assertEqual(91000, transform.reference_value)
         return
 
+    def test_minimize_narrow_signed(self):
+        arr, nt, transform = ic.integer_minimize_compression(np.array([-100, 100, 5], dtype=np.int8))
+        self.assertEqual(np.uint8, arr.dtype)
+        self.assertEqual([0, 200, 105], arr.tolist())
+        self.assertEqual(-100, transform.reference_value)
+        return
+
+    def test_downcast_known_extremes(self):
+        arr, nt = ic.downcast_integers(np.array([3, 1000], dtype=np.int64), extremes=(3, 1000))
+        self.assertEqual(np.uint16, arr.dtype)
+        self.assertEqual(t.NumpyType(t.NumpyKinds.UNSIGNED, t.NumpySizes.SHORT), nt)
+        return
+
     def test_derivative_works(self):
         arr, nt, transform = ic.integer_derivative_compression(unsigned_byte_arr())
         self.assertEqual(9, len(arr))
@@ -144,6 +159,16 @@ class TestIntegerCompression(unittest.TestCase):
         self.assertEqual(2222222, transform.key_values[2])
         return
 
+    def test_integer_hash_keys_index_key_values(self):
+        rng = np.random.RandomState(0)
+        values = np.array([-70000, 5, 123456789, 2 ** 40], dtype=np.int64)
+        original = values[rng.randint(0, len(values), size=5000)]
+        arr, nt, transform = ic.integer_hash_compression(original)
+        self.assertEqual(t.NumpySizes.BYTE, nt.size)
+        self.assertEqual(original.shape, arr.shape)
+        self.assertTrue(np.array_equal(original, transform.key_values[arr]))
+        return
+
     def test_integer_hash_not_try_byte(self):
         arr, nt, transform = ic.integer_hash_compression(unsigned_byte_arr())
         self.assertEqual(None, transform)
@@ -161,5 +186,231 @@ class TestIntegerCompression(unittest.TestCase):
         self.assertEqual(None, transform)
         return
 
+    def test_derivative_unsigned_descending(self):
+        arr, nt, transform = ic.integer_derivative_compression(np.array([5, 3, 1], dtype=np.uint16))
+        self.assertEqual(t.NumpyKinds.INTEGER, nt.kind)
+        self.assertEqual(-2, arr[0])
+        return
+
+    def test_derivative_unsigned_above_int64(self):
+        original = np.array([0, 2 ** 64 - 1, 0, 2 ** 64 - 1, 5] * 400, dtype=np.uint64)
+        arr, nt, transform = ic.integer_derivative_compression(original)
+        self.assertEqual(t.NumpyKinds.UNSIGNED, transform.source_kind)
+        decompressed = idc.integer_derivative_decompression(arr, transform)
+        self.assertEqual(np.uint64, decompressed.dtype)
+        self.assertTrue(np.array_equal(original, decompressed))
+        rng = np.random.RandomState(0)
+        near_ends = np.where(rng.random_sample(5000) < 0.5, rng.randint(0, 5, size=5000).astype(np.uint64),
+                             np.uint64(2 ** 64 - 1) - rng.randint(0, 5, size=5000).astype(np.uint64))
+        near_ends[[10, 200]] = [2 ** 40, 2 ** 63]
+        for values in [original, near_ends]:
+            for bit_pack in [False, True]:
+                arr, nt, transforms = ic.combined_integer_compression(values, bit_pack=bit_pack)
+                decompressed = idc.integer_decompression_from_transforms(arr, transforms)
+                self.assertEqual(np.uint64, decompressed.dtype)
+                self.assertTrue(np.array_equal(values, decompressed))
+        return
+
+    def test_combined_compression_round_trip(self):
+        arrays = [
+            np.cumsum(np.random.RandomState(0).randint(0, 5, size=1000)) + 10 ** 9,
+            np.repeat(np.array([10 ** 9, 2 * 10 ** 9, 3 * 10 ** 9], dtype=np.uint32), 300),
+            np.arange(1000, 0, -3, dtype=np.uint16),
+            integer_descending_array()
+        ]
+        for original in arrays:
+            arr, nt, transforms = ic.combined_integer_compression(original)
+            self.assertTrue(nt.size.value <= t.NumpySizes.from_dtype(original.dtype).value)
+            self.assertNotIn(None, transforms)
+            self.assertTrue(np.array_equal(original, idc.integer_decompression_from_transforms(arr, transforms)))
+        return
+
+    def test_integer_bitpack_works(self):
+        arr, nt, transform = ic.integer_bitpack_compression(unsigned_byte_arr())
+        self.assertEqual(t.NumpyType(t.NumpyKinds.UNSIGNED, t.NumpySizes.BYTE), nt)
+        self.assertEqual(4, transform.bit_width)
+        self.assertEqual(10, transform.length)
+        self.assertEqual(5, len(arr))
+        return
+
+    def test_integer_bitpack_not_possible(self):
+        arr, nt, transform = ic.integer_bitpack_compression(integer_byte_arr())
+        self.assertEqual(None, transform)
+        arr, nt, transform = ic.integer_bitpack_compression(np.array([255, 0], dtype=np.uint8))
+        self.assertEqual(None, transform)
+        arr, nt, transform = ic.integer_bitpack_compression(np.array([], dtype=np.uint16))
+        self.assertEqual(None, transform)
+        return
+
+    def test_combined_compression_bit_pack(self):
+        original = np.cumsum(np.random.RandomState(0).randint(0, 4, size=1000)) + 10 ** 9
+        arr, nt, transforms = ic.combined_integer_compression(original, bit_pack=True)
+        self.assertEqual(t.NumpyType(t.NumpyKinds.UNSIGNED, t.NumpySizes.BYTE), nt)
+        self.assertEqual(2, transforms[0].bit_width)
+        self.assertEqual(250, len(arr))
+        self.assertTrue(np.array_equal(original, idc.integer_decompression_from_transforms(arr, transforms)))
+        return
+
+    def test_zigzag_works(self):
+        arr, nt, transform = ic.integer_zigzag_compression(np.array([0, -1, 1, -2, 2, -64, 63], dtype=np.int64))
+        self.assertEqual(t.NumpyType(t.NumpyKinds.UNSIGNED, t.NumpySizes.BYTE), nt)
+        self.assertEqual(cd.IntegerTransformTypes.ZIGZAG, transform.transform_type)
+        self.assertEqual([0, 1, 2, 3, 4, 127, 126], arr.tolist())
+        arr, nt, transform = ic.integer_zigzag_compression(np.array([-128, 127], dtype=np.int8))
+        self.assertEqual([255, 254], arr.tolist())
+        arr, nt, transform = ic.integer_zigzag_compression(np.array([0, 5], dtype=np.int16))
+        self.assertEqual(None, transform)
+        return
+
+    def test_combined_compression_bit_pack_zigzag(self):
+        original = np.cumsum(np.random.RandomState(0).randint(-5, 6, size=1000)) + 10 ** 9
+        arr, nt, transforms = ic.combined_integer_compression(original, bit_pack=True)
+        self.assertEqual([cd.IntegerTransformTypes.BIT_PACK, cd.IntegerTransformTypes.ZIGZAG,
+                          cd.IntegerTransformTypes.DERIVATIVE], [transform.transform_type for transform in transforms])
+        self.assertEqual(4, transforms[0].bit_width)
+        self.assertTrue(np.array_equal(original, idc.integer_decompression_from_transforms(arr, transforms)))
+        leaning = np.cumsum(np.random.RandomState(0).randint(-1, 15, size=1000))
+        arr, nt, transforms = ic.combined_integer_compression(leaning, bit_pack=True)
+        self.assertEqual(cd.IntegerTransformTypes.MINIMIZE, transforms[1].transform_type)
+        self.assertEqual(4, transforms[0].bit_width)
+        self.assertTrue(np.array_equal(leaning, idc.integer_decompression_from_transforms(arr, transforms)))
+        return
+
+    def test_patched_works(self):
+        original = 20000 + np.arange(1000) % 200
+        original[[10, 500]] = [-7, 2 ** 40]
+        arr, nt, transform = ic.integer_patched_compression(original)
+        self.assertEqual(t.NumpyType(t.NumpyKinds.UNSIGNED, t.NumpySizes.BYTE), nt)
+        self.assertEqual(cd.IntegerTransformTypes.PATCHED, transform.transform_type)
+        self.assertEqual(20000, transform.reference_value)
+        self.assertEqual([10, 490], transform.exception_gaps.tolist())
+        self.assertEqual([-7, 2 ** 40], transform.exception_values.tolist())
+        self.assertEqual([0, 0], arr[[10, 500]].tolist())
+        self.assertEqual(199, arr.max())
+        arr, nt, transform = ic.integer_patched_compression(original, bit_pack=True)
+        self.assertEqual(199, arr.max())
+        arr, nt, transform = ic.integer_patched_compression(np.arange(50))
+        self.assertEqual(None, transform)
+        arr, nt, transform = ic.integer_patched_compression(np.arange(1000, dtype=np.uint16))
+        self.assertEqual(None, transform)
+        return
+
+    def test_combined_compression_patched(self):
+        rng = np.random.RandomState(0)
+        original = 20000 + rng.randint(0, 200, size=10000)
+        original[rng.choice(10000, 20, replace=False)] = rng.randint(0, 2 ** 31, size=20)
+        for bit_pack in [False, True]:
+            arr, nt, transforms = ic.combined_integer_compression(original, bit_pack=bit_pack)
+            self.assertEqual(t.NumpyType(t.NumpyKinds.UNSIGNED, t.NumpySizes.BYTE), nt)
+            self.assertEqual(cd.IntegerTransformTypes.PATCHED, transforms[-1].transform_type)
+            self.assertEqual(20, len(transforms[-1].exception_values))
+            self.assertTrue(np.array_equal(original, idc.integer_decompression_from_transforms(arr, transforms)))
+        return
+
+    def test_entropy_works(self):
+        original = np.arange(10000, dtype=np.int64) % 100
+        arr, nt, transform = ic.integer_entropy_compression(original)
+        self.assertEqual(t.NumpyType(t.NumpyKinds.UNSIGNED, t.NumpySizes.BYTE), nt)
+        self.assertEqual(cd.IntegerTransformTypes.ENTROPY, transform.transform_type)
+        self.assertEqual(cd.EntropyCodecs.ZLIB, transform.codec)
+        self.assertEqual(6, transform.level)
+        self.assertEqual(t.NumpyType(t.NumpyKinds.INTEGER, t.NumpySizes.DOUBLE), transform.array_type)
+        self.assertEqual(10000, transform.length)
+        self.assertTrue(len(arr) < 0.8 * original.nbytes)
+        for codec in ['zlib', 'lzma', 'bz2']:
+            arr, nt, transform = ic.integer_entropy_compression(original, codec=codec, level=1)
+            self.assertEqual(cd.EntropyCodecs(codec), transform.codec)
+            self.assertTrue(np.array_equal(original, idc.integer_decompression_from_transforms(arr, [transform])))
+        random_bytes = np.random.RandomState(0).randint(0, 256, size=1000).astype(np.uint8)
+        arr, nt, transform = ic.integer_entropy_compression(random_bytes)
+        self.assertEqual(None, transform)
+        with self.assertRaises(ValueError):
+            ic.integer_entropy_compression(original, codec='zstd')
+        with self.assertRaises(ValueError):
+            ic.integer_entropy_compression(original, level=10)
+        with self.assertRaisesRegex(ValueError, 'bz2 level must be between 1 and 9'):
+            ic.integer_entropy_compression(original, codec='bz2', level=0)
+        with self.assertRaisesRegex(ValueError, 'bz2 level must be between 1 and 9'):
+            ic.combined_integer_compression(original, entropy='bz2', entropy_level=0)
+        arr, nt, transform = ic.integer_entropy_compression(original, codec='lzma', level=0)
+        self.assertEqual(0, transform.level)
+        return
+
+    def test_combined_compression_entropy(self):
+        rng = np.random.RandomState(0)
+        original = 20000 + np.cumsum(rng.randint(-3, 4, size=10000))
+        for bit_pack in [False, True]:
+            numeric_arr, _, _ = ic.combined_integer_compression(original, bit_pack=bit_pack)
+            arr, nt, transforms = ic.combined_integer_compression(original, bit_pack=bit_pack, entropy='bz2')
+            if transforms[0].transform_type == cd.IntegerTransformTypes.ENTROPY:
+                self.assertTrue(len(arr) < 0.8 * numeric_arr.nbytes)
+            self.assertTrue(np.array_equal(original, idc.integer_decompression_from_transforms(arr, transforms)))
+        arr, nt, transforms = ic.combined_integer_compression(original, entropy=cd.EntropyCodecs.LZMA)
+        self.assertEqual(cd.IntegerTransformTypes.ENTROPY, transforms[0].transform_type)
+        self.assertEqual(cd.IntegerTransformTypes.DERIVATIVE, transforms[-1].transform_type)
+        return
+
+    def test_sparse_works(self):
+        original = np.zeros(1000, dtype=np.int64)
+        original[[3, 4, 700]] = [-5, 2, 10 ** 6]
+        arr, nt, transform = ic.integer_sparse_compression(original)
+        self.assertEqual(t.NumpyType(t.NumpyKinds.INTEGER, t.NumpySizes.SINGLE), nt)
+        self.assertEqual([-5, 2, 10 ** 6], arr.tolist())
+        self.assertEqual([3, 1, 696], transform.gaps.tolist())
+        self.assertEqual(1000, transform.length)
+        arr, nt, transform = ic.integer_sparse_compression(np.arange(10, dtype=np.uint8))
+        self.assertEqual(None, transform)
+        return
+
+    def test_block_minimize_works(self):
+        original = np.concatenate([np.full(16, 10 ** 9), np.arange(16) - 10 ** 6, np.array([7, 8])])
+        arr, nt, transform = ic.integer_block_minimize_compression(original, block_size=16)
+        self.assertEqual(t.NumpyType(t.NumpyKinds.UNSIGNED, t.NumpySizes.BYTE), nt)
+        self.assertEqual(34, transform.length)
+        self.assertEqual([10 ** 9, -10 ** 6, 7], transform.reference_values.tolist())
+        self.assertEqual(t.NumpyType(t.NumpyKinds.INTEGER, t.NumpySizes.SINGLE), transform.reference_values_type)
+        self.assertEqual([0, 4, 1], transform.bit_widths.tolist())
+        self.assertEqual(8 + 2, len(arr))
+        self.assertTrue(np.array_equal(original, idc.integer_decompression_from_transform(arr, transform)))
+        return
+
+    def test_block_minimize_extremes(self):
+        original = np.array([-2 ** 63, 2 ** 63 - 1, 0, -1, 5, 6, 7, 8], dtype=np.int64)
+        arr, nt, transform = ic.integer_block_minimize_compression(original, block_size=8)
+        self.assertEqual([64], transform.bit_widths.tolist())
+        self.assertTrue(np.array_equal(original, idc.integer_decompression_from_transform(arr, transform)))
+        return
+
+    def test_block_minimize_invalid(self):
+        with self.assertRaises(ValueError):
+            ic.integer_block_minimize_compression(integer_descending_array(), block_size=12)
+        arr, nt, transform = ic.integer_block_minimize_compression(np.array([], dtype=np.int32))
+        self.assertEqual(None, transform)
+        return
+
+    def test_integer_run_length_works(self):
+        arr, nt, transform = ic.integer_run_length_compression(integer_hashable_array())
+        self.assertEqual([1000000, 1111111, 2222222], arr.tolist())
+        self.assertEqual(t.NumpyType(t.NumpyKinds.UNSIGNED, t.NumpySizes.SINGLE), nt)
+        self.assertEqual([5, 5, 5], transform.run_lengths.tolist())
+        self.assertEqual(t.NumpyType(t.NumpyKinds.UNSIGNED, t.NumpySizes.BYTE), transform.run_lengths_type)
+        return
+
+    def test_integer_run_length_not_worth_it(self):
+        arr, nt, transform = ic.integer_run_length_compression(integer_sequential_array())
+        self.assertEqual(None, transform)
+        arr, nt, transform = ic.integer_run_length_compression(np.array([], dtype=np.int16))
+        self.assertEqual(None, transform)
+        return
+
+    def test_combined_compression_run_length(self):
+        original = 1500000000 + 60 * np.arange(100000, dtype=np.int64)
+        original[50000:] += 7
+        arr, nt, transforms = ic.combined_integer_compression(original)
+        self.assertEqual([60, 67, 60], arr.tolist())
+        self.assertEqual(cd.IntegerTransformTypes.RUN_LENGTH, transforms[0].transform_type)
+        self.assertTrue(np.array_equal(original, idc.integer_decompression_from_transforms(arr, transforms)))
+        return
+
 if __name__ == '__main__':
     unittest.main()
@@ -1,8 +1,12 @@
 import unittest
+import bz2
+import lzma
+import zlib
 import numpy as np
 import fewerbytes.integer_decompression as id
 import fewerbytes.compression_details as cd
 import fewerbytes.types as t
+import fewerbytes.exceptions as x
 
 
 class TestIntegerDecompression(unittest.TestCase):
@@ -64,6 +68,33 @@ class TestIntegerDecompression(unittest.TestCase):
         self.validate_hash_decompression(arr)
         return
 
+    def test_hash_decompression_large(self):
+        keys = np.tile(np.array([2, 0, 1], dtype=np.uint8), 1000)
+        arr = id.integer_hash_decompression(
+            keys,
+            cd.IntegerHashTransformation(
+                key_values=np.array([0, -1000, 1000], dtype=np.int16),
+                key_value_type=t.NumpyType(t.NumpyKinds.INTEGER, t.NumpySizes.SHORT)
+            )
+        )
+        self.assertEqual(3000, len(arr))
+        self.assertTrue(np.array_equal(np.tile(np.array([1000, 0, -1000]), 1000), arr))
+        return
+
+    def test_hash_decompression_invalid_keys(self):
+        transform = cd.IntegerHashTransformation(
+            key_values=np.array([0, -1000, 1000], dtype=np.int16),
+            key_value_type=t.NumpyType(t.NumpyKinds.INTEGER, t.NumpySizes.SHORT)
+        )
+        for keys in [np.array([1, 3, 0], dtype=np.uint8), np.array([1, -1, 0], dtype=np.int8)]:
+            with self.assertRaises(x.InvalidCompressedFormatException):
+                id.integer_hash_decompression(keys, transform)
+            with self.assertRaises(x.InvalidCompressedFormatException):
+                id.integer_hash_decompression(keys, transform, out=np.zeros(3, dtype=np.int64))
+            with self.assertRaises(x.InvalidCompressedFormatException):
+                id.integer_decompression_from_transforms(keys, [transform, cd.IntegerElementWiseTransformation(5)])
+        return
+
     def test_integer_catch_all(self):
         arr = id.integer_decompression_from_transform(
             np.array([1, 2, 3, 4, 5], dtype=np.uint8),
@@ -87,6 +118,121 @@ class TestIntegerDecompression(unittest.TestCase):
         self.validate_hash_decompression(arr)
         return
 
+    def test_bitpack_decompression(self):
+        arr = id.integer_decompression_from_transform(
+            np.array([0b01101100], dtype=np.uint8),
+            cd.IntegerBitPackTransformation(2, 4)
+        )
+        self.assertTrue(np.array_equal(np.array([1, 2, 3, 0]), arr))
+        self.assertEqual(np.uint8, arr.dtype)
+        return
+
+    def test_block_minimize_decompression(self):
+        arr = id.integer_decompression_from_transform(
+            np.array([0b00011011], dtype=np.uint8),
+            cd.IntegerBlockMinimizeTransformation(
+                8, 10,
+                np.array([-1000, 1000], dtype=np.int16),
+                t.NumpyType(t.NumpyKinds.INTEGER, t.NumpySizes.SHORT),
+                np.array([0, 1], dtype=np.uint8)
+            )
+        )
+        self.assertEqual([-1000] * 8 + [1000, 1000], arr.tolist())
+        self.assertEqual(np.int16, arr.dtype)
+        return
+
+    def test_run_length_decompression(self):
+        arr = id.integer_decompression_from_transform(
+            np.array([7, -3, 7], dtype=np.int8),
+            cd.IntegerRunLengthTransformation(
+                np.array([2, 1, 3], dtype=np.uint8),
+                t.NumpyType(t.NumpyKinds.UNSIGNED, t.NumpySizes.BYTE)
+            )
+        )
+        self.assertEqual([7, 7, -3, 7, 7, 7], arr.tolist())
+        self.assertEqual(np.int8, arr.dtype)
+        return
+
+    def test_zigzag_decompression(self):
+        arr = id.integer_decompression_from_transform(
+            np.array([0, 1, 2, 3, 4, 255, 254], dtype=np.uint8),
+            cd.IntegerZigzagTransformation()
+        )
+        self.assertEqual([0, -1, 1, -2, 2, -128, 127], arr.tolist())
+        self.assertEqual(np.int8, arr.dtype)
+        out = np.zeros(3, dtype=np.int64)
+        id.integer_zigzag_decompression(np.array([2 ** 64 - 1, 2 ** 64 - 2, 7], dtype=np.uint64),
+                                        cd.IntegerZigzagTransformation(), out=out)
+        self.assertEqual([-2 ** 63, 2 ** 63 - 1, -4], out.tolist())
+        return
+
+    def test_patched_decompression(self):
+        transform = cd.IntegerPatchedTransformation(
+            np.int64(1000),
+            np.array([1, 2], dtype=np.uint8),
+            t.NumpyType(t.NumpyKinds.UNSIGNED, t.NumpySizes.BYTE),
+            np.array([-5, 100000], dtype=np.int32),
+            t.NumpyType(t.NumpyKinds.INTEGER, t.NumpySizes.SINGLE)
+        )
+        arr = np.array([3, 0, 7, 0, 255], dtype=np.uint8)
+        decompressed = id.integer_decompression_from_transform(arr, transform)
+        self.assertEqual([1003, -5, 1007, 100000, 1255], decompressed.tolist())
+        self.assertEqual(np.int32, decompressed.dtype)
+        out = np.zeros(6, dtype=np.int64)
+        id.integer_decompression_from_transforms(arr, [transform, cd.IntegerElementWiseTransformation(1)], out=out)
+        self.assertEqual([1, 1004, 999, 2006, 102006, 103261], out.tolist())
+        return
+
+    def test_entropy_decompression(self):
+        transform = cd.IntegerEntropyTransformation(cd.EntropyCodecs.ZLIB, 6,
+                                                    t.NumpyType(t.NumpyKinds.INTEGER, t.NumpySizes.SHORT), 4)
+        arr = np.frombuffer(zlib.compress(np.array([-3, 0, 5, 300], dtype='<i2').tobytes()), dtype=np.uint8)
+        decompressed = id.integer_decompression_from_transform(arr, transform)
+        self.assertEqual([-3, 0, 5, 300], decompressed.tolist())
+        self.assertEqual(np.int16, decompressed.dtype)
+        out = np.zeros(5, dtype=np.int64)
+        id.integer_decompression_from_transforms(arr, [transform, cd.IntegerElementWiseTransformation(10)], out=out)
+        self.assertEqual([10, 7, 7, 12, 312], out.tolist())
+        short_type = t.NumpyType(t.NumpyKinds.INTEGER, t.NumpySizes.SHORT)
+        for length in [0, 3, 5]:
+            with self.assertRaises(x.InvalidCompressedFormatException):
+                id.integer_decompression_from_transform(
+                    arr, cd.IntegerEntropyTransformation(cd.EntropyCodecs.ZLIB, 6, short_type, length))
+        return
+
+    def test_entropy_decompression_bounded(self):
+        short_type = t.NumpyType(t.NumpyKinds.INTEGER, t.NumpySizes.SHORT)
+        for codec, compress in [(cd.EntropyCodecs.ZLIB, zlib.compress), (cd.EntropyCodecs.LZMA, lzma.compress),
+                                (cd.EntropyCodecs.BZ2, bz2.compress)]:
+            # a stream inflating far beyond the expected length is rejected without decoding all of it
+            bomb = np.frombuffer(compress(bytes(2 ** 24)), dtype=np.uint8)
+            with self.assertRaises(x.InvalidCompressedFormatException):
+                id.integer_entropy_decompression(bomb, cd.IntegerEntropyTransformation(codec, 6, short_type, 4))
+            payload = compress(np.array([1, 2, 3, 4], dtype='<i2').tobytes())
+            transform = cd.IntegerEntropyTransformation(codec, 6, short_type, 4)
+            with self.assertRaises(x.InvalidCompressedFormatException):
+                id.integer_entropy_decompression(np.frombuffer(payload + b'\x00junk', dtype=np.uint8), transform)
+            with self.assertRaises(x.InvalidCompressedFormatException):
+                id.integer_entropy_decompression(np.frombuffer(payload[:-4], dtype=np.uint8), transform)
+            with self.assertRaises(x.InvalidCompressedFormatException):
+                id.integer_entropy_decompression(np.frombuffer(b'not a stream', dtype=np.uint8), transform)
+            self.assertEqual([1, 2, 3, 4], id.integer_entropy_decompression(
+                np.frombuffer(payload, dtype=np.uint8), transform).tolist())
+        return
+
+    def test_sparse_decompression(self):
+        arr = id.integer_decompression_from_transform(
+            np.array([-5, 2, 100], dtype=np.int8),
+            cd.IntegerSparseTransformation(
+                np.array([1, 1, 3], dtype=np.uint8),
+                t.NumpyType(t.NumpyKinds.UNSIGNED, t.NumpySizes.BYTE),
+                7
+            )
+        )
+        self.assertEqual([0, -5, 2, 0, 0, 100, 0], arr.tolist())
+        self.assertEqual(np.int8, arr.dtype)
+        return
+
     def test_integer_catch_all_fail(self):
         transform = cd.IntegerMinimizeTransformation(0)
         transform.transform_type = None
@@ -112,5 +258,103 @@ class TestIntegerDecompression(unittest.TestCase):
         self.assertEqual(1102, arr[4])
         return
 
+    def test_decompression_into_out(self):
+        cases = [
+            (np.array([1, 0, 255], dtype=np.uint8), cd.IntegerMinimizeTransformation(-200), [-199, -200, 55]),
+            (np.array([1, -3, 2], dtype=np.int8), cd.IntegerElementWiseTransformation(-100), [-100, -99, -102, -100]),
+            (np.array([2, 0, 1], dtype=np.uint8), cd.IntegerHashTransformation(
+                np.array([-1000, 0, 1000], dtype=np.int16), t.NumpyType(t.NumpyKinds.INTEGER, t.NumpySizes.SHORT)
+            ), [1000, -1000, 0]),
+            (np.array([-5, 120, 3], dtype=np.int8), cd.IntegerRunLengthTransformation(
+                np.array([2, 1, 3], dtype=np.uint8), t.NumpyType(t.NumpyKinds.UNSIGNED, t.NumpySizes.BYTE)
+            ), [-5, -5, 120, 3, 3, 3])
+        ]
+        for arr, transform, expected in cases:
+            for dtype in [np.int16, np.int64, np.float64]:
+                out = np.zeros(len(expected), dtype=dtype)
+                ret_array = id.integer_decompression_from_transform(arr, transform, out=out)
+                self.assertIs(out, ret_array)
+                self.assertEqual(expected, out.tolist())
+                ret_array = id.integer_decompression_from_transforms(arr, [transform], dtype=dtype)
+                self.assertEqual(np.dtype(dtype), ret_array.dtype)
+                self.assertEqual(expected, ret_array.tolist())
+        return
+
+    def test_decompression_into_narrow_out(self):
+        # the intermediate sums wrap around, the final values fit
+        out = np.zeros(4, dtype=np.int8)
+        id.integer_derivative_decompression(np.array([100, 100, -150], dtype=np.int16),
+                                            cd.IntegerElementWiseTransformation(-100), out=out)
+        self.assertEqual([-100, 0, 100, -50], out.tolist())
+        out = np.zeros(2, dtype=np.uint8)
+        id.integer_minimize_decompression(np.array([0, 1], dtype=np.uint8),
+                                          cd.IntegerMinimizeTransformation(254), out=out)
+        self.assertEqual([254, 255], out.tolist())
+        return
+
+    def test_decompression_into_out_shape(self):
+        with self.assertRaises(ValueError):
+            id.integer_minimize_decompression(np.array([1, 2], dtype=np.uint8),
+                                              cd.IntegerMinimizeTransformation(0), out=np.zeros(3))
+        with self.assertRaises(ValueError):
+            id.integer_derivative_decompression(np.array([1, 2], dtype=np.uint8),
+                                                cd.IntegerElementWiseTransformation(0), out=np.zeros(2))
+        return
+
+    def test_compile_fuses_minimize_and_derivative(self):
+        bit_pack = cd.IntegerBitPackTransformation(4, 3)
+        plan = id.compile_integer_decompression([
+            bit_pack,
+            cd.IntegerMinimizeTransformation(5),
+            cd.IntegerElementWiseTransformation(10),
+            cd.IntegerMinimizeTransformation(-3),
+            cd.IntegerElementWiseTransformation(100),
+        ])
+        self.assertEqual(1, len(plan.steps))
+        fused = plan.steps[0]
+        self.assertIs(bit_pack, fused.source)
+        self.assertEqual(5, fused.offset)
+        self.assertEqual([7, 100], fused.references)
+        self.assertEqual(4 + id.DOWNCAST_PASSES, plan.passes)
+        return
+
+    def test_fused_chains_match_stepwise(self):
+        hash_transform = cd.IntegerHashTransformation(
+            np.array([-1000, 0, 1000], dtype=np.int16), t.NumpyType(t.NumpyKinds.INTEGER, t.NumpySizes.SHORT))
+        run_length = cd.IntegerRunLengthTransformation(
+            np.array([2, 1, 3], dtype=np.uint8), t.NumpyType(t.NumpyKinds.UNSIGNED, t.NumpySizes.BYTE))
+        chains = [
+            (np.array([2, 0, 1], dtype=np.uint8), [hash_transform, cd.IntegerMinimizeTransformation(7),
+                                                   cd.IntegerElementWiseTransformation(-5)]),
+            (np.array([3, 0, 1], dtype=np.uint8), [run_length, cd.IntegerMinimizeTransformation(-2),
+                                                   cd.IntegerElementWiseTransformation(1),
+                                                   cd.IntegerElementWiseTransformation(2 ** 40)]),
+            (np.array([3, 2, 1], dtype=np.uint8), [cd.IntegerMinimizeTransformation(-3),
+                                                   cd.IntegerMinimizeTransformation(2), hash_transform]),
+        ]
+        for arr, transforms in chains:
+            expected = arr
+            for transform in transforms:
+                expected = id.integer_decompression_from_transform(expected, transform)
+            fused = id.integer_decompression_from_transforms(arr, transforms)
+            self.assertEqual(expected.dtype, fused.dtype)
+            self.assertEqual(expected.tolist(), fused.tolist())
+            out = np.zeros(len(expected), dtype=np.int64)
+            id.integer_decompression_from_transforms(arr, transforms, out=out)
+            self.assertEqual(expected.tolist(), out.tolist())
+        return
+
+    def test_logging_is_lazy(self):
+        class UnprintableHash(cd.IntegerHashTransformation):
+            def __repr__(self):
+                raise AssertionError('transform formatted while debug logging is disabled')
+
+        transform = UnprintableHash(np.array([-1000, 0, 1000], dtype=np.int16),
+                                    t.NumpyType(t.NumpyKinds.INTEGER, t.NumpySizes.SHORT))
+        arr = id.integer_decompression_from_transforms(np.array([2, 0], dtype=np.uint8), [transform])
+        self.assertEqual([1000, -1000], arr.tolist())
+        return
+
+
 if __name__ == '__main__':
     unittest.main()
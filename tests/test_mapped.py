@@ -0,0 +1,104 @@
+import os
+import tempfile
+import unittest
+import numpy as np
+import fewerbytes.aggregates as ag
+import fewerbytes.chunked as ch
+import fewerbytes.exceptions as x
+import fewerbytes.integer_compression as ic
+import fewerbytes.integer_decompression as idc
+import fewerbytes.mapped as m
+import fewerbytes.serialization as s
+
+
+class TestMapped(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'column.fwbc')
+        return
+
+    def tearDown(self):
+        self.directory.cleanup()
+        return
+
+    def write_chunked(self, original: np.array, **kwargs) -> m.MappedCompressedArray:
+        with open(self.path, 'wb') as fh:
+            m.dump_chunked(ch.chunked_integer_compression(original, **kwargs), fh)
+        return m.open_chunked(self.path)
+
+    def test_round_trip(self):
+        original = np.cumsum(np.random.RandomState(0).randint(-50, 50, size=100003)) + 10 ** 10
+        for bit_pack in [False, True]:
+            mapped = self.write_chunked(original, chunk_size=7000, bit_pack=bit_pack)
+            self.assertEqual(len(original), len(mapped))
+            self.assertEqual(15, len(mapped.chunks))
+            self.assertTrue(np.array_equal(original, ch.chunked_integer_decompression(mapped)))
+            self.assertEqual(original.sum(), ag.chunked_aggregate(mapped, 'sum'))
+        return
+
+    def test_random_access(self):
+        original = np.arange(50000) * 3 - 7
+        mapped = self.write_chunked(original, chunk_size=1000)
+        self.assertEqual(original[31234], mapped[31234])
+        self.assertEqual(original[-1], mapped[-1])
+        self.assertTrue(np.array_equal(original[2500:4700:3], mapped[2500:4700:3]))
+        chunk = mapped.chunks[-1]
+        self.assertEqual(1000, chunk.length)
+        self.assertIsInstance(mapped.buffer, np.memmap)
+        self.assertFalse(chunk.array.flags.writeable)
+        with self.assertRaises(IndexError):
+            mapped.chunks[50]
+        return
+
+    def test_after_prefix(self):
+        original = np.arange(30000) * 7 - 11
+        chunked = ch.chunked_integer_compression(original, chunk_size=4000)
+        arr, _, transforms = ic.combined_integer_compression(original[:100])
+        with open(self.path, 'wb') as fh:
+            fh.write(b'header of another format')
+            s.dump(arr, transforms, fh)
+            offset = fh.tell()
+            m.dump_chunked(chunked, fh)
+        mapped = m.open_chunked(self.path, offset)
+        self.assertEqual(len(original), len(mapped))
+        self.assertEqual(original[12345], mapped[12345])
+        self.assertTrue(np.array_equal(original, ch.chunked_integer_decompression(mapped)))
+        mapped_arr, mapped_transforms = m.load_mapped(self.path, len(b'header of another format'))
+        self.assertTrue(np.array_equal(original[:100], idc.integer_decompression_from_transforms(
+            mapped_arr, mapped_transforms)))
+        with self.assertRaises(x.InvalidCompressedFormatException):
+            m.open_chunked(self.path)
+        return
+
+    def test_empty(self):
+        mapped = self.write_chunked(np.array([], dtype=np.int64))
+        self.assertEqual(0, len(mapped))
+        self.assertEqual(0, len(mapped.chunks))
+        return
+
+    def test_invalid(self):
+        with open(self.path, 'wb') as fh:
+            s.dump(np.arange(10, dtype=np.uint8), [], fh)
+        with self.assertRaises(x.InvalidCompressedFormatException):
+            m.open_chunked(self.path)
+        self.write_chunked(np.arange(100))
+        with open(self.path, 'r+b') as fh:
+            fh.truncate(os.path.getsize(self.path) - 1)
+        with self.assertRaises(x.InvalidCompressedFormatException):
+            m.open_chunked(self.path)
+        return
+
+    def test_load_mapped(self):
+        original = np.cumsum(np.random.RandomState(0).randint(-5, 5, size=1000))
+        arr, _, transforms = ic.combined_integer_compression(original)
+        with open(self.path, 'wb') as fh:
+            s.dump(arr, transforms, fh)
+        mapped_arr, mapped_transforms = m.load_mapped(self.path)
+        self.assertTrue(np.array_equal(arr, mapped_arr))
+        self.assertTrue(np.array_equal(original, idc.integer_decompression_from_transforms(
+            mapped_arr, mapped_transforms)))
+        return
+
+
+if __name__ == '__main__':
+    unittest.main()
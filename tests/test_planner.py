@@ -0,0 +1,92 @@
+import unittest
+import numpy as np
+import fewerbytes.compression_details as cd
+import fewerbytes.integer_decompression as idc
+import fewerbytes.planner as p
+
+
+def timestamp_array():
+    return 1500000000 + 60 * np.arange(10000, dtype=np.int64) + np.random.RandomState(0).randint(0, 3, size=10000)
+
+
+def low_cardinality_array():
+    return np.random.RandomState(0).choice(np.array([10 ** 9, 2 * 10 ** 9, 3 * 10 ** 9, 7]), size=10000)
+
+
+class TestPlanner(unittest.TestCase):
+    def test_statistics(self):
+        stats = p.IntegerStatistics.from_array(np.array([1000, 5000, 1000, 3000], dtype=np.int32))
+        self.assertEqual(4, stats.length)
+        self.assertEqual(1000, stats.minimum)
+        self.assertEqual(5000, stats.maximum)
+        self.assertEqual(3, stats.distinct)
+        self.assertTrue('distinct=' in '{}'.format(stats))
+        # values fitting a byte cannot be hashed, so their distinct values are not counted
+        self.assertEqual(None, p.IntegerStatistics.from_array(np.array([1, 2, 2], dtype=np.int64)).distinct)
+        return
+
+    def test_estimate_distinct_sampled(self):
+        arr = low_cardinality_array()
+        self.assertEqual(4, p.estimate_distinct(arr, int(arr.min()), int(arr.max())))
+        arr = np.random.RandomState(0).randint(0, 2 ** 40, size=100000)
+        estimate = p.estimate_distinct(arr, int(arr.min()), int(arr.max()))
+        self.assertTrue(estimate > 90000)
+        return
+
+    def test_estimate_distinct_wide_span(self):
+        arr = np.random.RandomState(0).randint(-30000, 30000, size=20000).astype(np.int16)
+        self.assertEqual(len(np.unique(arr)), p.estimate_distinct(arr, int(arr.min()), int(arr.max())))
+        plan = p.plan_integer_compression(arr)
+        compressed, _, transforms = p.planned_integer_compression(arr)
+        self.assertTrue(plan.predicted_bytes > 0)
+        self.assertTrue(np.array_equal(arr, idc.integer_decompression_from_transforms(compressed, transforms)))
+        return
+
+    def test_collect_statistics(self):
+        statistics = p.collect_statistics(timestamp_array())
+        self.assertEqual(2, len(statistics))
+        self.assertEqual(9999, statistics[1].length)
+        self.assertEqual(58, statistics[1].minimum)
+        self.assertEqual(62, statistics[1].maximum)
+        self.assertEqual(4, len(p.collect_statistics(timestamp_array(), bit_pack=True)))
+        return
+
+    def test_plan_timestamps(self):
+        plan = p.plan_integer_compression(timestamp_array())
+        self.assertEqual([cd.IntegerTransformTypes.DERIVATIVE], plan.chain)
+        self.assertEqual(9999, plan.predicted_bytes)
+        plan = p.plan_integer_compression(timestamp_array(), bit_pack=True)
+        self.assertEqual([cd.IntegerTransformTypes.DERIVATIVE, cd.IntegerTransformTypes.MINIMIZE,
+                          cd.IntegerTransformTypes.BIT_PACK], plan.chain)
+        self.assertEqual(3750, plan.predicted_bytes)
+        return
+
+    def test_plan_hash(self):
+        plan = p.plan_integer_compression(low_cardinality_array())
+        self.assertEqual([cd.IntegerTransformTypes.HASH], plan.chain)
+        return
+
+    def test_planned_round_trip(self):
+        arrays = [
+            timestamp_array(),
+            low_cardinality_array(),
+            np.cumsum(np.cumsum(np.random.RandomState(0).randint(-3, 4, size=10000))),
+            np.random.RandomState(0).randint(0, 2 ** 40, size=1000),
+            np.array([5], dtype=np.uint16),
+            np.array([], dtype=np.int64)
+        ]
+        for original in arrays:
+            for bit_pack in [False, True]:
+                arr, nt, transforms = p.planned_integer_compression(original, bit_pack=bit_pack)
+                self.assertTrue(arr.nbytes <= original.nbytes)
+                self.assertTrue(np.array_equal(original, idc.integer_decompression_from_transforms(arr, transforms)))
+        return
+
+    def test_execute_invalid(self):
+        with self.assertRaises(ValueError):
+            p.execute_plan(timestamp_array(), [cd.IntegerTransformTypes.BLOCK_MINIMIZE])
+        return
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,91 @@
+import unittest
+import numpy as np
+import fewerbytes.chunked as ch
+import fewerbytes.compression_details as cd
+import fewerbytes.float_compression as fc
+import fewerbytes.integer_compression as ic
+import fewerbytes.predicates as p
+import fewerbytes.types as t
+from tests.test_aggregates import aggregate_arrays
+
+
+def expected_mask(arr: np.array, predicate: p.Predicate) -> np.array:
+    if predicate.predicate_type == p.Predicates.BETWEEN:
+        low, high = predicate.values
+        mask = np.ones(len(arr), dtype=bool)
+        if low is not None:
+            mask &= arr >= low
+        if high is not None:
+            mask &= arr <= high
+        return mask
+    return np.isin(arr, [v for v in predicate.values if abs(v) < 2 ** 63])
+
+
+def predicates_for(arr: np.array) -> list:
+    return [
+        p.Predicate.equal(arr[len(arr) // 3]),
+        p.Predicate.isin([arr[0], arr[-1], -3, 2 ** 70]),
+        p.Predicate.between(arr[0], arr[-1]),
+        p.Predicate.between(None, np.median(arr)),
+        p.Predicate.between(10 ** 9 + 0.5, None),
+        p.Predicate.equal(2.5)
+    ]
+
+
+class TestPredicates(unittest.TestCase):
+    def test_combined_predicates(self):
+        for original in aggregate_arrays():
+            for bit_pack in [False, True]:
+                arr, _, transforms = ic.combined_integer_compression(original, bit_pack=bit_pack)
+                for predicate in predicates_for(original):
+                    self.assertTrue(np.array_equal(expected_mask(original, predicate),
+                                                   p.compressed_mask(arr, transforms, predicate)),
+                                    msg='{} through {}'.format(predicate, transforms))
+        return
+
+    def test_minimize_shifts_predicate(self):
+        arr = np.array([0, 1, 2, 3, 255], dtype=np.uint8)
+        transforms = [cd.IntegerMinimizeTransformation(-1000)]
+        self.assertEqual([1, 2], p.compressed_where(arr, transforms, p.Predicate.between(-999, -997.5)).tolist())
+        self.assertEqual([4], p.compressed_where(arr, transforms, p.Predicate.equal(-745)).tolist())
+        self.assertEqual([], p.compressed_where(arr, transforms, p.Predicate.equal(0)).tolist())
+        return
+
+    def test_hash_translates_to_keys(self):
+        arr = np.array([2, 0, 1, 1], dtype=np.uint8)
+        transforms = [cd.IntegerHashTransformation(
+            np.array([-1000, 0, 1000], dtype=np.int16),
+            t.NumpyType(t.NumpyKinds.INTEGER, t.NumpySizes.SHORT)
+        )]
+        self.assertEqual([0, 2, 3], p.compressed_where(arr, transforms, p.Predicate.between(0, None)).tolist())
+        self.assertEqual([], p.compressed_where(arr, transforms, p.Predicate.equal(5)).tolist())
+        return
+
+    def test_float_predicates(self):
+        original = np.round(20 + np.cumsum(np.random.RandomState(0).normal(0, 0.05, size=1000)), 2)
+        for decimals in [2, None]:
+            arr, _, transforms = fc.combined_float_compression(original, decimals)
+            for predicate in [p.Predicate.equal(original[5]), p.Predicate.isin([original[9], 1.234]),
+                              p.Predicate.between(20.5, 21.0), p.Predicate.between(original[7], original[7])]:
+                self.assertTrue(np.array_equal(expected_mask(original, predicate),
+                                               p.compressed_mask(arr, transforms, predicate)))
+        return
+
+    def test_chunked_predicates(self):
+        original = aggregate_arrays()[0]
+        chunked = ch.chunked_integer_compression(original, chunk_size=7000)
+        predicate = p.Predicate.between(original[100], None)
+        self.assertTrue(np.array_equal(expected_mask(original, predicate), p.chunked_mask(chunked, predicate)))
+        self.assertTrue(np.array_equal(np.flatnonzero(original >= original[100]),
+                                       p.chunked_where(chunked, predicate)))
+        return
+
+    def test_empty(self):
+        self.assertEqual(0, len(p.compressed_mask(np.array([], dtype=np.uint8), [], p.Predicate.equal(1))))
+        chunked = ch.chunked_integer_compression(np.array([], dtype=np.int64))
+        self.assertEqual(0, len(p.chunked_where(chunked, p.Predicate.equal(1))))
+        return
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,31 @@
+import unittest
+import numpy as np
+import fewerbytes.reductions as r
+
+
+class TestReductions(unittest.TestCase):
+    def test_min_max(self):
+        rng = np.random.RandomState(0)
+        for dtype in [np.uint8, np.int16, np.int64, np.uint64]:
+            info = np.iinfo(dtype)
+            arr = rng.randint(0, 100, size=3 * r.MIN_MAX_CHUNK_BYTES + 5).astype(dtype)
+            arr[-1] = info.max
+            arr[len(arr) // 2] = info.min
+            self.assertEqual((int(info.min), int(info.max)), r.min_max(arr))
+            self.assertEqual((int(arr[:10].min()), int(arr[:10].max())), r.min_max(arr[:10]))
+        return
+
+    def test_min_max_python_integers(self):
+        minimum, maximum = r.min_max(np.array([2 ** 64 - 1, 3], dtype=np.uint64))
+        self.assertIsInstance(maximum, int)
+        self.assertEqual((3, 2 ** 64 - 1), (minimum, maximum))
+        return
+
+    def test_min_max_empty(self):
+        with self.assertRaises(ValueError):
+            r.min_max(np.array([], dtype=np.int64))
+        return
+
+
+if __name__ == '__main__':
+    unittest.main()
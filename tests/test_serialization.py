@@ -0,0 +1,198 @@
+import io
+import unittest
+import numpy as np
+import fewerbytes.compression_details as cd
+import fewerbytes.dictionaries as d
+import fewerbytes.elias_fano as ef
+import fewerbytes.exceptions as x
+import fewerbytes.float_compression as fc
+import fewerbytes.float_decompression as fd
+import fewerbytes.integer_compression as ic
+import fewerbytes.integer_decompression as idc
+import fewerbytes.serialization as s
+import fewerbytes.types as t
+
+
+def hash_transforms():
+    return [
+        cd.IntegerHashTransformation(
+            np.array([-1000, 0, 1000], dtype=np.int16),
+            t.NumpyType(t.NumpyKinds.INTEGER, t.NumpySizes.SHORT)
+        ),
+        cd.IntegerElementWiseTransformation(np.int64(-5)),
+        cd.IntegerMinimizeTransformation(np.uint64(2 ** 63 + 1))
+    ]
+
+
+class TestSerialization(unittest.TestCase):
+    def validate_transforms(self, transforms: list):
+        self.assertEqual(3, len(transforms))
+        self.assertEqual(cd.IntegerTransformTypes.HASH, transforms[0].transform_type)
+        self.assertEqual(t.NumpyType(t.NumpyKinds.INTEGER, t.NumpySizes.SHORT), transforms[0].key_values_type)
+        self.assertTrue(np.array_equal(np.array([-1000, 0, 1000]), transforms[0].key_values))
+        self.assertEqual(cd.IntegerTransformTypes.DERIVATIVE, transforms[1].transform_type)
+        self.assertEqual(-5, transforms[1].reference_value)
+        self.assertEqual(cd.IntegerTransformTypes.MINIMIZE, transforms[2].transform_type)
+        self.assertEqual(2 ** 63 + 1, transforms[2].reference_value)
+        return
+
+    def test_dumps_loads(self):
+        arr = np.array([0, 2, 1, 1], dtype=np.uint8)
+        data = s.dumps(arr, hash_transforms())
+        self.assertTrue(data.startswith(s.MAGIC))
+        new_arr, transforms = s.loads(data)
+        self.assertEqual(np.uint8, new_arr.dtype)
+        self.assertTrue(np.array_equal(arr, new_arr))
+        self.validate_transforms(transforms)
+        return
+
+    def test_dump_load(self):
+        arr = np.arange(-300, 300, dtype=np.int16)
+        fh = io.BytesIO()
+        s.dump(arr, hash_transforms(), fh)
+        fh.seek(0)
+        new_arr, transforms = s.load(fh)
+        self.assertEqual(np.int16, new_arr.dtype)
+        self.assertTrue(np.array_equal(arr, new_arr))
+        self.validate_transforms(transforms)
+        return
+
+    def test_big_endian_payload(self):
+        arr = np.arange(10, dtype='>u4')
+        new_arr, transforms = s.loads(s.dumps(arr, []))
+        self.assertEqual([], transforms)
+        self.assertTrue(np.array_equal(arr, new_arr))
+        return
+
+    def test_combined_round_trip(self):
+        original = np.cumsum(np.random.RandomState(0).randint(0, 5, size=1000)) + 10 ** 9
+        arr, _, transforms = ic.combined_integer_compression(original)
+        new_arr, new_transforms = s.loads(s.dumps(arr, transforms))
+        self.assertTrue(np.array_equal(original, idc.integer_decompression_from_transforms(new_arr, new_transforms)))
+        return
+
+    def test_derivative_source_kind(self):
+        original = np.array([0, 2 ** 64 - 1, 0, 2 ** 64 - 1, 5] * 400, dtype=np.uint64)
+        arr, _, transforms = ic.combined_integer_compression(original)
+        new_arr, new_transforms = s.loads(s.dumps(arr, transforms))
+        self.assertEqual(t.NumpyKinds.UNSIGNED, new_transforms[-1].source_kind)
+        self.assertTrue(np.array_equal(original, idc.integer_decompression_from_transforms(new_arr, new_transforms)))
+        # derivatives written without their source kind still load
+        self.assertEqual(None, s.loads(s.dumps(arr, [cd.IntegerElementWiseTransformation(3)]))[1][0].source_kind)
+        return
+
+    def test_bit_pack_transform(self):
+        arr, transforms = s.loads(s.dumps(np.array([0b01101100], dtype=np.uint8),
+                                          [cd.IntegerBitPackTransformation(2, 4)]))
+        self.assertEqual(2, transforms[0].bit_width)
+        self.assertEqual(4, transforms[0].length)
+        self.assertTrue(np.array_equal(np.array([1, 2, 3, 0]), idc.integer_decompression_from_transforms(
+            arr, transforms)))
+        return
+
+    def test_block_minimize_transform(self):
+        original = np.concatenate([np.arange(100), np.arange(100) * 1000 - 10 ** 8])
+        arr, _, transform = ic.integer_block_minimize_compression(original, block_size=64)
+        new_arr, transforms = s.loads(s.dumps(arr, [transform]))
+        self.assertEqual(64, transforms[0].block_size)
+        self.assertEqual(200, transforms[0].length)
+        self.assertTrue(np.array_equal(transform.bit_widths, transforms[0].bit_widths))
+        self.assertTrue(np.array_equal(original, idc.integer_decompression_from_transforms(new_arr, transforms)))
+        return
+
+    def test_float_transforms(self):
+        original = np.round(np.cumsum(np.random.RandomState(0).normal(0, 0.05, size=1000)), 2)
+        for decimals in [2, None]:
+            arr, _, transforms = fc.combined_float_compression(original, decimals)
+            new_arr, new_transforms = s.loads(s.dumps(arr, transforms))
+            self.assertTrue(np.array_equal(original, fd.float_decompression_from_transforms(new_arr, new_transforms)))
+        return
+
+    def test_run_length_transform(self):
+        original = np.repeat(np.array([5, 10 ** 9, 3]), [1000, 2000, 5])
+        arr, _, transforms = ic.combined_integer_compression(original)
+        self.assertEqual(cd.IntegerTransformTypes.RUN_LENGTH, transforms[0].transform_type)
+        new_arr, new_transforms = s.loads(s.dumps(arr, transforms))
+        self.assertTrue(np.array_equal(transforms[0].run_lengths, new_transforms[0].run_lengths))
+        self.assertTrue(np.array_equal(original, idc.integer_decompression_from_transforms(new_arr, new_transforms)))
+        return
+
+    def test_zigzag_transform(self):
+        original = np.cumsum(np.random.RandomState(0).randint(-5, 6, size=1000))
+        arr, _, transforms = ic.combined_integer_compression(original, bit_pack=True)
+        self.assertEqual(cd.IntegerTransformTypes.ZIGZAG, transforms[1].transform_type)
+        new_arr, new_transforms = s.loads(s.dumps(arr, transforms))
+        self.assertEqual(cd.IntegerTransformTypes.ZIGZAG, new_transforms[1].transform_type)
+        self.assertTrue(np.array_equal(original, idc.integer_decompression_from_transforms(new_arr, new_transforms)))
+        return
+
+    def test_patched_transform(self):
+        original = np.random.RandomState(0).randint(0, 100, size=1000) - 2 ** 40
+        original[[3, 999]] = [2 ** 62, -2 ** 63]
+        arr, _, transforms = ic.combined_integer_compression(original, bit_pack=True)
+        self.assertEqual(cd.IntegerTransformTypes.PATCHED, transforms[1].transform_type)
+        new_arr, new_transforms = s.loads(s.dumps(arr, transforms))
+        self.assertEqual([2 ** 62, -2 ** 63], new_transforms[1].exception_values.tolist())
+        self.assertTrue(np.array_equal(original, idc.integer_decompression_from_transforms(new_arr, new_transforms)))
+        return
+
+    def test_entropy_transform(self):
+        original = 20000 + np.cumsum(np.random.RandomState(0).randint(-3, 4, size=1000))
+        arr, _, transforms = ic.combined_integer_compression(original, entropy='lzma', entropy_level=9)
+        self.assertEqual(cd.IntegerTransformTypes.ENTROPY, transforms[0].transform_type)
+        new_arr, new_transforms = s.loads(s.dumps(arr, transforms))
+        self.assertEqual(cd.EntropyCodecs.LZMA, new_transforms[0].codec)
+        self.assertEqual(9, new_transforms[0].level)
+        self.assertEqual(transforms[0].array_type, new_transforms[0].array_type)
+        self.assertTrue(np.array_equal(original, idc.integer_decompression_from_transforms(new_arr, new_transforms)))
+        return
+
+    def test_elias_fano_transform(self):
+        original = np.cumsum(np.random.RandomState(0).randint(0, 100, size=1000)) - 2 ** 40
+        arr, _, transform = ef.integer_elias_fano_compression(original)
+        new_arr, new_transforms = s.loads(s.dumps(arr, [transform]))
+        self.assertEqual(transform.low_bits, new_transforms[0].low_bits)
+        self.assertTrue(np.array_equal(transform.rank_samples, new_transforms[0].rank_samples))
+        self.assertTrue(np.array_equal(original, idc.integer_decompression_from_transforms(new_arr, new_transforms)))
+        self.assertEqual(original[700], ef.compressed_select(new_arr, new_transforms, 700))
+        return
+
+    def test_dictionary(self):
+        dictionary = d.HashDictionary(np.array([500, 200, -404]), dictionary_id=2 ** 64 - 1)
+        original = np.array([200, 200, -404, 500, 200])
+        keys, _, transform = d.integer_dictionary_compression(original, dictionary)
+        data = s.dumps(keys, [transform])
+        new_keys, new_transforms = s.loads(data)
+        self.assertEqual(2 ** 64 - 1, new_transforms[0].dictionary_id)
+        self.assertEqual(3, new_transforms[0].num_keys)
+        new_dictionary = s.loads_dictionary(s.dumps_dictionary(dictionary))
+        self.assertEqual([500, 200, -404], new_dictionary.key_values.tolist())
+        with self.assertRaises(x.UnknownDictionaryException):
+            d.get_dictionary(2 ** 64 - 1)
+        self.assertTrue(np.array_equal(original, idc.integer_decompression_from_transforms(
+            new_keys, new_transforms, dictionaries={new_dictionary.dictionary_id: new_dictionary})))
+        registered = s.loads_dictionary(s.dumps_dictionary(dictionary), register=True)
+        try:
+            self.assertIs(registered, d.get_dictionary(2 ** 64 - 1))
+            self.assertTrue(np.array_equal(original, idc.integer_decompression_from_transforms(new_keys,
+                                                                                                new_transforms)))
+        finally:
+            d.unregister_dictionary(2 ** 64 - 1)
+        with self.assertRaises(x.InvalidCompressedFormatException):
+            s.loads_dictionary(b'FWBY' + bytes(8))
+        return
+
+    def test_invalid_data(self):
+        with self.assertRaises(x.InvalidCompressedFormatException):
+            s.loads(b'FWB')
+        with self.assertRaises(x.InvalidCompressedFormatException):
+            s.loads(b'NOPE' + s.dumps(np.zeros(3, dtype=np.uint8), [])[4:])
+        with self.assertRaises(x.InvalidCompressedFormatException):
+            s.loads(s.dumps(np.zeros(3, dtype=np.uint16), [])[:-1])
+        with self.assertRaises(x.InvalidCompressedFormatException):
+            s.load(io.BytesIO(s.dumps(np.zeros(3, dtype=np.uint16), [])[:-1]))
+        return
+
+
+if __name__ == '__main__':
+    unittest.main()
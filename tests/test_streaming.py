@@ -0,0 +1,46 @@
+import unittest
+import numpy as np
+import fewerbytes.streaming as st
+
+
+def timestamp_batches():
+    timestamps = 1500000000 + 60 * np.arange(1000, dtype=np.int64)
+    return [timestamps[start:start + 64] for start in range(0, 1000, 64)]
+
+
+class TestStreaming(unittest.TestCase):
+    def test_stream_round_trip(self):
+        batches = timestamp_batches()
+        compressor = st.StreamCompressor()
+        frames = list(compressor.compress_stream(iter(batches)))
+        self.assertEqual(len(batches), len(frames))
+        self.assertFalse(frames[0].leading_reference)
+        self.assertTrue(frames[1].leading_reference)
+        # the derivative continues across batches, so every frame after the first is a single byte per value
+        self.assertEqual(np.uint8, frames[1].array.dtype)
+        self.assertEqual(64, frames[1].length)
+        decompressed = list(st.StreamDecompressor().decompress_stream(iter(frames)))
+        self.assertEqual(len(batches), len(decompressed))
+        for batch, arr in zip(batches, decompressed):
+            self.assertTrue(np.array_equal(batch, arr))
+        return
+
+    def test_stream_single_values_and_empty(self):
+        compressor = st.StreamCompressor(bit_pack=True)
+        self.assertEqual(None, compressor.compress(np.array([], dtype=np.int32)))
+        frames = [compressor.compress(np.array([v], dtype=np.uint16)) for v in [5, 3, 40000]]
+        decompressor = st.StreamDecompressor()
+        self.assertEqual([5, 3, 40000], [decompressor.decompress(f)[0] for f in frames])
+        return
+
+    def test_stream_missing_frame(self):
+        frames = list(st.StreamCompressor().compress_stream(timestamp_batches()))
+        decompressor = st.StreamDecompressor()
+        decompressor.decompress(frames[0])
+        with self.assertRaises(ValueError):
+            decompressor.decompress(frames[2])
+        return
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,89 @@
+import unittest
+import numpy as np
+import fewerbytes.compression_details as cd
+import fewerbytes.integer_decompression as idc
+import fewerbytes.serialization as s
+import fewerbytes.timestamps as ts
+
+
+def transform_types(transforms: list) -> list:
+    return [transform.transform_type for transform in transforms]
+
+
+def counts(arr: np.array) -> np.array:
+    """
+    NaT never equals itself, datetimes are compared through their counts
+    """
+    return arr.view(np.int64) if arr.dtype.kind in 'Mm' else arr
+
+
+class TestTimestamps(unittest.TestCase):
+    def validate_round_trip(self, original: np.array, arr: np.array, transforms: list):
+        decompressed = idc.integer_decompression_from_transforms(arr, transforms)
+        self.assertEqual(original.dtype.kind in 'Mm', decompressed.dtype == original.dtype)
+        self.assertTrue(np.array_equal(counts(original), counts(decompressed)))
+        new_arr, new_transforms = s.loads(s.dumps(arr, transforms))
+        self.assertTrue(np.array_equal(counts(original), counts(
+            idc.integer_decompression_from_transforms(new_arr, new_transforms))))
+        return
+
+    def test_regular_timestamps(self):
+        original = 1500000000 + 60 * np.arange(10000)
+        original[[100, 5000]] += 7
+        arr, _, transforms = ts.timestamp_compression(original)
+        self.assertEqual([cd.IntegerTransformTypes.SPARSE, cd.IntegerTransformTypes.ZIGZAG,
+                          cd.IntegerTransformTypes.DERIVATIVE, cd.IntegerTransformTypes.DERIVATIVE],
+                         transform_types(transforms))
+        self.assertEqual(6, len(arr))
+        self.assertEqual(1500000000, transforms[3].reference_value)
+        self.assertEqual(60, transforms[2].reference_value)
+        self.validate_round_trip(original, arr, transforms)
+        return
+
+    def test_sampling_gaps(self):
+        original = 1500000000 + 60 * np.arange(10000)
+        original[2000:] += 3600
+        original[7000:] += 86400
+        arr, _, transforms = ts.timestamp_compression(original)
+        self.assertEqual([cd.IntegerTransformTypes.SPARSE, cd.IntegerTransformTypes.MINIMIZE,
+                          cd.IntegerTransformTypes.DERIVATIVE], transform_types(transforms))
+        self.assertEqual([3600, 86400], arr.tolist())
+        self.validate_round_trip(original, arr, transforms)
+        return
+
+    def test_jittered_timestamps(self):
+        original = 1500000000 + 60 * np.arange(10000) + np.random.RandomState(0).randint(0, 3, size=10000)
+        arr, _, transforms = ts.timestamp_compression(original)
+        self.assertEqual([cd.IntegerTransformTypes.BIT_PACK, cd.IntegerTransformTypes.MINIMIZE,
+                          cd.IntegerTransformTypes.DERIVATIVE], transform_types(transforms))
+        self.assertEqual(3, transforms[0].bit_width)
+        self.validate_round_trip(original, arr, transforms)
+        arr, _, transforms = ts.timestamp_compression(original, bit_pack=False)
+        self.assertEqual(np.uint8, arr.dtype)
+        self.validate_round_trip(original, arr, transforms)
+        return
+
+    def test_datetime64(self):
+        original = np.datetime64('2020-01-01T00:00:00', 'ns') + np.arange(1000) * np.timedelta64(10, 'ms')
+        original[300] = np.datetime64('NaT')
+        arr, _, transforms = ts.timestamp_compression(original)
+        self.assertEqual(cd.IntegerTransformTypes.DATETIME, transforms[-1].transform_type)
+        self.assertEqual(np.dtype('datetime64[ns]'), transforms[-1].datetime_dtype)
+        self.validate_round_trip(original, arr, transforms)
+        durations = np.arange(500) * np.timedelta64(1, 's')
+        self.validate_round_trip(durations, *ts.timestamp_compression(durations)[::2])
+        out = np.empty(len(original), dtype='datetime64[ns]')
+        idc.integer_decompression_from_transforms(arr, transforms, out=out)
+        self.assertTrue(np.array_equal(counts(original), counts(out)))
+        return
+
+    def test_short(self):
+        for original in [np.array([], dtype=np.int64), np.array([7]), np.array([7, 3]), np.array([7, 3, 2]),
+                         np.array(['2021-03-04'], dtype='datetime64[D]')]:
+            arr, _, transforms = ts.timestamp_compression(original)
+            self.assertTrue(np.array_equal(original, idc.integer_decompression_from_transforms(arr, transforms)))
+        return
+
+
+if __name__ == '__main__':
+    unittest.main()